@@ -0,0 +1,82 @@
+import base64
+from io import BytesIO
+from pathlib import Path
+from PIL import Image
+
+# bundled images ship with the repo, the GitHub copy is only used as a fallback
+IMAGE_FOLDER = Path(__file__).resolve().parent.parent / "images"
+REMOTE_IMAGE_FOLDER = (
+    "https://raw.githubusercontent.com/woodmc10/wisd_2024_public/main/images"
+)
+
+_image_bytes = dict()
+_images = dict()
+_image_uris = dict()
+
+
+def get_image_bytes(name, allow_remote=False):
+    """
+    Get the encoded bytes of a bundled image, reading the file only once per process.
+
+    Args:
+        name (str): Path of the image relative to the images folder
+            (e.g. 'pieces/baseball_1.png').
+        allow_remote (bool, optional): Download the image from GitHub when it is not
+            bundled. Defaults to False so rendering never does network I/O.
+
+    Returns:
+        bytes: The encoded image file contents.
+    """
+    if name not in _image_bytes:
+        path = IMAGE_FOLDER / name
+        if path.exists():
+            _image_bytes[name] = path.read_bytes()
+        elif allow_remote:
+            # only needed for the fallback, so keep requests out of the render path
+            import requests
+
+            response = requests.get(f"{REMOTE_IMAGE_FOLDER}/{name}", timeout=10)
+            response.raise_for_status()
+            _image_bytes[name] = response.content
+        else:
+            raise FileNotFoundError(f"Image asset not found: {path}")
+    return _image_bytes[name]
+
+
+def get_image(name, allow_remote=False):
+    """
+    Get a decoded PIL image, decoding it only once per process.
+
+    Args:
+        name (str): Path of the image relative to the images folder.
+        allow_remote (bool, optional): Download the image from GitHub when it is not
+            bundled. Defaults to False.
+
+    Returns:
+        PIL.Image.Image: The decoded image.
+    """
+    if name not in _images:
+        img = Image.open(BytesIO(get_image_bytes(name, allow_remote)))
+        img.load()
+        _images[name] = img
+    return _images[name]
+
+
+def get_image_uri(name, allow_remote=False):
+    """
+    Get an image as a base64 data URI that plotly can use as a layout image source
+    without re-encoding the image for every figure.
+
+    Args:
+        name (str): Path of the image relative to the images folder.
+        allow_remote (bool, optional): Download the image from GitHub when it is not
+            bundled. Defaults to False.
+
+    Returns:
+        str: The data URI of the image.
+    """
+    if name not in _image_uris:
+        img_format = get_image(name, allow_remote).format.lower()
+        encoded = base64.b64encode(get_image_bytes(name, allow_remote)).decode()
+        _image_uris[name] = f"data:image/{img_format};base64,{encoded}"
+    return _image_uris[name]
@@ -0,0 +1,164 @@
+import math
+import numpy as np
+
+# ball velocities are reported in mph and accelerations in mph/s, positions in feet
+MPH_TO_FPS = 5280 / 3600
+POS_COLUMNS = ["pos_0", "pos_1", "pos_2"]
+VEL_COLUMNS = ["vel_0", "vel_1", "vel_2"]
+ACC_COLUMNS = ["acc_0", "acc_1", "acc_2"]
+
+
+class BallTrajectory:
+    """
+    Time-sorted view of a pitch's ball samples that supports binary search lookups
+    of the ball position around the time of contact.
+
+    Args:
+        time (np.ndarray): Sample times, sorted ascending.
+        pos (np.ndarray): Ball positions (ft) with shape (n, 3).
+        vel (np.ndarray, optional): Ball velocities (mph) with shape (n, 3).
+        acc (np.ndarray, optional): Ball accelerations (mph/s) with shape (n, 3).
+        index (np.ndarray, optional): Index labels of the source DataFrame rows.
+    """
+
+    def __init__(self, time, pos, vel=None, acc=None, index=None):
+        self.time = np.asarray(time, dtype=float)
+        self.pos = np.asarray(pos, dtype=float)
+        self.vel = None if vel is None else np.asarray(vel, dtype=float)
+        self.acc = None if acc is None else np.asarray(acc, dtype=float)
+        self.index = np.arange(len(self.time)) if index is None else np.asarray(index)
+
+    @classmethod
+    def from_ball_df(cls, ball_df, deduplicate=True):
+        """
+        Build a trajectory from a ball DataFrame without modifying the DataFrame.
+
+        Args:
+            ball_df (pd.DataFrame): DataFrame containing the ball's trajectory data.
+            deduplicate (bool, optional): Drop repeated frames before sorting. Defaults
+                to True, set to False for samples that were already compacted on ingest.
+
+        Returns:
+            BallTrajectory: The time-sorted trajectory.
+        """
+        if deduplicate:
+            ball_df = ball_df.drop_duplicates()
+        if not ball_df["time"].is_monotonic_increasing:
+            ball_df = ball_df.sort_values("time", kind="stable")
+        has_vel = set(VEL_COLUMNS).issubset(ball_df.columns)
+        has_acc = set(ACC_COLUMNS).issubset(ball_df.columns)
+        return cls(
+            ball_df["time"].to_numpy(),
+            ball_df[POS_COLUMNS].to_numpy(),
+            ball_df[VEL_COLUMNS].to_numpy() if has_vel else None,
+            ball_df[ACC_COLUMNS].to_numpy() if has_acc else None,
+            ball_df.index.to_numpy(),
+        )
+
+    def __len__(self):
+        return len(self.time)
+
+    def nearest_index(self, t):
+        """
+        Find the position of the sample closest in time to t. Ties resolve to the
+        earlier sample, matching an idxmin over the absolute time difference.
+
+        Args:
+            t (float): The lookup time.
+
+        Returns:
+            int: The array position of the closest sample.
+        """
+        right = int(np.searchsorted(self.time, t, side="left"))
+        if right == 0:
+            return 0
+        if right == len(self.time):
+            right = len(self.time) - 1
+            return int(np.searchsorted(self.time, self.time[right], side="left"))
+        left = int(np.searchsorted(self.time, self.time[right - 1], side="left"))
+        if t - self.time[left] <= self.time[right] - t:
+            return left
+        return right
+
+    def preceding_index(self, t):
+        """
+        Find the position of the last sample at or before time t, falling back to the
+        first sample when t is before the trajectory starts.
+
+        Args:
+            t (float): The lookup time.
+
+        Returns:
+            int: The array position of the preceding sample.
+        """
+        return max(int(np.searchsorted(self.time, t, side="right")) - 1, 0)
+
+    def position_at(self, t, interpolate=False):
+        """
+        Get the ball position at time t.
+
+        Args:
+            t (float): The lookup time.
+            interpolate (bool, optional): Project the last sample before t forward to
+                the exact time using its velocity and acceleration (or linearly between
+                samples when those are missing). Samples after contact already follow
+                the batted ball, so the projection never starts from them. Defaults to
+                False, which returns the nearest sample.
+
+        Returns:
+            np.ndarray: The (x, y, z) position in feet.
+        """
+        if not interpolate:
+            return self.pos[self.nearest_index(t)]
+        if self.vel is None:
+            return np.array(
+                [np.interp(t, self.time, self.pos[:, ax]) for ax in range(3)]
+            )
+        idx = self.preceding_index(t)
+        dt = t - self.time[idx]
+        acc = np.zeros(3) if self.acc is None else self.acc[idx]
+        return self.pos[idx] + (self.vel[idx] * dt + 0.5 * acc * dt**2) * MPH_TO_FPS
+
+    def velocity_at(self, t, interpolate=False):
+        """
+        Get the ball velocity at time t.
+
+        Args:
+            t (float): The lookup time.
+            interpolate (bool, optional): Project the velocity of the last sample before
+                t to the exact time using its acceleration. Defaults to False, which
+                returns the nearest sample.
+
+        Returns:
+            np.ndarray: The (x, y, z) velocity in mph.
+        """
+        if self.vel is None:
+            raise ValueError("Ball samples do not include velocities")
+        if not interpolate:
+            return self.vel[self.nearest_index(t)]
+        idx = self.preceding_index(t)
+        if self.acc is None:
+            return self.vel[idx]
+        return self.vel[idx] + self.acc[idx] * (t - self.time[idx])
+
+    def pitch_angle(self, t, interpolate=False):
+        """
+        Calculate the pitch angle at time t. Without interpolation the angle comes from
+        the frame closest to t and the frame immediately before, with interpolation it
+        comes from the ball's velocity at exactly t.
+
+        Args:
+            t (float): The time of contact.
+            interpolate (bool, optional): Use the interpolated velocity. Defaults to False.
+
+        Returns:
+            float: The pitch angle in degrees.
+        """
+        if interpolate and self.vel is not None:
+            _, y, z = self.velocity_at(t, interpolate=True)
+        else:
+            idx = self.nearest_index(t)
+            if idx == 0:
+                raise IndexError("No ball frame before the contact frame")
+            _, y, z = self.pos[idx] - self.pos[idx - 1]
+        return math.degrees(math.atan(float(z) / float(y)))
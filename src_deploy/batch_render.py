@@ -0,0 +1,297 @@
+import argparse
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+from scorecard import generate_scorecard, DEFAULT_THRESHOLDS
+from batter_index import BatterIndex
+
+PLOT_KINDS = ["hunting", "contact_location", "tracking", "similarity"]
+# threshold set used to draw each plot kind
+PLOT_THRESHOLDS = {
+    "hunting": "hunting",
+    "contact_location": "contact_location",
+    "tracking": "track_angle",
+}
+
+# per-worker state, loaded once by the pool initializer
+_worker = dict()
+
+
+def fingerprint(kind, batter_df, grade, thresholds):
+    """
+    Hash everything that determines a batter's plot so unchanged plots can be skipped.
+
+    Args:
+        kind (str): The plot kind.
+        batter_df (pd.DataFrame): The batter's rows used to draw the plot.
+        grade (str): The grade shown on the plot.
+        thresholds (list): The grading thresholds used to draw the plot.
+
+    Returns:
+        str: The plot fingerprint.
+    """
+    digest = hashlib.sha1(f"{kind}|{grade}|{list(thresholds)}".encode())
+    digest.update(pd.util.hash_pandas_object(batter_df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def load_manifest(output_folder):
+    """
+    Load the render manifest from the output folder.
+
+    Args:
+        output_folder (str): Folder the images are written to.
+
+    Returns:
+        dict: Plot fingerprints keyed by '<batter>_<kind>'.
+    """
+    path = os.path.join(output_folder, "manifest.json")
+    if not os.path.exists(path):
+        return dict()
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_manifest(output_folder, manifest):
+    """
+    Write the render manifest to the output folder.
+
+    Args:
+        output_folder (str): Folder the images are written to.
+        manifest (dict): Plot fingerprints keyed by '<batter>_<kind>'.
+    """
+    path = os.path.join(output_folder, "manifest.json")
+    with open(path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def plan_renders(data_folder, thresholds, kinds, output_folder, force=False):
+    """
+    Build the list of plots that need to be rendered for every batter in the scorecard.
+
+    Args:
+        data_folder (str): Path to the folder containing metric data files.
+        thresholds (dict): Grading thresholds keyed like DEFAULT_THRESHOLDS.
+        kinds (list): Plot kinds to render.
+        output_folder (str): Folder the images are written to.
+        force (bool, optional): Render plots even when the manifest says they are
+            unchanged. Defaults to False.
+
+    Returns:
+        tuple: The list of (batter_id, kind, fingerprint) tasks, the number of
+        plots skipped as unchanged, and the kinds that can't be rendered.
+    """
+    scorecard_df = generate_scorecard(
+        data_folder,
+        thresholds["contact_location"],
+        thresholds["track_angle"],
+        thresholds["hunting"],
+        thresholds["similarity"],
+    ).set_index("batter")
+    swing_map_df = pd.read_csv(f"{data_folder}/swing_map_metrics_df.csv")
+    timing_df = pd.read_csv(f"{data_folder}/timing_metrics_df.csv")
+    tracking_df = pd.read_csv(f"{data_folder}/tracking_metrics_df.csv")
+    batter_rows = {
+        "hunting": dict(tuple(swing_map_df.groupby("batter"))),
+        "contact_location": dict(
+            tuple(timing_df[timing_df["contact_y_loc"] != 0.0].groupby("batter"))
+        ),
+        "tracking": dict(tuple(tracking_df.groupby("batter"))),
+    }
+    grade_columns = {
+        "hunting": "hunting_grade",
+        "contact_location": "timing_grade",
+        "tracking": "track_angle_grade",
+    }
+
+    manifest = dict() if force else load_manifest(output_folder)
+    tasks = []
+    skipped = 0
+    unsupported = set()
+    for batter_id, row in scorecard_df.iterrows():
+        batter_id = int(batter_id)
+        for kind in kinds:
+            if kind not in PLOT_THRESHOLDS:
+                # swing similarity plots align two bat paths from the raw tracking
+                # files, which the metric tables don't carry
+                unsupported.add(kind)
+                continue
+            batter_df = batter_rows[kind].get(batter_id)
+            grade = row[grade_columns[kind]]
+            if batter_df is None or not isinstance(grade, str):
+                continue
+            key = f"{batter_id}_{kind}"
+            plot_hash = fingerprint(
+                kind, batter_df, grade, thresholds[PLOT_THRESHOLDS[kind]]
+            )
+            path = os.path.join(output_folder, f"{key}.png")
+            if manifest.get(key) == plot_hash and os.path.exists(path):
+                skipped += 1
+                continue
+            tasks.append((batter_id, kind, plot_hash))
+    return tasks, skipped, sorted(unsupported)
+
+
+def init_worker(data_folder, thresholds, output_folder):
+    """
+    Set up one matplotlib/kaleido context and the batter data for a pool worker.
+
+    Args:
+        data_folder (str): Path to the folder containing metric data files.
+        thresholds (dict): Grading thresholds keyed like DEFAULT_THRESHOLDS.
+        output_folder (str): Folder the images are written to.
+    """
+    import matplotlib
+
+    matplotlib.use("Agg")
+    from track_angle import create_tracking_score_df
+
+    swing_map_df = pd.read_csv(f"{data_folder}/swing_map_metrics_df.csv")
+    timing_df = pd.read_csv(f"{data_folder}/timing_metrics_df.csv")
+    tracking_df = pd.read_csv(f"{data_folder}/tracking_metrics_df.csv")
+    _worker["thresholds"] = thresholds
+    _worker["output_folder"] = output_folder
+    _worker["swing_map_index"] = BatterIndex(swing_map_df)
+    _worker["timing_index"] = BatterIndex(timing_df)
+    _worker["grades"] = generate_scorecard(
+        data_folder,
+        thresholds["contact_location"],
+        thresholds["track_angle"],
+        thresholds["hunting"],
+        thresholds["similarity"],
+    ).set_index("batter")
+    _worker["tracking_score_index"] = BatterIndex(
+        create_tracking_score_df(thresholds["track_angle"], tracking_df)
+    )
+
+
+def render_plot(batter_id, kind):
+    """
+    Render one batter plot inside a pool worker and save it to the output folder.
+
+    Args:
+        batter_id (int): The ID of the batter.
+        kind (str): The plot kind.
+
+    Returns:
+        str: Path of the saved image.
+    """
+    import matplotlib.pyplot as plt
+
+    thresholds = _worker["thresholds"]
+    grades = _worker["grades"].loc[batter_id]
+    path = os.path.join(_worker["output_folder"], f"{batter_id}_{kind}.png")
+    if kind == "hunting":
+        from hunt_viz import plot_hunting
+
+        batter_df = _worker["swing_map_index"].get(batter_id)
+        fig = plot_hunting(batter_df, grades["hunting_grade"])
+        fig.savefig(path)
+        plt.close(fig)
+    elif kind == "contact_location":
+        from contact_loc_viz import viz_contact_loc
+
+        batter_df = _worker["timing_index"].get(batter_id)
+        batter_df = batter_df[batter_df["contact_y_loc"] != 0.0]
+        fig = viz_contact_loc(
+            batter_df, grades["timing_grade"], thresholds["contact_location"]
+        )
+        fig.savefig(path)
+        plt.close(fig)
+    elif kind == "tracking":
+        from track_angle_viz import generate_track_angle_plot
+
+        tracking_index = _worker["tracking_score_index"]
+        fig = generate_track_angle_plot(
+            batter_id,
+            tracking_index.df,
+            thresholds["track_angle"],
+            batter_index=tracking_index,
+        )
+        fig.write_image(path)
+    else:
+        raise ValueError(f"Unsupported plot kind: {kind}")
+    return path
+
+
+def batch_render(
+    data_folder, output_folder, thresholds=None, kinds=None, workers=None, force=False
+):
+    """
+    Render grade images for every batter in the scorecard across a process pool,
+    skipping plots whose inputs haven't changed since the last run.
+
+    Args:
+        data_folder (str): Path to the folder containing metric data files.
+        output_folder (str): Folder the images and manifest are written to.
+        thresholds (dict, optional): Grading thresholds keyed like DEFAULT_THRESHOLDS.
+            Defaults to DEFAULT_THRESHOLDS.
+        kinds (list, optional): Plot kinds to render. Defaults to all PLOT_KINDS.
+        workers (int, optional): Number of worker processes. Defaults to the CPU count.
+        force (bool, optional): Re-render every plot. Defaults to False.
+
+    Returns:
+        dict: Counts of rendered, skipped and failed plots, and unsupported kinds.
+    """
+    thresholds = thresholds or DEFAULT_THRESHOLDS
+    kinds = kinds or PLOT_KINDS
+    os.makedirs(output_folder, exist_ok=True)
+    tasks, skipped, unsupported = plan_renders(
+        data_folder, thresholds, kinds, output_folder, force
+    )
+    manifest = load_manifest(output_folder)
+    failed = []
+    if tasks:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=init_worker,
+            initargs=(data_folder, thresholds, output_folder),
+        ) as pool:
+            futures = {
+                pool.submit(render_plot, batter_id, kind): (batter_id, kind, plot_hash)
+                for batter_id, kind, plot_hash in tasks
+            }
+            for future in as_completed(futures):
+                batter_id, kind, plot_hash = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    failed.append((batter_id, kind, str(e)))
+                    manifest.pop(f"{batter_id}_{kind}", None)
+                    continue
+                manifest[f"{batter_id}_{kind}"] = plot_hash
+        save_manifest(output_folder, manifest)
+    return {
+        "rendered": len(tasks) - len(failed),
+        "skipped": skipped,
+        "failed": failed,
+        "unsupported": unsupported,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render grade images for all batters")
+    parser.add_argument("--data-folder", default="../data/dataframes")
+    parser.add_argument("--output-folder", default="../images/grades")
+    parser.add_argument("--kinds", nargs="+", choices=PLOT_KINDS, default=PLOT_KINDS)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--force", action="store_true")
+    args = parser.parse_args()
+
+    summary = batch_render(
+        args.data_folder,
+        args.output_folder,
+        kinds=args.kinds,
+        workers=args.workers,
+        force=args.force,
+    )
+    print(
+        f"rendered {summary['rendered']}, skipped {summary['skipped']} unchanged, "
+        f"{len(summary['failed'])} failed"
+    )
+    for batter_id, kind, error in summary["failed"]:
+        print(f"  {batter_id} {kind}: {error}")
+    if summary["unsupported"]:
+        print(f"not rendered (needs raw swing paths): {', '.join(summary['unsupported'])}")
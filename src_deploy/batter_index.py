@@ -0,0 +1,89 @@
+from collections import OrderedDict
+from threading import Lock
+import numpy as np
+
+
+class BatterIndex:
+    """
+    A DataFrame sorted by batter with an offset table, so one batter's rows are a
+    contiguous slice looked up in constant time instead of a scan of the whole frame.
+    Rows keep their original order within each batter.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to index.
+        column (str, optional): The batter ID column. Defaults to 'batter'.
+    """
+
+    def __init__(self, df, column="batter"):
+        order = np.argsort(df[column].to_numpy(), kind="stable")
+        self.df = df.iloc[order]
+        batters, starts = np.unique(self.df[column].to_numpy(), return_index=True)
+        ends = np.append(starts[1:], len(self.df))
+        self.offsets = {
+            batter: (start, end)
+            for batter, start, end in zip(batters.tolist(), starts, ends)
+        }
+
+    def __contains__(self, batter_id):
+        return batter_id in self.offsets
+
+    def __len__(self):
+        return len(self.offsets)
+
+    @property
+    def batters(self):
+        """
+        list: The indexed batter IDs in ascending order.
+        """
+        return list(self.offsets)
+
+    def get(self, batter_id):
+        """
+        Get a batter's rows.
+
+        Args:
+            batter_id (int): The ID of the batter.
+
+        Returns:
+            pd.DataFrame: The batter's rows, empty when the batter is not indexed.
+        """
+        start, end = self.offsets.get(batter_id, (0, 0))
+        return self.df.iloc[start:end]
+
+
+# most recently used indexes, keyed by table name and version, so sessions on other
+# versions of a table (e.g. other track angle thresholds) do not evict each other
+MAX_INDEXES = 8
+_indexes = OrderedDict()
+_indexes_lock = Lock()
+
+
+def get_batter_index(name, version, build):
+    """
+    Get the batter index of a named table, building it once per version. The table is
+    built and indexed outside the lock, so a slow build never blocks other lookups;
+    two sessions missing the same version at once may both build it.
+
+    Args:
+        name (str): Name of the table (e.g. 'swing_map').
+        version (str): Version of the table's contents, see utils.data_version.
+        build (callable): Function with no arguments that returns the table, only
+            called when the index is not cached.
+
+    Returns:
+        BatterIndex: The cached index.
+    """
+    key = (name, version)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is not None:
+            _indexes.move_to_end(key)
+            return index
+    index = BatterIndex(build())
+    with _indexes_lock:
+        # keep the first index built, so every caller shares one copy
+        index = _indexes.setdefault(key, index)
+        _indexes.move_to_end(key)
+        while len(_indexes) > MAX_INDEXES:
+            _indexes.popitem(last=False)
+    return index
@@ -0,0 +1,117 @@
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from batter_index import get_batter_index
+
+PLOT_KINDS = ["tracking", "hunting", "contact_location"]
+# threshold set used to draw each plot kind
+PLOT_THRESHOLDS = {
+    "tracking": "track_angle",
+    "hunting": "hunting",
+    "contact_location": "contact_location",
+}
+
+
+def render_plot_png(kind, batter_id, thresholds, tables, dpi=200):
+    """
+    Build a batter plot and encode it as a PNG. The figures are created outside of
+    pyplot, so several plots can be rendered at the same time on different threads.
+
+    Args:
+        kind (str): The plot kind, one of PLOT_KINDS.
+        batter_id (int): The ID of the batter.
+        thresholds (dict): Grading thresholds keyed like scorecard.DEFAULT_THRESHOLDS.
+        tables (dict): The data to plot from, with the batter indexes
+            'swing_metrics_index', 'swing_map_index' and 'timing_index', the raw
+            'tracking_df' and its 'data_version'. Optionally a 'contact_kde' and a
+            'scorecard_index' whose grades are used instead of rescoring the batter.
+        dpi (int, optional): Resolution of the image. Defaults to 200.
+
+    Returns:
+        bytes: The PNG image.
+    """
+    if kind == "tracking":
+        import plotly.io as pio
+        from track_angle import create_tracking_score_df
+        from track_angle_viz import generate_track_angle_plot
+
+        track_angles = list(thresholds["track_angle"])
+        tracking_index = get_batter_index(
+            "tracking_score",
+            f"{tables['data_version']}-{track_angles}",
+            lambda: create_tracking_score_df(track_angles, tables["tracking_df"]),
+        )
+        fig = generate_track_angle_plot(
+            batter_id, tracking_index.df, track_angles, batter_index=tracking_index
+        )
+        return pio.to_image(fig, format="png", scale=dpi / 100)
+
+    from matplotlib.figure import Figure
+
+    batter_metrics_df = tables["swing_metrics_index"].get(batter_id)
+    scorecard_index = tables.get("scorecard_index")
+    grades = None if scorecard_index is None else scorecard_index.get(batter_id)
+    fig = Figure()
+    if kind == "hunting":
+        from hunt import hunt_scorecard
+        from hunt_viz import plot_hunting
+
+        if grades is None:
+            grades = hunt_scorecard(thresholds["hunting"], batter_metrics_df)
+        plot_hunting(
+            tables["swing_map_index"].get(batter_id),
+            grades["hunting_grade"].item(),
+            fig=fig,
+        )
+    elif kind == "contact_location":
+        from contact_loc import contact_loc_scorecard
+        from contact_loc_viz import viz_contact_loc
+
+        contact_locs = thresholds["contact_location"]
+        if grades is None:
+            grades = contact_loc_scorecard(contact_locs, batter_metrics_df)
+        contact_kde = tables.get("contact_kde")
+        viz_contact_loc(
+            tables["timing_index"].get(batter_id),
+            grades["timing_grade"].item(),
+            contact_locs,
+            fig=fig,
+            kde_curve=None if contact_kde is None else contact_kde.curve(batter_id),
+        )
+    else:
+        raise ValueError(f"Unknown plot kind: {kind}")
+    buffer = BytesIO()
+    fig.savefig(buffer, format="png", dpi=dpi, bbox_inches="tight")
+    return buffer.getvalue()
+
+
+def render_batch(batter_ids, kinds, render, max_workers=None):
+    """
+    Render every plot kind for a group of batters in one concurrent pass.
+
+    Args:
+        batter_ids (list): The IDs of the batters.
+        kinds (list): The plot kinds to render.
+        render (callable): Function taking a plot kind and batter ID that returns the
+            image.
+        max_workers (int, optional): Number of render threads. Defaults to one per plot.
+
+    Returns:
+        dict: For each plot kind, the images in batter order. A plot that failed to
+        render holds its exception instead.
+    """
+    jobs = [(kind, batter_id) for kind in kinds for batter_id in batter_ids]
+    if not jobs:
+        return {kind: [] for kind in kinds}
+
+    def run(job):
+        try:
+            return render(*job)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(jobs)) as pool:
+        images = list(pool.map(run, jobs))
+    return {
+        kind: images[i * len(batter_ids) : (i + 1) * len(batter_ids)]
+        for i, kind in enumerate(kinds)
+    }
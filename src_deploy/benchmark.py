@@ -0,0 +1,251 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+import pandas as pd
+from batter_index import BatterIndex
+from contact_loc import contact_loc_scorecard
+from hunt import hunt_scorecard
+from similarity import similarity_scorecard
+from track_angle import convert_score_ranges, create_tracking_score_df, tracking_scorecard
+from scorecard import generate_scorecard, merge_metrics, DEFAULT_THRESHOLDS
+from synthetic_data import generate_metric_tables
+
+SCALES = [1, 10, 100]
+
+
+def time_call(function, repeats):
+    """
+    Time a function call, after one untimed call so first-use costs like imports
+    and font loading aren't counted.
+
+    Args:
+        function (callable): Function with no arguments.
+        repeats (int): Number of timed calls.
+
+    Returns:
+        dict: The fastest, median and mean wall time in seconds and the repeats.
+    """
+    function()
+    durations = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    return {
+        "min": min(durations),
+        "median": statistics.median(durations),
+        "mean": statistics.mean(durations),
+        "repeats": repeats,
+    }
+
+
+def benchmark_functions(data_folder, thresholds):
+    """
+    Build the benchmarked calls on one data folder. The plot builders draw the batter
+    with the most swings, looked up through a batter index like the dashboard does.
+
+    Args:
+        data_folder (str): Path to the folder containing metric data files.
+        thresholds (dict): Grading thresholds keyed like DEFAULT_THRESHOLDS.
+
+    Returns:
+        dict: Functions with no arguments keyed by benchmark name.
+    """
+    from matplotlib.figure import Figure
+    from contact_loc_viz import viz_contact_loc
+    from hunt_viz import plot_hunting
+    from track_angle_viz import generate_track_angle_plot
+
+    merged_df = merge_metrics(data_folder)
+    swing_map_df = pd.read_csv(f"{data_folder}/swing_map_metrics_df.csv")
+    timing_df = pd.read_csv(f"{data_folder}/timing_metrics_df.csv")
+    angle_ranges, _, _ = convert_score_ranges(thresholds["track_angle"])
+    tracking_index = BatterIndex(
+        create_tracking_score_df(thresholds["track_angle"], merged_df)
+    )
+    swing_map_index = BatterIndex(swing_map_df)
+    timing_index = BatterIndex(timing_df)
+    batter_id = swing_map_df["batter"].value_counts().idxmax()
+
+    def hunting_plot():
+        plot_hunting(swing_map_index.get(batter_id), "B", fig=Figure())
+
+    def contact_loc_plot():
+        batter_df = timing_index.get(batter_id)
+        viz_contact_loc(
+            batter_df[batter_df["contact_y_loc"] != 0.0],
+            "B",
+            thresholds["contact_location"],
+            fig=Figure(),
+        )
+
+    def tracking_plot():
+        generate_track_angle_plot(
+            batter_id,
+            tracking_index.df,
+            thresholds["track_angle"],
+            batter_index=tracking_index,
+        )
+
+    return {
+        "merge_metrics": lambda: merge_metrics(data_folder),
+        "contact_loc_scorecard": lambda: contact_loc_scorecard(
+            thresholds["contact_location"], merged_df
+        ),
+        "tracking_scorecard": lambda: tracking_scorecard(merged_df, angle_ranges),
+        "hunt_scorecard": lambda: hunt_scorecard(thresholds["hunting"], merged_df),
+        "similarity_scorecard": lambda: similarity_scorecard(
+            thresholds["similarity"], merged_df
+        ),
+        "generate_scorecard": lambda: generate_scorecard(
+            data_folder, *[thresholds[key] for key in DEFAULT_THRESHOLDS]
+        ),
+        "plot_hunting": hunting_plot,
+        "viz_contact_loc": contact_loc_plot,
+        "generate_track_angle_plot": tracking_plot,
+    }
+
+
+def environment():
+    """
+    Describe where the benchmark ran, so results can be matched to a commit.
+
+    Returns:
+        dict: The git commit, Python, pandas and numpy versions, platform and CPU count.
+    """
+    import numpy as np
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def run_benchmarks(
+    scales=None,
+    repeats=3,
+    base_batters=31,
+    work_folder=None,
+    reference_folder="../data/dataframes",
+    seed=0,
+    thresholds=None,
+):
+    """
+    Time the scorecard pipeline on synthetic data at several scales.
+
+    Args:
+        scales (list, optional): Multiples of base_batters to run. Defaults to SCALES.
+        repeats (int, optional): Calls per benchmark. Defaults to 3.
+        base_batters (int, optional): Batters at scale 1. Defaults to 31, the number
+            of batters in the sample data.
+        work_folder (str, optional): Folder the synthetic data is written to, reused
+            when it already holds a scale's data. Defaults to a temporary folder.
+        reference_folder (str, optional): Metric tables the synthetic swings are
+            copied from. Defaults to '../data/dataframes'.
+        seed (int, optional): Random seed of the synthetic data. Defaults to 0.
+        thresholds (dict, optional): Grading thresholds keyed like
+            DEFAULT_THRESHOLDS. Defaults to DEFAULT_THRESHOLDS.
+
+    Returns:
+        dict: The environment and the timings of each benchmark at each scale.
+    """
+    scales = scales or SCALES
+    thresholds = thresholds or DEFAULT_THRESHOLDS
+    work_folder = work_folder or tempfile.mkdtemp(prefix="benchmark_")
+    results = []
+    for scale in scales:
+        batters = base_batters * scale
+        data_folder = os.path.join(work_folder, f"batters_{batters}_seed_{seed}")
+        if not os.path.exists(os.path.join(data_folder, "swing_map_metrics_df.csv")):
+            generate_metric_tables(
+                data_folder, batters, reference_folder=reference_folder, seed=seed
+            )
+        functions = benchmark_functions(data_folder, thresholds)
+        results.append(
+            {
+                "scale": scale,
+                "batters": batters,
+                "swings": len(pd.read_csv(f"{data_folder}/swing_map_metrics_df.csv")),
+                "timings": {
+                    name: time_call(function, repeats)
+                    for name, function in functions.items()
+                },
+            }
+        )
+    return {"environment": environment(), "results": results}
+
+
+def compare_results(baseline, current):
+    """
+    Compare two benchmark runs.
+
+    Args:
+        baseline (dict): Results of an earlier run_benchmarks.
+        current (dict): Results of the run to compare.
+
+    Returns:
+        pd.DataFrame: The median times of both runs and their ratio for every
+        benchmark and scale the runs share.
+    """
+    rows = []
+    baseline_results = {result["scale"]: result for result in baseline["results"]}
+    for result in current["results"]:
+        base = baseline_results.get(result["scale"])
+        if base is None:
+            continue
+        for name, timing in result["timings"].items():
+            if name in base["timings"]:
+                before = base["timings"][name]["median"]
+                rows.append(
+                    {
+                        "scale": result["scale"],
+                        "benchmark": name,
+                        "baseline": before,
+                        "current": timing["median"],
+                        "ratio": timing["median"] / before if before else None,
+                    }
+                )
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the scorecard pipeline")
+    parser.add_argument("--scales", type=int, nargs="+", default=SCALES)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--work-folder", default=None)
+    parser.add_argument("--output", default=None, help="JSON file of the results")
+    parser.add_argument("--compare", default=None, help="JSON results to compare with")
+    args = parser.parse_args()
+
+    import matplotlib
+
+    matplotlib.use("Agg")
+    report = run_benchmarks(args.scales, args.repeats, work_folder=args.work_folder)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    if args.compare:
+        with open(args.compare) as f:
+            print(compare_results(json.load(f), report).to_string(index=False))
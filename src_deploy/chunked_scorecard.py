@@ -0,0 +1,613 @@
+import argparse
+import numpy as np
+import pandas as pd
+from contact_loc import summarize_contact_loc
+from track_angle import convert_score_ranges, summarize_tracking
+from hunt import summarize_hunting
+from similarity import summarize_similarity
+from scorecard import combine_scorecards, DEFAULT_THRESHOLDS, KEY_COLUMNS
+
+# metric tables in the order merge_metrics joins them, with the columns each one scores
+METRIC_TABLES = {
+    "swing_map": ("swing_map_metrics_df.csv", ["pitch_x", "pitch_z", "two_strikes"]),
+    "distance": ("distance_metrics_df.csv", ["distance"]),
+    "tracking": ("tracking_metrics_df.csv", ["track_angle"]),
+    "timing": ("timing_metrics_df.csv", ["contact_y_loc"]),
+}
+TABLE_NAMES = list(METRIC_TABLES)
+
+
+def read_metric_chunks(data_folder, table, chunksize=100_000, keys_only=False):
+    """
+    Stream the key and scoring columns of a metric table in chunks.
+
+    Args:
+        data_folder (str): Path to the folder containing metric data files.
+        table (str): The metric table, one of METRIC_TABLES.
+        chunksize (int, optional): Rows per chunk. Defaults to 100,000.
+        keys_only (bool, optional): Read only the key columns. Defaults to False.
+
+    Returns:
+        Iterator of pd.DataFrame: The table chunks.
+    """
+    file_name, columns = METRIC_TABLES[table]
+    return pd.read_csv(
+        f"{data_folder}/{file_name}",
+        usecols=KEY_COLUMNS + ([] if keys_only else columns),
+        chunksize=chunksize,
+    )
+
+
+def merge_moments(a, b):
+    """
+    Combine the Welford moments of two sets of values.
+
+    Args:
+        a (tuple): Count, mean and sum of squared deviations of the first set.
+        b (tuple): Count, mean and sum of squared deviations of the second set.
+
+    Returns:
+        tuple: The moments of both sets together.
+    """
+    n_a, mean_a, m2_a = a
+    n_b, mean_b, m2_b = b
+    n = n_a + n_b
+    if n_a == 0 or n_b == 0:
+        return b if n_a == 0 else a
+    delta = mean_b - mean_a
+    return (n, mean_a + delta * n_b / n, m2_a + m2_b + delta**2 * n_a * n_b / n)
+
+
+def merge_moment_frames(a, b):
+    """
+    Combine the Welford moments of each batter in two sets of values, like
+    merge_moments.
+
+    Args:
+        a (pd.DataFrame): Count 'n', 'mean' and sum of squared deviations 'm2' of each
+            batter in the first set, indexed by batter.
+        b (pd.DataFrame): The moments of the second set.
+
+    Returns:
+        pd.DataFrame: The moments of each batter in both sets together.
+    """
+    batters = a.index.union(b.index)
+    a = a.reindex(batters, fill_value=0)
+    b = b.reindex(batters, fill_value=0)
+    n = a["n"] + b["n"]
+    delta = b["mean"] - a["mean"]
+    merged = pd.DataFrame(
+        {
+            "n": n,
+            "mean": a["mean"] + delta * b["n"] / n,
+            "m2": a["m2"] + b["m2"] + delta**2 * a["n"] * b["n"] / n,
+        }
+    )
+    # a batter missing from one set keeps the other set's moments exactly
+    merged[b["n"] == 0] = a[b["n"] == 0]
+    merged[a["n"] == 0] = b[a["n"] == 0]
+    return merged
+
+
+def add_counts(a, b):
+    """
+    Add per-batter counts, keeping batters found in only one of them.
+
+    Args:
+        a (pd.Series or pd.DataFrame): Counts indexed by batter.
+        b (pd.Series or pd.DataFrame): Counts indexed by batter.
+
+    Returns:
+        pd.Series or pd.DataFrame: The summed counts.
+    """
+    batters = a.index.union(b.index)
+    return a.reindex(batters, fill_value=0) + b.reindex(batters, fill_value=0)
+
+
+def add_key_counts(a, b):
+    """
+    Add per-swing row counts, keeping swings found in only one of them.
+
+    Args:
+        a (pd.Series): Row counts indexed by the KEY_COLUMNS, or None for no rows.
+        b (pd.Series): Row counts indexed by the KEY_COLUMNS, or None for no rows.
+
+    Returns:
+        pd.Series: The summed counts, None when both are None.
+    """
+    if a is None or b is None:
+        return b if a is None else a
+    return pd.concat([a, b]).groupby(level=KEY_COLUMNS, dropna=False).sum()
+
+
+def contact_scores(quality_locations, contact_locs):
+    """
+    Score contact locations like contact_loc.score_contact_loc, all at once.
+
+    Args:
+        quality_locations (list): List of quality location thresholds.
+        contact_locs (np.ndarray): The contact locations.
+
+    Returns:
+        np.ndarray: The score of each contact location, 0 where it is missing.
+    """
+    return np.select(
+        [contact_locs > location for location in quality_locations[:5]],
+        [0, 4, 3, 2, 1][: len(quality_locations)],
+        0,
+    )
+
+
+def angle_groups(angles, angle_ranges):
+    """
+    Group track angles like track_angle.group_angles, all at once.
+
+    Args:
+        angles (np.ndarray): The track angles.
+        angle_ranges (list): Sorted list of tuples representing angle ranges.
+
+    Returns:
+        np.ndarray: The group index of each angle.
+    """
+    starts = np.array([start for start, _ in angle_ranges])
+    return np.maximum(np.searchsorted(starts, angles, side="left") - 1, 0)
+
+
+def angle_scores(angle_ranges, angles):
+    """
+    Score track angles like track_angle.score_timing_angle, all at once.
+
+    Args:
+        angle_ranges (list): List of tuples representing score ranges.
+        angles (np.ndarray): The track angles.
+
+    Returns:
+        np.ndarray: The score of each angle.
+    """
+    angles = np.abs(angles)
+    quality_ranges = angle_ranges[len(angle_ranges) // 2 :]
+    conditions = [(0 <= angles) & (angles < quality_ranges[0][1])] + [
+        (start <= angles) & (angles < end) for start, end in quality_ranges[1:5]
+    ]
+    return np.select(conditions, [4, 3, 3, 2, 1][: len(conditions)], 0)
+
+
+def merged_order(batter_counts, values, outer, inner):
+    """
+    Repeat one batter's values of a table the way merge_metrics joins them: within a
+    swing every value is repeated for each row of the tables joined after it, and the
+    swing's values for each row of the tables joined before it.
+
+    Args:
+        batter_counts (np.ndarray): The swing of each value, sorted.
+        values (np.ndarray): The values.
+        outer (np.ndarray): Rows of the swing in the tables joined before the table.
+        inner (np.ndarray): Rows of the swing in the tables joined after the table.
+
+    Returns:
+        np.ndarray: The values of the batter's merged swings.
+    """
+    if (outer == 1).all() and (inner == 1).all():
+        return values
+    codes, _ = pd.factorize(batter_counts)
+    starts = np.flatnonzero(np.append(True, codes[1:] != codes[:-1]))
+    return np.concatenate(
+        [
+            np.tile(np.repeat(swing_values, inner[start]), outer[start])
+            for start, swing_values in zip(starts, np.split(values, starts[1:]))
+        ]
+    )
+
+
+def compact_ints(values):
+    """
+    Downcast buffered integers to the smallest dtype that holds them. Buffers of
+    chunks with different dtypes are upcast when they are concatenated.
+
+    Args:
+        values (np.ndarray): The values, left as they are unless they are integers.
+
+    Returns:
+        np.ndarray: The values.
+    """
+    return pd.to_numeric(values, downcast="integer")
+
+
+class ScorecardAccumulator:
+    """
+    Mergeable per-batter scoring state built from metric table chunks, so a scorecard
+    can be scored without loading and merging the full tables. Each chunk is folded
+    in with groupby aggregates: contact locations as counts and score sums, tracking
+    angles as group counts, distances as Welford moments. The scorecard lists every
+    swing's tracking angle score and hunting distance, so the tracking scores and
+    hunting locations are kept as numpy buffers, a few bytes per swing.
+
+    merge_metrics repeats a swing's rows when a table has several rows for it, and
+    counts a swing without a timing row as one unscored contact. Those need every
+    table's keys, so the keys are counted first with add_keys and count_swings.
+    Each chunk's counts are added to one running count per table, and only the swings
+    with repeated rows are kept once every table is counted.
+
+    The state is not bounded: the key counts and the tracking score and hunting
+    location buffers hold an entry for every swing, since the scorecard's per-swing
+    score lists need one.
+
+    The result matches score_metrics on the output of merge_metrics, including the
+    swing order of the per-swing score lists.
+
+    Args:
+        contact_location_values (list): Custom values for contact location scoring.
+        track_angle_values (list): Custom values for track angle scoring.
+    """
+
+    def __init__(self, contact_location_values, track_angle_values):
+        self.contact_location_values = contact_location_values
+        self.angle_ranges, _, _ = convert_score_ranges(track_angle_values)
+        # rows of each swing in each table, summed over the chunks seen so far
+        self._key_counts = dict.fromkeys(TABLE_NAMES)
+        # rows of each table of the swings some table has several rows for
+        self.repeats = pd.DataFrame(columns=TABLE_NAMES)
+        self.contact = pd.DataFrame(
+            {"swing_count": pd.Series(dtype=int), "contact_score": pd.Series(dtype=int)}
+        )
+        self.group_counts = pd.DataFrame(columns=range(len(self.angle_ranges)), dtype=int)
+        self.moments = pd.DataFrame(
+            {
+                "n": pd.Series(dtype=int),
+                "mean": pd.Series(dtype=float),
+                "m2": pd.Series(dtype=float),
+            }
+        )
+        self.good_counts = pd.Series(dtype=int)
+        # tracking angle scores and hunting locations of every swing, in chunks
+        self.track = []
+        self.points = []
+        self._bounds = None
+
+    def add_keys(self, table, chunk):
+        """
+        Count the rows of each swing in a metric table chunk.
+
+        Args:
+            table (str): The metric table, one of METRIC_TABLES.
+            chunk (pd.DataFrame): Rows of the table with the key columns.
+        """
+        chunk = chunk.dropna(subset=["batter"])
+        self._key_counts[table] = add_key_counts(
+            self._key_counts[table], chunk.value_counts(KEY_COLUMNS, dropna=False)
+        )
+
+    def count_swings(self):
+        """
+        Find the swings merge_metrics repeats rows of and count the swings without a
+        timing row, after add_keys has seen every chunk of every table.
+        """
+        counts = pd.concat(
+            {
+                table: pd.Series(dtype=int) if key_counts is None else key_counts
+                for table, key_counts in self._key_counts.items()
+            },
+            axis=1,
+        )
+        counts = counts.reindex(columns=TABLE_NAMES).fillna(0).astype(int)
+        self._key_counts = dict.fromkeys(TABLE_NAMES)
+        repeats = counts.clip(lower=1)
+        self.repeats = repeats[(counts > 1).any(axis=1)].reset_index()
+        # a swing without a timing row is merged as unscored contacts, one for every
+        # combination of its other rows
+        untimed = (
+            repeats[counts["timing"] == 0]
+            .prod(axis=1)
+            .groupby(level="batter")
+            .sum()
+            .rename("swing_count")
+            .to_frame()
+            .assign(contact_score=0)
+        )
+        self.contact = add_counts(self.contact, untimed)
+
+    def _repeats(self, chunk):
+        # rows of each table of every row's swing, one unless the swing is repeated
+        if self.repeats.empty:
+            return np.ones((len(chunk), len(TABLE_NAMES)), dtype=int)
+        return (
+            chunk[KEY_COLUMNS]
+            .merge(self.repeats, on=KEY_COLUMNS, how="left")[TABLE_NAMES]
+            .fillna(1)
+            .to_numpy(int)
+        )
+
+    def _weights(self, table, chunk):
+        # merged rows of each row: the product of the other tables' rows
+        repeats = self._repeats(chunk)
+        return np.delete(repeats, TABLE_NAMES.index(table), axis=1).prod(axis=1), repeats
+
+    def add_chunk(self, table, chunk):
+        """
+        Fold a metric table chunk into the scoring state. count_swings must have
+        been called first.
+
+        Args:
+            table (str): The metric table, one of METRIC_TABLES.
+            chunk (pd.DataFrame): Rows of the table.
+        """
+        chunk = chunk.dropna(subset=["batter"])
+        if table == "swing_map":
+            chunk = chunk[(chunk["two_strikes"] == False).to_numpy()]
+            weights, _ = self._weights(table, chunk)
+            self.points.append(
+                pd.DataFrame(
+                    {
+                        "batter": chunk["batter"].to_numpy(),
+                        "batter_count": compact_ints(chunk["batter_count"].to_numpy()),
+                        "pitch_x": chunk["pitch_x"].to_numpy(float),
+                        "pitch_z": chunk["pitch_z"].to_numpy(float),
+                        "weight": compact_ints(weights),
+                    }
+                )
+            )
+        elif table == "distance":
+            chunk = chunk[(chunk["distance"] > 0).to_numpy()]
+            weights, _ = self._weights(table, chunk)
+            weighted = pd.DataFrame(
+                {
+                    "batter": chunk["batter"].to_numpy(),
+                    "n": weights,
+                    "sum": weights * chunk["distance"].to_numpy(float),
+                }
+            ).groupby("batter")[["n", "sum"]].sum()
+            mean = weighted["sum"] / weighted["n"]
+            deviations = chunk["distance"].to_numpy(float) - mean.reindex(
+                chunk["batter"]
+            ).to_numpy()
+            m2 = pd.Series(weights * deviations**2).groupby(
+                chunk["batter"].to_numpy()
+            ).sum()
+            self.moments = merge_moment_frames(
+                self.moments, pd.DataFrame({"n": weighted["n"], "mean": mean, "m2": m2})
+            )
+        elif table == "tracking":
+            chunk = chunk[chunk["track_angle"].notnull().to_numpy()]
+            weights, repeats = self._weights(table, chunk)
+            angles = chunk["track_angle"].to_numpy(float)
+            groups = angle_groups(angles, self.angle_ranges)
+            group_counts = (
+                pd.Series(weights)
+                .groupby([chunk["batter"].to_numpy(), groups])
+                .sum()
+                .unstack(fill_value=0)
+                .reindex(columns=self.group_counts.columns, fill_value=0)
+            )
+            self.group_counts = add_counts(self.group_counts, group_counts)
+            self.track.append(
+                pd.DataFrame(
+                    {
+                        "batter": chunk["batter"].to_numpy(),
+                        "batter_count": compact_ints(chunk["batter_count"].to_numpy()),
+                        "score": angle_scores(self.angle_ranges, angles).astype(np.int8),
+                        "outer": compact_ints(repeats[:, :2].prod(axis=1)),
+                        "inner": compact_ints(repeats[:, 3]),
+                    }
+                )
+            )
+        else:
+            contact_locs = chunk["contact_y_loc"].to_numpy(float)
+            weights, _ = self._weights(table, chunk)
+            # missing locations count as swings scoring 0, like in the merged swings
+            weights = weights * (contact_locs != 0.0)
+            contact = pd.DataFrame(
+                {
+                    "swing_count": weights,
+                    "contact_score": weights
+                    * contact_scores(self.contact_location_values, contact_locs),
+                }
+            ).groupby(chunk["batter"].to_numpy()).sum()
+            self.contact = add_counts(self.contact, contact)
+        self._bounds = None
+
+    def merge(self, other):
+        """
+        Add the state collected from later chunks by another accumulator.
+
+        Args:
+            other (ScorecardAccumulator): Accumulator with the same scoring values
+                and swing counts.
+        """
+        for table, key_counts in other._key_counts.items():
+            self._key_counts[table] = add_key_counts(self._key_counts[table], key_counts)
+        self.contact = add_counts(self.contact, other.contact)
+        self.group_counts = add_counts(self.group_counts, other.group_counts)
+        self.moments = merge_moment_frames(self.moments, other.moments)
+        self.good_counts = add_counts(self.good_counts, other.good_counts)
+        self.track.extend(other.track)
+        self.points.extend(other.points)
+        self._bounds = None
+
+    def similarity_bounds(self):
+        """
+        Get the mean +/- 2 std bounds of each batter's distances, which a second
+        pass over the distance table uses to count the non-outlier swings.
+
+        Returns:
+            pd.DataFrame: The 'min' and 'max' distance of each batter with positive
+            distances.
+        """
+        if self._bounds is None:
+            moments = self.moments[self.moments["n"] > 0]
+            std = (moments["m2"] / moments["n"]) ** 0.5
+            self._bounds = pd.DataFrame(
+                {"min": moments["mean"] - 2 * std, "max": moments["mean"] + 2 * std}
+            )
+        return self._bounds
+
+    def add_similarity_chunk(self, chunk):
+        """
+        Count the non-outlier swings of a distance table chunk. Every chunk of every
+        table must be added with add_chunk first.
+
+        Args:
+            chunk (pd.DataFrame): Rows of the distance table.
+        """
+        chunk = chunk.dropna(subset=["batter"])
+        chunk = chunk[(chunk["distance"] > 0).to_numpy()]
+        bounds = self.similarity_bounds().reindex(chunk["batter"])
+        distances = chunk["distance"].to_numpy(float)
+        good = (bounds["min"].to_numpy() < distances) & (distances < bounds["max"].to_numpy())
+        weights, _ = self._weights("distance", chunk)
+        good_counts = pd.Series(weights * good).groupby(chunk["batter"].to_numpy()).sum()
+        self.good_counts = add_counts(self.good_counts, good_counts)
+
+    @staticmethod
+    def _sort_buffer(chunks):
+        # one chunk of every buffered row, sorted by swing like the merged swings
+        if not chunks:
+            return chunks
+        buffer = pd.concat(chunks, ignore_index=True)
+        chunks.clear()
+        order = np.lexsort(
+            (buffer["batter_count"].to_numpy(), buffer["batter"].to_numpy())
+        )
+        return [buffer.take(order).reset_index(drop=True)]
+
+    @staticmethod
+    def _batter_buffers(chunks):
+        # each batter's rows of a sorted buffer
+        if not chunks or chunks[0].empty:
+            return
+        columns = {column: values.to_numpy() for column, values in chunks[0].items()}
+        batters = columns["batter"]
+        starts = np.flatnonzero(np.append(True, batters[1:] != batters[:-1]))
+        ends = np.append(starts[1:], len(batters))
+        for start, end in zip(starts, ends):
+            yield batters[start], {
+                column: values[start:end] for column, values in columns.items()
+            }
+
+    def scorecard(self, hunting_values, sim_values):
+        """
+        Score every batter.
+
+        Args:
+            hunting_values (list): Custom values for swing map (hunting) scoring.
+            sim_values (list): Custom values for swing similarity scoring.
+
+        Returns:
+            pd.DataFrame: DataFrame containing the scorecard.
+        """
+        # each metric's scorecard is built before the next one, like score_metrics
+        timing_list = []
+        contact = self.contact[self.contact["swing_count"] > 0]
+        for batter, swing_count, contact_score in contact.itertuples():
+            timing_list.append(
+                {
+                    "batter": batter,
+                    **summarize_contact_loc(int(swing_count), int(contact_score)),
+                }
+            )
+        timing_score_df = pd.DataFrame.from_dict(timing_list)
+
+        tracking_list = []
+        self.track = self._sort_buffer(self.track)
+        for batter, track in self._batter_buffers(self.track):
+            group_counts = self.group_counts.loc[batter].to_numpy()
+            total = int(group_counts.sum())
+            angle_freqs = [(g, int(count) / total) for g, count in enumerate(group_counts)]
+            scores = merged_order(
+                track["batter_count"], track["score"], track["outer"], track["inner"]
+            )
+            tracking_list.append(
+                {"batter": batter, **summarize_tracking(angle_freqs, scores.tolist())}
+            )
+        tracking_score_df = pd.DataFrame.from_dict(tracking_list)
+        del tracking_list
+
+        hunting_list = []
+        self.points = self._sort_buffer(self.points)
+        for batter, points in self._batter_buffers(self.points):
+            # swing map rows come first in the merge, so only later tables repeat them
+            weights = points["weight"]
+            if weights.sum() > 1:
+                batter_df = pd.DataFrame(
+                    {
+                        "pitch_x": np.repeat(points["pitch_x"], weights),
+                        "pitch_z": np.repeat(points["pitch_z"], weights),
+                    }
+                )
+                hunting_list.append(
+                    {"batter": batter, **summarize_hunting(hunting_values, batter_df)}
+                )
+        hunting_score_df = pd.DataFrame.from_dict(hunting_list)
+        del hunting_list
+
+        similarity_list = []
+        moments = self.moments[self.moments["n"] > 0]
+        good_counts = self.good_counts.reindex(moments.index, fill_value=0)
+        for batter, dist_count in moments["n"].items():
+            similarity_list.append(
+                {
+                    "batter": batter,
+                    **summarize_similarity(
+                        sim_values, int(dist_count), int(good_counts[batter])
+                    ),
+                }
+            )
+        similarity_score_df = pd.DataFrame.from_dict(similarity_list)
+
+        return combine_scorecards(
+            timing_score_df, tracking_score_df, hunting_score_df, similarity_score_df
+        )
+
+
+def chunked_scorecard(
+    data_folder,
+    contact_location_values,
+    track_angle_values,
+    hunting_values,
+    sim_values,
+    chunksize=100_000,
+):
+    """
+    Generate the same scorecard as generate_scorecard by streaming the metric tables
+    in chunks instead of loading and merging them. Memory still grows with the number
+    of swings: the per-swing score lists need a buffer entry for every swing, see
+    ScorecardAccumulator. The tables are read once for their keys, then for their
+    metrics, and the distances a third time for the outlier bounds.
+
+    Args:
+        data_folder (str): Path to the folder containing metric data files.
+        contact_location_values (list): Custom values for contact location scoring.
+        track_angle_values (list): Custom values for track angle scoring.
+        hunting_values (list): Custom values for swing map (hunting) scoring.
+        sim_values (list): Custom values for swing similarity scoring.
+        chunksize (int, optional): Rows read per chunk. Defaults to 100,000.
+
+    Returns:
+        pd.DataFrame: DataFrame containing the scorecard.
+    """
+    accumulator = ScorecardAccumulator(contact_location_values, track_angle_values)
+    for table in TABLE_NAMES:
+        for chunk in read_metric_chunks(data_folder, table, chunksize, keys_only=True):
+            accumulator.add_keys(table, chunk)
+    accumulator.count_swings()
+    for table in TABLE_NAMES:
+        for chunk in read_metric_chunks(data_folder, table, chunksize):
+            accumulator.add_chunk(table, chunk)
+    # the outlier bounds need every distance, so the distances are read a second time
+    for chunk in read_metric_chunks(data_folder, "distance", chunksize):
+        accumulator.add_similarity_chunk(chunk)
+    return accumulator.scorecard(hunting_values, sim_values)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score batters from chunked metric tables")
+    parser.add_argument("--data-folder", default="../data/dataframes")
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+    scorecard_df = chunked_scorecard(
+        args.data_folder, *DEFAULT_THRESHOLDS.values(), chunksize=args.chunksize
+    )
+    if args.output:
+        scorecard_df.to_csv(args.output)
+    else:
+        print(scorecard_df)
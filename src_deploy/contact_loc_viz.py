@@ -0,0 +1,211 @@
+import pandas as pd
+import seaborn as sns
+import matplotlib.pyplot as plt
+from matplotlib.patches import Rectangle, Polygon
+from matplotlib.lines import Line2D
+from contact_loc import contact_loc_scorecard
+from utils import color_letter
+from figures import new_or_reused_axes
+from stage_timer import stage_timer
+
+# zone colors from the front of the plate to the back, the outer zones are ungraded
+ZONE_COLORS = ['white', 'green', 'blue', 'orange', 'red', 'white']
+
+def draw_home_plate(ax):
+    """
+    Widens the x axis to fit the plate and draws home plate, scaled so it keeps its
+    shape whatever the y axis range is.
+
+    Args:
+        ax (matplotlib.axes.Axes): The axes to draw on.
+
+    Returns:
+        matplotlib.patches.Polygon: The home plate patch.
+    """
+    # Get aspect ratio
+    y_max = ax.get_ylim()[-1]
+    x_min = min(ax.get_xlim()[0], -1.5)
+    x_max = max(ax.get_xlim()[-1], 2)
+    x_len = x_max - x_min
+    y_one_foot = y_max/x_len
+    y_mid = y_max/2
+    ax.set_xlim(x_min, x_max)
+
+    # Draw home plate (simple representation)
+    home_plate = Polygon([
+        (0, -0.708 * y_one_foot + y_mid), 
+        (0, 0.708 * y_one_foot + y_mid), 
+        (-0.667, 0.708 * y_one_foot + y_mid), 
+        (-1.2, 0 + y_mid), 
+        (-0.667, -0.708 * y_one_foot + y_mid)], color='gray', zorder=0.2)
+    ax.add_patch(home_plate)
+    return home_plate
+
+def draw_quality_locations(ax, quality_locations):
+    """
+    Colors the quality location zones across the current x axis range.
+
+    Args:
+        ax (matplotlib.axes.Axes): The axes to draw on.
+        quality_locations (list): List of quality location thresholds.
+
+    Returns:
+        list: The zone rectangles from the front of the plate to the back.
+    """
+    x_min, x_max = ax.get_xlim()
+    ranges = [
+        (x_max, quality_locations[0]),
+        (quality_locations[0], quality_locations[1]),
+        (quality_locations[1], quality_locations[2]),
+        (quality_locations[2], quality_locations[3]),
+        (quality_locations[3], quality_locations[4]),
+        (quality_locations[4], x_min),
+    ]
+    zone_patches = []
+    for i, range in enumerate(ranges):
+        right = range[0] - 0.02
+        left = range[1]
+        width = right - left
+        height = 10 
+        rect = Rectangle((left, 0), width, height, 
+                         fill=True, color=ZONE_COLORS[i], alpha=0.1,
+                         linewidth=3, linestyle='', zorder=0.1)
+        ax.add_patch(rect)
+        zone_patches.append(rect)
+    return zone_patches
+
+def quality_locations_legend(ax, handles):
+    """
+    Adds the quality locations legend to the right of the plot.
+
+    Args:
+        ax (matplotlib.axes.Axes): The axes to draw on.
+        handles (list): One legend handle per graded zone.
+
+    Returns:
+        matplotlib.legend.Legend: The legend.
+    """
+    return ax.legend(handles, ['Grade A', 'Grade B', 'Grade C', 'Grade D'],
+                     loc='upper left', bbox_to_anchor=(1, 0.8), fontsize=14,
+                     title='Quality Locations', title_fontsize=18)
+
+def contact_preview_background(fig):
+    """
+    Draws the static background of the contact location customization plot,
+    everything except the quality location zones, see figures.LayeredFigure.
+
+    Args:
+        fig (matplotlib.figure.Figure): The figure to draw on.
+
+    Returns:
+        tuple: The axes and the background artists that sit above the zones.
+    """
+    fig.set_size_inches([fig_size * 1.5 for fig_size in (6.4, 4.8)])
+    ax = fig.subplots()
+    home_plate = draw_home_plate(ax)
+    legend_handles = [
+        Rectangle((0, 0), 1, 1, fill=True, color=color, alpha=0.1,
+                  linewidth=3, linestyle='')
+        for color in ZONE_COLORS[1:-1]
+    ]
+    quality_locations_legend(ax, legend_handles)
+    ax.set_title('Contact Location ', {'size': 22})
+    ax.set_xlabel('Contact Location (ft)', {'size': 18})
+    ax.set_ylabel('Swing Frequencies', {'size': 18})
+    fig.tight_layout(pad=3)
+    return ax, [home_plate]
+
+@stage_timer.timed()
+def viz_contact_loc(batter_df, grade, quality_locations, fig=None, kde_curve=None):
+    """
+    Visualizes the contact location of a batter with quality locations highlighted.
+
+    Args:
+        batter_df (pandas.DataFrame): DataFrame containing batter's swing data.
+        grade (str): The grade to display on the plot.
+        quality_locations (list): List of quality location thresholds.
+        fig (matplotlib.figure.Figure, optional): Existing figure to clear and draw on
+            instead of creating a new pyplot figure.
+        kde_curve (tuple, optional): Precomputed (grid, density) curve for the batter,
+            see kde.ContactKde. When missing the density is estimated with seaborn.
+
+    Returns:
+        matplotlib.figure.Figure: The generated matplotlib figure.
+    """
+    font1 = {'size':22}
+    font2 = {'size':18}
+    font3 = {'size':14}
+
+    # Create figure and adjust size
+    default_fig_size = (6.4, 4.8)
+    size_adjust = 1.5
+    larger_fig_size = [fig_size * size_adjust for fig_size in default_fig_size]
+    fig, ax = new_or_reused_axes(fig, larger_fig_size)
+
+    # Plot batter swing KDE
+    if batter_df is not None: 
+        batter_id = batter_df['batter'].iloc[0]
+        if kde_curve is not None:
+            grid, density = kde_curve
+            # match the look of seaborn's stacked kdeplot
+            kde = ax.fill_between(grid, density, facecolor='C0', edgecolor='black',
+                                  alpha=0.75, linewidth=1)
+            kde.sticky_edges.x[:] = (grid[0], grid[-1])
+            kde.sticky_edges.y[:] = (0, float('inf'))
+        else:
+            kde = sns.kdeplot(data=batter_df, x='contact_y_loc', multiple='stack',
+                            fill=True, bw_adjust=0.3, ax=ax)
+
+    home_plate = draw_home_plate(ax)
+    x_min, x_max = ax.get_xlim()
+    y_min = ax.get_ylim()[0]
+
+    # Color the quality locations
+    legend_patches = draw_quality_locations(ax, quality_locations)
+
+    # Add two legends
+    quality_legend = quality_locations_legend(ax, legend_patches[1:-1])
+
+    if batter_df is not None:
+        ax.add_artist(quality_legend)
+        kde_legend = ax.legend([Line2D([0], [0], color='blue', lw=4)], ['Swing Frequency'],
+                                loc='upper left', bbox_to_anchor=(1, 1),
+                                fontsize=font3['size'], title='Swing Locations',
+                                title_fontsize=font2['size'])
+        
+        ax.text(x_min+0.1, y_min+0.1, grade, fontsize=60, color=color_letter(grade))
+        subtitle = f'\n Batter: {batter_id}'
+    else:
+        subtitle = ""
+    
+    # Add titles and labels
+    ax.set_title(f'Contact Location {subtitle}', font1)
+    ax.set_xlabel('Contact Location (ft)', font2)
+    ax.set_ylabel('Swing Frequencies', font2)
+
+    fig.tight_layout(pad=3)
+    return fig
+
+
+if __name__ == '__main__':
+
+    timing_metrics_df = pd.read_csv('../data/dataframes/timing_metrics_df.csv')
+    qual_locs = [1.5, 0.9, 0.2, -0.5, -1.0]
+    timing_score_df = contact_loc_scorecard(qual_locs, timing_metrics_df)
+
+    batter_list = [849653732, 558675411]
+        # when ready, create a list of all batters in scorecard_df and loop through
+            # need to add code to save the resulting plots
+    for batter_id in batter_list:
+        batter_df = timing_metrics_df[
+            (timing_metrics_df['batter'] == batter_id) 
+            & 
+            (timing_metrics_df['contact_y_loc'] != 0.0)
+        ]
+        grade = timing_score_df[timing_score_df['batter'] == batter_id]['timing_grade'].values[0]
+        fig = viz_contact_loc(batter_df, grade, qual_locs)
+        # plt.show()
+        plt.savefig(f'../images/grades/{batter_id}_contact_location.png')
+
+    widget_fig = viz_contact_loc(None, None, qual_locs)
+    plt.show()
\ No newline at end of file
@@ -0,0 +1,496 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+from contact_loc import contact_loc_scorecard
+from hunt import hunt_scorecard
+from similarity import similarity_scorecard
+from track_angle import create_tracking_score_df
+from scorecard import generate_scorecard, merge_metrics, score_metrics, DEFAULT_THRESHOLDS
+import reference_scorecard as reference
+from schema import load_compact_metrics
+from chunked_scorecard import chunked_scorecard
+from live_scorecard import LiveScorecard
+from partitioned_scorecard import partitioned_scorecard
+from synthetic_data import generate_metric_tables
+from benchmark import time_call
+from memory_profile import MemoryProfile
+
+# scorecard columns of each metric, the grade last
+METRIC_COLUMNS = {
+    "timing": ["swing_count", "timing_avg", "timing_grade"],
+    "tracking": ["angle_freqs", "angle_scores", "track_angle_grade"],
+    "hunting": [
+        "max_swing_dist",
+        "max_swing_pair",
+        "geometric_median",
+        "point_distances",
+        "distance_scores",
+        "avg_score",
+        "hunting_grade",
+    ],
+    "similarity": ["dist_score", "dist_grade"],
+}
+# scores are close within these tolerances, the absolute one covers the geometric
+# median, which is only found to within 1e-5 and can start from another guess
+RTOL = 1e-6
+ATOL = 1e-4
+
+
+def metric_functions(
+    contact_loc_scorecard, create_tracking_score_df, hunt_scorecard, similarity_scorecard
+):
+    """
+    Key the scoring function of each metric by name, each called with the merged
+    metrics and the thresholds.
+    """
+    return {
+        "contact_loc_scorecard": (
+            "timing",
+            lambda merged_df, thresholds: contact_loc_scorecard(
+                thresholds["contact_location"], merged_df
+            ),
+        ),
+        "tracking_scorecard": (
+            "tracking",
+            lambda merged_df, thresholds: create_tracking_score_df(
+                thresholds["track_angle"], merged_df
+            ),
+        ),
+        "hunt_scorecard": (
+            "hunting",
+            lambda merged_df, thresholds: hunt_scorecard(thresholds["hunting"], merged_df),
+        ),
+        "similarity_scorecard": (
+            "similarity",
+            lambda merged_df, thresholds: similarity_scorecard(
+                thresholds["similarity"], merged_df
+            ),
+        ),
+    }
+
+
+# the original scoring functions, frozen in reference_scorecard, and the current ones
+REFERENCE_FUNCTIONS = metric_functions(
+    reference.contact_loc_scorecard,
+    reference.create_tracking_score_df,
+    reference.hunt_scorecard,
+    reference.similarity_scorecard,
+)
+METRIC_FUNCTIONS = metric_functions(
+    contact_loc_scorecard, create_tracking_score_df, hunt_scorecard, similarity_scorecard
+)
+
+
+def live_scorecard(data_folder, *threshold_values):
+    """
+    Score the merged metrics one swing at a time with a LiveScorecard.
+    """
+    live = LiveScorecard(*threshold_values)
+    live.update_many(merge_metrics(data_folder))
+    return live.scorecard()
+
+
+def local_partitioned_scorecard(data_folder, *threshold_values):
+    """
+    Score batter partitions on one worker, in a temporary work folder.
+    """
+    with tempfile.TemporaryDirectory(prefix="equivalence_") as work_folder:
+        return partitioned_scorecard(
+            data_folder, work_folder, *threshold_values, partitions=4, workers=1
+        )
+
+
+def compact_scorecard(data_folder, *threshold_values):
+    """
+    Score the merged metrics loaded with the compact schema.
+    """
+    return score_metrics(load_compact_metrics(data_folder), *threshold_values)
+
+
+# optimized implementations checked against the reference, each called like
+# generate_scorecard with the data folder and the thresholds of each metric
+OPTIMIZED_SCORECARDS = {
+    "chunked_scorecard": chunked_scorecard,
+    "live_scorecard": live_scorecard,
+    "partitioned_scorecard": local_partitioned_scorecard,
+    "compact_scorecard": compact_scorecard,
+}
+
+# the data scale the time budgets hold at, ten times the sample data's batters
+BUDGET_BATTERS = 310
+# wall time budgets in seconds (median of the timed calls) at BUDGET_BATTERS
+TIME_BUDGETS = {
+    "merge_metrics": 0.5,
+    "contact_loc_scorecard": 1.0,
+    "tracking_scorecard": 3.0,
+    "hunt_scorecard": 3.0,
+    "similarity_scorecard": 1.0,
+    "chunked_scorecard": 4.0,
+    "live_scorecard": 4.0,
+    "partitioned_scorecard": 8.0,
+    "compact_scorecard": 6.0,
+}
+# optimized scorecards whose peak memory must stay below generate_scorecard's. This
+# only compares peaks on one data folder, it doesn't show that memory is bounded.
+MEMORY_CHECKED = ["chunked_scorecard"]
+
+
+def reference_scorecards(merged_df, thresholds):
+    """
+    Score the merged metrics with the original scoring functions.
+
+    Args:
+        merged_df (pd.DataFrame): Merged swing metrics, see merge_metrics.
+        thresholds (dict): Grading thresholds keyed like DEFAULT_THRESHOLDS.
+
+    Returns:
+        dict: The scorecard of each metric keyed like METRIC_COLUMNS.
+    """
+    return {
+        metric: function(merged_df, thresholds)
+        for metric, function in REFERENCE_FUNCTIONS.values()
+    }
+
+
+def values_close(expected, actual):
+    """
+    Check whether two scorecard values match, numbers within RTOL and ATOL and
+    sequences of numbers element-wise.
+
+    Args:
+        expected: The reference value.
+        actual: The value to check.
+
+    Returns:
+        bool: Whether the values match.
+    """
+    if expected is None or actual is None:
+        return expected is None and actual is None
+    if isinstance(expected, str) or isinstance(actual, str):
+        return expected == actual
+    try:
+        expected = np.asarray(expected, dtype=float)
+        actual = np.asarray(actual, dtype=float)
+    except (TypeError, ValueError):
+        return expected == actual
+    if expected.shape != actual.shape:
+        return False
+    return bool(np.allclose(expected, actual, rtol=RTOL, atol=ATOL, equal_nan=True))
+
+
+def compare_metric(metric, expected_df, scorecard_df):
+    """
+    Compare one metric of a scorecard with the reference.
+
+    Args:
+        metric (str): The metric, keyed like METRIC_COLUMNS.
+        expected_df (pd.DataFrame): The reference scorecard of the metric.
+        scorecard_df (pd.DataFrame): The scorecard to check.
+
+    Returns:
+        list: A description of each mismatch, empty when the metric matches.
+    """
+    columns = METRIC_COLUMNS[metric]
+    grade = columns[-1]
+    if grade not in scorecard_df:
+        scored = pd.DataFrame(columns=["batter"] + columns)
+    else:
+        scored = scorecard_df.dropna(subset=[grade])
+    expected = expected_df.set_index("batter") if "batter" in expected_df else None
+    actual = scored.set_index("batter")
+    expected_batters = set() if expected is None else set(expected.index)
+    mismatches = []
+    missing = expected_batters - set(actual.index)
+    extra = set(actual.index) - expected_batters
+    if missing:
+        mismatches.append(f"{metric}: {len(missing)} batters not scored, e.g. {min(missing)}")
+    if extra:
+        mismatches.append(f"{metric}: {len(extra)} extra batters scored, e.g. {min(extra)}")
+    for batter in sorted(expected_batters & set(actual.index)):
+        for column in columns:
+            expected_value = expected.at[batter, column]
+            actual_value = actual.at[batter, column]
+            if column == grade:
+                same = expected_value == actual_value
+            elif column == "max_swing_pair" and actual_value is not None:
+                # the same pair can be found in either order
+                same = values_close(expected_value, actual_value) or values_close(
+                    expected_value, actual_value[::-1]
+                )
+            else:
+                same = values_close(expected_value, actual_value)
+            if not same:
+                mismatches.append(
+                    f"{metric}: batter {batter} {column} is {actual_value!r}, "
+                    f"expected {expected_value!r}"
+                )
+    return mismatches
+
+
+def compare_merged(expected_df, merged_df):
+    """
+    Compare merged swing metrics with the reference merge's.
+
+    Args:
+        expected_df (pd.DataFrame): Swing metrics merged by the original merge_metrics.
+        merged_df (pd.DataFrame): Swing metrics merged by merge_metrics' default join.
+
+    Returns:
+        list: A description of the difference, empty when the frames are identical.
+    """
+    try:
+        pd.testing.assert_frame_equal(expected_df, merged_df)
+    except AssertionError as error:
+        return [f"merge_metrics: {' '.join(str(error).split())}"]
+    return []
+
+
+def check_equivalence(data_folder, thresholds=None, scorecards=None):
+    """
+    Merge and score a data folder with the original functions, the current scoring
+    function of each metric and every optimized implementation, and compare the
+    results with the original's.
+
+    Args:
+        data_folder (str): Path to the folder containing metric data files.
+        thresholds (dict, optional): Grading thresholds keyed like
+            DEFAULT_THRESHOLDS. Defaults to DEFAULT_THRESHOLDS.
+        scorecards (dict, optional): The implementations to check, keyed by name.
+            Defaults to OPTIMIZED_SCORECARDS.
+
+    Returns:
+        dict: The mismatches of merge_metrics, each metric function and each
+        implementation, empty lists when it matches.
+    """
+    thresholds = thresholds or DEFAULT_THRESHOLDS
+    scorecards = scorecards or OPTIMIZED_SCORECARDS
+    threshold_values = [thresholds[key] for key in DEFAULT_THRESHOLDS]
+    expected_df = reference.merge_metrics(data_folder)
+    expected = reference_scorecards(expected_df, thresholds)
+    merged_df = merge_metrics(data_folder)
+    mismatches = {"merge_metrics": compare_merged(expected_df, merged_df)}
+    for name, (metric, function) in METRIC_FUNCTIONS.items():
+        mismatches[name] = compare_metric(
+            metric, expected[metric], function(merged_df, thresholds)
+        )
+    for name, function in scorecards.items():
+        scorecard_df = function(data_folder, *threshold_values)
+        mismatches[name] = [
+            mismatch
+            for metric, expected_df in expected.items()
+            for mismatch in compare_metric(metric, expected_df, scorecard_df)
+        ]
+    return mismatches
+
+
+def check_budgets(data_folder, thresholds=None, budgets=None, repeats=3, scorecards=None):
+    """
+    Time merge_metrics, the current metric functions and the optimized implementations
+    on a data folder and check them against their time budgets.
+
+    Args:
+        data_folder (str): Path to the folder containing metric data files.
+        thresholds (dict, optional): Grading thresholds keyed like
+            DEFAULT_THRESHOLDS. Defaults to DEFAULT_THRESHOLDS.
+        budgets (dict, optional): Wall time budgets in seconds keyed by function
+            name, functions without one are only timed. Defaults to TIME_BUDGETS.
+        repeats (int, optional): Timed calls per function. Defaults to 3.
+        scorecards (dict, optional): The optimized implementations to time, keyed by
+            name. Defaults to OPTIMIZED_SCORECARDS.
+
+    Returns:
+        dict: The timings of each function (see benchmark.time_call) with its
+        'budget' and whether it is 'within_budget'.
+    """
+    thresholds = thresholds or DEFAULT_THRESHOLDS
+    budgets = TIME_BUDGETS if budgets is None else budgets
+    scorecards = scorecards or OPTIMIZED_SCORECARDS
+    threshold_values = [thresholds[key] for key in DEFAULT_THRESHOLDS]
+    merged_df = merge_metrics(data_folder)
+    functions = {"merge_metrics": lambda: merge_metrics(data_folder)}
+    functions.update(
+        {
+            name: (lambda function=function: function(merged_df, thresholds))
+            for name, (_, function) in METRIC_FUNCTIONS.items()
+        }
+    )
+    functions.update(
+        {
+            name: (lambda function=function: function(data_folder, *threshold_values))
+            for name, function in scorecards.items()
+        }
+    )
+    timings = dict()
+    for name, function in functions.items():
+        timing = time_call(function, repeats)
+        timing["budget"] = budgets.get(name)
+        timing["within_budget"] = timing["budget"] is None or timing["median"] <= timing["budget"]
+        timings[name] = timing
+    return timings
+
+
+def check_memory(data_folder, thresholds=None, scorecards=None):
+    """
+    Measure the peak memory of generate_scorecard and the implementations meant to
+    use less on a data folder.
+
+    Args:
+        data_folder (str): Path to the folder containing metric data files.
+        thresholds (dict, optional): Grading thresholds keyed like
+            DEFAULT_THRESHOLDS. Defaults to DEFAULT_THRESHOLDS.
+        scorecards (list, optional): Names of the OPTIMIZED_SCORECARDS to measure.
+            Defaults to MEMORY_CHECKED.
+
+    Returns:
+        dict: The 'peak' bytes of each implementation, the 'reference_peak' of
+        generate_scorecard and whether it is 'within_reference'.
+    """
+    thresholds = thresholds or DEFAULT_THRESHOLDS
+    scorecards = MEMORY_CHECKED if scorecards is None else scorecards
+    threshold_values = [thresholds[key] for key in DEFAULT_THRESHOLDS]
+    profile = MemoryProfile(top=0)
+    with profile.tracing():
+        profile.run("generate_scorecard", generate_scorecard, data_folder, *threshold_values)
+        for name in scorecards:
+            profile.run(name, OPTIMIZED_SCORECARDS[name], data_folder, *threshold_values)
+    reference_peak, *peaks = [stage["peak"] for stage in profile.stages]
+    return {
+        name: {
+            "peak": peak,
+            "reference_peak": reference_peak,
+            "within_reference": peak < reference_peak,
+        }
+        for name, peak in zip(scorecards, peaks)
+    }
+
+
+def run_harness(
+    data_folders=None,
+    batters=BUDGET_BATTERS,
+    seed=0,
+    work_folder=None,
+    repeats=3,
+    thresholds=None,
+    budgets=None,
+):
+    """
+    Check the optimized implementations against the reference on the given data and
+    on synthetic data at the budget scale, and time them there.
+
+    Args:
+        data_folders (list, optional): Folders of metric data to check equivalence on.
+            Defaults to the sample data.
+        batters (int, optional): Batters of the synthetic data. Defaults to
+            BUDGET_BATTERS.
+        seed (int, optional): Random seed of the synthetic data. Defaults to 0.
+        work_folder (str, optional): Folder the synthetic data is written to, reused
+            when it already holds it. Defaults to a temporary folder.
+        repeats (int, optional): Timed calls per function, 0 skips the budgets and
+            the memory check. Defaults to 3.
+        thresholds (dict, optional): Grading thresholds keyed like
+            DEFAULT_THRESHOLDS. Defaults to DEFAULT_THRESHOLDS.
+        budgets (dict, optional): Wall time budgets in seconds keyed by function
+            name. Defaults to TIME_BUDGETS.
+
+    Returns:
+        dict: The 'mismatches' of each implementation in each data folder, and the
+        'timings' and 'memory' peaks at the budget scale.
+    """
+    data_folders = data_folders or ["../data/dataframes"]
+    work_folder = work_folder or tempfile.mkdtemp(prefix="equivalence_")
+    synthetic_folder = os.path.join(work_folder, f"batters_{batters}_seed_{seed}")
+    if not os.path.exists(os.path.join(synthetic_folder, "swing_map_metrics_df.csv")):
+        generate_metric_tables(synthetic_folder, batters, seed=seed)
+    report = {
+        "mismatches": {
+            folder: check_equivalence(folder, thresholds)
+            for folder in data_folders + [synthetic_folder]
+        },
+        "timings": dict(),
+        "memory": dict(),
+    }
+    if repeats:
+        report["timings"] = check_budgets(synthetic_folder, thresholds, budgets, repeats)
+        report["memory"] = check_memory(synthetic_folder, thresholds)
+    return report
+
+
+def assert_report(report):
+    """
+    Raise when an implementation doesn't match the reference, a function is over
+    its time budget or a memory bounded implementation peaks above the reference.
+
+    Args:
+        report (dict): The report of run_harness.
+
+    Raises:
+        AssertionError: Listing every mismatch, budget overrun and memory overrun.
+    """
+    failures = [
+        f"{name} on {folder}: {mismatch}"
+        for folder, folder_mismatches in report["mismatches"].items()
+        for name, mismatches in folder_mismatches.items()
+        for mismatch in mismatches[:10]
+    ]
+    failures.extend(
+        f"{name} took {timing['median']:.2f} s, over its {timing['budget']:.2f} s budget"
+        for name, timing in report["timings"].items()
+        if not timing["within_budget"]
+    )
+    failures.extend(
+        f"{name} peaked at {memory['peak'] / 2**20:.2f} MiB, over generate_scorecard's "
+        f"{memory['reference_peak'] / 2**20:.2f} MiB"
+        for name, memory in report.get("memory", dict()).items()
+        if not memory["within_reference"]
+    )
+    if failures:
+        raise AssertionError("\n".join(failures))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Check the optimized scorecards against the reference implementation"
+    )
+    parser.add_argument("--data-folder", nargs="+", default=["../data/dataframes"])
+    parser.add_argument("--batters", type=int, default=BUDGET_BATTERS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--work-folder", default=None)
+    parser.add_argument(
+        "--repeats",
+        type=int,
+        default=3,
+        help="timed calls per function, 0 skips budgets and memory",
+    )
+    parser.add_argument("--output", default=None, help="JSON file of the report")
+    args = parser.parse_args()
+
+    report = run_harness(
+        args.data_folder, args.batters, args.seed, args.work_folder, args.repeats
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    for folder, folder_mismatches in report["mismatches"].items():
+        for name, mismatches in folder_mismatches.items():
+            print(f"{name} on {folder}: {'ok' if not mismatches else mismatches[0]}")
+    for name, timing in report["timings"].items():
+        budget = timing["budget"]
+        print(
+            f"{name}: {timing['median']:.3f} s"
+            + (f" (budget {budget:.2f} s)" if budget is not None else "")
+            + ("" if timing["within_budget"] else " OVER BUDGET")
+        )
+    for name, memory in report["memory"].items():
+        print(
+            f"{name}: peak {memory['peak'] / 2**20:.2f} MiB "
+            f"(generate_scorecard {memory['reference_peak'] / 2**20:.2f} MiB)"
+        )
+    try:
+        assert_report(report)
+    except AssertionError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,130 @@
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from PIL import Image
+
+
+def new_or_reused_axes(fig, fig_size):
+    """
+    Get a figure and a single axes to draw on, either by clearing an existing figure
+    or by creating a new pyplot figure.
+
+    Args:
+        fig (matplotlib.figure.Figure): Figure to reuse, or None to create one.
+        fig_size (list): The figure size in inches.
+
+    Returns:
+        tuple: The figure and its axes.
+    """
+    if fig is None:
+        return plt.subplots(figsize=fig_size)
+    fig.clear()
+    fig.set_size_inches(fig_size)
+    return fig, fig.subplots()
+
+
+class FigureSlots:
+    """
+    Persistent figures reused across reruns, one per named slot. The figures are
+    created without pyplot, so they are never held by the pyplot registry and the
+    number of live figures stays fixed at one per slot.
+    """
+
+    def __init__(self):
+        self._figures = dict()
+        self._layers = dict()
+
+    def __len__(self):
+        return len(self._figures)
+
+    def get(self, name):
+        """
+        Get the figure for a slot, creating it on first use.
+
+        Args:
+            name (str): The slot name.
+
+        Returns:
+            matplotlib.figure.Figure: The slot's figure.
+        """
+        if name not in self._figures:
+            self._figures[name] = Figure()
+        return self._figures[name]
+
+    def replace_layer(self, name, layer, artists):
+        """
+        Swap the artists of one layer of a slot's figure, removing the artists the
+        layer drew last time so only the changed parts of the figure are redrawn.
+
+        Args:
+            name (str): The slot name.
+            layer (str): The layer name (e.g. 'overlay').
+            artists (list): The newly drawn artists of the layer.
+        """
+        for artist in self._layers.get((name, layer), []):
+            artist.remove()
+        self._layers[(name, layer)] = list(artists)
+
+    def clear_layers(self, name):
+        """
+        Forget the layers of a slot, used after its figure has been cleared.
+
+        Args:
+            name (str): The slot name.
+        """
+        for key in [key for key in self._layers if key[0] == name]:
+            del self._layers[key]
+
+    def close(self):
+        """
+        Release every slot figure.
+        """
+        for fig in self._figures.values():
+            fig.clear()
+        self._figures.clear()
+        self._layers.clear()
+
+
+class LayeredFigure:
+    """
+    A figure split into a static background that is rendered once and a cheap overlay
+    layer that is redrawn on top of a saved copy of the background. Used for the
+    customization plots, where only the grading overlay changes as sliders move.
+
+    Args:
+        draw_background (callable): Function taking a Figure that draws the static
+            content and returns the axes for the overlay and a list of background
+            artists that must stay above the overlay.
+        dpi (int, optional): Resolution of the rendered images. Defaults to 100.
+    """
+
+    def __init__(self, draw_background, dpi=100):
+        self.fig = Figure(dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.fig)
+        self.ax, self.above = draw_background(self.fig)
+        self.canvas.draw()
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self.overlay = []
+
+    def render(self, draw_overlay, *args):
+        """
+        Swap the overlay artists and render the figure without redrawing the background.
+
+        Args:
+            draw_overlay (callable): Function taking the axes and *args that draws the
+                overlay and returns its artists.
+            *args: Arguments passed on to draw_overlay.
+
+        Returns:
+            PIL.Image.Image: The rendered figure.
+        """
+        for artist in self.overlay:
+            artist.remove()
+        self.overlay = list(draw_overlay(self.ax, *args))
+        self.canvas.restore_region(self.background)
+        for artist in self.overlay + self.above:
+            self.ax.draw_artist(artist)
+        width, height = self.canvas.get_width_height()
+        return Image.frombuffer(
+            "RGBA", (width, height), self.canvas.buffer_rgba(), "raw", "RGBA", 0, 1
+        ).copy()
@@ -0,0 +1,280 @@
+import pandas as pd
+import seaborn as sns
+from matplotlib import patches
+import matplotlib.pyplot as plt
+from matplotlib.lines import Line2D
+from hunt import hunt_scorecard
+from utils import color_letter
+from figures import new_or_reused_axes
+from stage_timer import stage_timer
+
+# ring colors for the hunting radii, ordered from Grade A to Grade D
+HUNTING_COLORS = ["green", "blue", "orange", "red"]
+
+
+def draw_hunting_field(axis):
+    """
+    Draws the static parts of the swing map: home plate, the strike zone and the axis
+    limits.
+
+    Args:
+        axis (matplotlib.axes.Axes): The axes to draw on.
+    """
+    # add home plate to plot
+    home_plate_coords = [[-0.71, 0], [-0.85, -0.5], [0, -1], [0.85, -0.5], [0.71, 0]]
+    axis.add_patch(
+        patches.Polygon(
+            home_plate_coords, edgecolor="darkgray", facecolor="lightgray", zorder=0.1
+        )
+    )
+
+    # add strike zone to plot, technically the y coords can vary by batter
+    axis.add_patch(
+        patches.Rectangle(
+            (-0.71, 1.5),
+            2 * 0.71,
+            2,
+            edgecolor="lightgray",
+            fill=False,
+            lw=3,
+            zorder=0.1,
+        )
+    )
+
+    # resize axes
+    axis.set_xlim([-3, 3])
+    axis.set_ylim([-1.5, 5])
+
+
+def draw_hunting_radii(axis, radii):
+    """
+    Draws the hunting radii as expanding rings around the target center.
+
+    Args:
+        axis (matplotlib.axes.Axes): The axes to draw on.
+        radii (list): List of radii, one ring per grade.
+
+    Returns:
+        list: The ring patches, in grade order.
+    """
+    center = (-0.25, 2.75)
+    wedges = []
+    for i, radius in enumerate(radii):
+        color = HUNTING_COLORS[i % len(HUNTING_COLORS)]
+        if i == 0:
+            inner_radius = 0
+        else:
+            inner_radius = radii[i - 1]
+        wedge = patches.Wedge(
+            center,
+            radius,
+            0,
+            360,
+            width=radius - inner_radius,
+            edgecolor=color,
+            facecolor=color,
+            alpha=0.2,
+            zorder=0.1,
+        )
+
+        axis.add_patch(wedge)
+        wedges.append(wedge)
+    return wedges
+
+
+def hunting_radii_legend(axis, handles):
+    """
+    Adds the hunting radii legend.
+
+    Args:
+        axis (matplotlib.axes.Axes): The axes to draw on.
+        handles (list): One legend handle per grade.
+
+    Returns:
+        matplotlib.legend.Legend: The legend.
+    """
+    grades = ["Grade A", "Grade B", "Grade C", "Grade D"]
+    return axis.legend(
+        handles,
+        grades,
+        loc="upper right",
+        fontsize=14,
+        title="Hunting Radii",
+        title_fontsize=18,
+    )
+
+
+def hunting_preview_background(fig):
+    """
+    Draws the static background of the hunting radii customization plot, everything
+    except the rings, see figures.LayeredFigure.
+
+    Args:
+        fig (matplotlib.figure.Figure): The figure to draw on.
+
+    Returns:
+        tuple: The axes and the background artists that sit above the rings (none).
+    """
+    fig.set_size_inches([fig_size * 1.5 for fig_size in (6.4, 4.8)])
+    axis = fig.subplots()
+    draw_hunting_field(axis)
+    legend_handles = [
+        patches.Patch(edgecolor=color, facecolor=color, alpha=0.2)
+        for color in HUNTING_COLORS
+    ]
+    hunting_radii_legend(axis, legend_handles)
+    axis.set_title("Pitch Hunting", {"size": 22})
+    axis.axis("off")
+    return axis, []
+
+
+@stage_timer.timed()
+def plot_hunting(swing_map_df, grade, radii=None, fig=None):
+    """
+    Plots the swing map with pitch locations and optional radii.
+
+    Args:
+        swing_map_df (pandas.DataFrame): DataFrame containing swing map data.
+        grade (str): The grade to display on the plot.
+        radii (list, optional): List of radii to display as circles on the plot.
+        fig (matplotlib.figure.Figure, optional): Existing figure to clear and draw on
+            instead of creating a new pyplot figure.
+
+    Returns:
+        matplotlib.figure.Figure: The generated matplotlib figure.
+    """
+    # define colors and fonts
+    result_colors = {
+        "Hit and Safe": "green",
+        "Hit and Out": "red",
+        "Hit Foul": "blue",
+        "Foul Tip": "orange",
+        "Swing and Miss": "darkred",
+    }
+
+    font1 = {"size": 22}
+    font2 = {"size": 18}
+    font3 = {"size": 14}
+
+    # set fig size
+    default_fig_size = (6.4, 4.8)
+    size_adjust = 1.5
+    larger_fig_size = [fig_size * size_adjust for fig_size in default_fig_size]
+    fig, axis = new_or_reused_axes(fig, larger_fig_size)
+
+    if swing_map_df is not None:
+        # plot scatter plot of pitch locations of all swings
+        swing_map_df = swing_map_df.copy()
+        swing_map_df.loc[:, "color"] = swing_map_df["swing_result"].map(result_colors)
+        results = swing_map_df["swing_result"].unique()
+        batter_id = swing_map_df["batter"].iloc[0]
+
+        # plot two-strike swings
+        axis = sns.scatterplot(
+            data=swing_map_df[swing_map_df["two_strikes"]],
+            x="pitch_x",
+            y="pitch_z",
+            hue="swing_result",
+            palette=result_colors,
+            alpha=0.5,
+            marker="X",
+            s=100,
+            legend=False,
+            ax=axis,
+        )
+        # plot non-two-strike swings with different marker
+        axis = sns.scatterplot(
+            data=swing_map_df[~swing_map_df["two_strikes"]],
+            x="pitch_x",
+            y="pitch_z",
+            hue="swing_result",
+            palette=result_colors,
+            alpha=0.5,
+            marker="s",
+            s=100,
+            ax=axis,
+        )
+
+    draw_hunting_field(axis)
+
+    if radii:
+        # plot target circles in customizing figure
+        legend_patches = draw_hunting_radii(axis, radii)
+        # Add hunting legend
+        hunting_legend = hunting_radii_legend(axis, legend_patches)
+
+    if swing_map_df is not None:
+        # add letter grade
+        axis.text(-2.8, -1, grade, fontsize=100, color=color_letter(grade))
+
+        # Add a legend with custom markers
+        handles, labels = axis.get_legend_handles_labels()
+        legend_elements = [
+            Line2D(
+                [0],
+                [0],
+                marker="X",
+                color="w",
+                label="Two-strike pitches",
+                markerfacecolor="grey",
+                markersize=10,
+            ),
+            Line2D(
+                [0],
+                [0],
+                marker="s",
+                color="w",
+                label="Other pitches",
+                markerfacecolor="grey",
+                markersize=10,
+            ),
+        ]
+        legend_handles = [
+            Line2D([], [], color=h, linestyle="", alpha=0.5, marker="o", label=l)
+            for l, h in result_colors.items()
+            if l in results
+        ]
+        legend_elements.extend(legend_handles)
+        axis.legend(handles=legend_elements, loc="best", title=None, prop=font3)
+        # add batter id subtitle
+        subtitle = f"\n Batter: {batter_id}"
+    else:
+        subtitle = ""
+
+    # add title
+    axis.set_title(f"Pitch Hunting{subtitle}", font1)
+    # remove grid and axes
+    axis.grid(False)
+    axis.axis("off")
+    axis.set_xlabel(None)
+    axis.set_ylabel(None)
+
+    return fig
+
+
+if __name__ == "__main__":
+
+    hunting_defaults = [0.5, 0.75, 1, 1.25]
+    swing_map_df = pd.read_csv("../data/dataframes/swing_map_metrics_df.csv")
+    scorecard_df = hunt_scorecard(hunting_defaults, swing_map_df)
+
+    # batter_list = swing_map_df.batter.unique()
+    batter_list = [459722179, 558675411, 545569723]
+    # need to add code to save the resulting plots
+    for batter_id in batter_list:
+        batter_df = swing_map_df[
+            (swing_map_df["batter"] == batter_id)
+            # two strike swings are being included here for plotting,
+            # but dropped when calculating max distance
+        ]
+        if len(batter_df) == 1:
+            continue
+        grade = scorecard_df[scorecard_df["batter"] == batter_id][
+            "hunting_grade"
+        ].values[0]
+        plot_hunting(batter_df, grade)
+        plt.show()
+        # plt.savefig(f'../images/grades/{batter_id}_hunting.png')
+
+    plot_hunting(None, None, hunting_defaults)
+    plt.show()
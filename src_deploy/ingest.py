@@ -0,0 +1,203 @@
+import argparse
+import glob
+import json
+import os
+import numpy as np
+import pandas as pd
+from hunt import pitch_location, swing_outcome
+from track_angle import find_track_angle
+
+# bat tracking events that mark the contact frame of a swing
+CONTACT_EVENTS = ["Hit", "Nearest"]
+
+
+def read_pitch_file(path):
+    """
+    Read a tracking JSONL file, which holds one pitch per file on its first line.
+
+    Args:
+        path (str): Path to the tracking file.
+
+    Returns:
+        dict: The pitch's tracking data.
+    """
+    with open(path) as f:
+        return json.loads(f.readline())
+
+
+def pitch_key(path):
+    """
+    Get the batter and swing number from a tracking file named
+    '<batter>_<batter_count>.jsonl'. The tracking data doesn't name the batter, so
+    files received during a game are named after the metric table keys.
+
+    Args:
+        path (str): Path to the tracking file.
+
+    Returns:
+        tuple: The batter ID and batter_count.
+    """
+    stem = os.path.splitext(os.path.basename(path))[0]
+    batter, batter_count = stem.split("_")
+    return int(batter), int(batter_count)
+
+
+def compact_ball_samples(samples):
+    """
+    Drop repeated ball samples and sort the rest by time. The tracking data repeats
+    some frames with identical values, and the lookups around the contact frame
+    expect every frame once.
+
+    Args:
+        samples (list): The pitch's 'samples_ball' entries.
+
+    Returns:
+        tuple: The compacted samples and the number of samples removed.
+    """
+    seen = set()
+    compacted = []
+    for sample in samples:
+        key = json.dumps(sample, sort_keys=True)
+        if key not in seen:
+            seen.add(key)
+            compacted.append(sample)
+    compacted.sort(key=lambda sample: sample["time"])
+    return compacted, len(samples) - len(compacted)
+
+
+def compact_pitch(pitch):
+    """
+    Compact a pitch's ball samples, see compact_ball_samples. The pitch is marked
+    so compacted files aren't compacted again when they are read.
+
+    Args:
+        pitch (dict): The pitch's tracking data.
+
+    Returns:
+        tuple: A copy of the pitch with compacted ball samples and the number of
+        samples removed.
+    """
+    if pitch.get("samples_ball_compacted"):
+        return pitch, 0
+    samples, removed = compact_ball_samples(pitch["samples_ball"])
+    return {**pitch, "samples_ball": samples, "samples_ball_compacted": True}, removed
+
+
+def compact_tracking_files(tracking_folder, output_folder):
+    """
+    Write a compacted copy of every tracking file, see compact_pitch.
+
+    Args:
+        tracking_folder (str): Folder containing the tracking JSONL files.
+        output_folder (str): Folder the compacted files are written to.
+
+    Returns:
+        dict: The number of ball samples removed from each file, keyed by file name.
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    removed = dict()
+    for path in sorted(glob.glob(f"{tracking_folder}/*.jsonl")):
+        pitch, removed[os.path.basename(path)] = compact_pitch(read_pitch_file(path))
+        with open(os.path.join(output_folder, os.path.basename(path)), "w") as f:
+            f.write(json.dumps(pitch) + "\n")
+    return removed
+
+
+def ball_samples_df(pitch):
+    """
+    Build the ball DataFrame of a pitch, one row per sample with the time and the
+    pos, vel and acc axes as pos_0 through acc_2.
+
+    Args:
+        pitch (dict): The pitch's tracking data.
+
+    Returns:
+        pd.DataFrame: DataFrame containing the ball's trajectory data.
+    """
+    rows = []
+    for sample in pitch["samples_ball"]:
+        row = {"time": sample["time"]}
+        for name in ["pos", "vel", "acc"]:
+            for ax, value in enumerate(sample.get(name) or [None] * 3):
+                row[f"{name}_{ax}"] = value
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def bat_samples_df(pitch):
+    """
+    Build the bat DataFrame of a pitch, one row per sample with the event, the time
+    and the head and handle positions as head_pos_0 through handle_pos_2.
+
+    Args:
+        pitch (dict): The pitch's tracking data.
+
+    Returns:
+        pd.DataFrame: DataFrame containing the bat's trajectory data, empty when the
+        bat wasn't tracked.
+    """
+    rows = []
+    for sample in pitch["samples_bat"]:
+        if "time" not in sample:
+            continue
+        row = {"event": sample.get("event"), "time": sample["time"]}
+        for part in ["head", "handle"]:
+            for ax, value in enumerate(sample[part]["pos"]):
+                row[f"{part}_pos_{ax}"] = value
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def swing_metrics(pitch):
+    """
+    Calculate the swing map, tracking and timing metrics of a pitch, the same values
+    the metric tables hold for each swing. Swing similarity needs the batter's other
+    swings and isn't included.
+
+    Args:
+        pitch (dict): The pitch's tracking data. Its ball samples are compacted first
+            unless it was read from a compacted file.
+
+    Returns:
+        dict: The swing's metrics keyed like the metric table columns, or None when the
+        batter didn't swing or the swing wasn't tracked. The angles are NaN when they
+        can't be measured.
+    """
+    swing, starting_strikes = swing_outcome(pitch)
+    bat_df = bat_samples_df(pitch)
+    if swing == "Other" or bat_df.empty:
+        return None
+    hit_frame = bat_df[bat_df["event"].isin(CONTACT_EVENTS)]
+    if hit_frame.empty:
+        return None
+    pitch, _ = compact_pitch(pitch)
+    ball_df = ball_samples_df(pitch)
+    pitch_x, pitch_z = pitch_location(ball_df, bat_df)
+    try:
+        attack_angle, track_angle = find_track_angle(ball_df, bat_df, hit_frame)
+    except IndexError:
+        # contact on the first ball frame leaves no frame to take the pitch angle from
+        attack_angle, track_angle = np.nan, np.nan
+    # the contact location is the middle of the bat at the contact frame
+    contact = hit_frame.iloc[0]
+    return {
+        "pitch_x": pitch_x,
+        "pitch_z": pitch_z,
+        "swing_result": swing,
+        "two_strikes": starting_strikes == 2,
+        "attack_angle": attack_angle,
+        "track_angle": track_angle,
+        "contact_y_loc": (contact["head_pos_1"] + contact["handle_pos_1"]) / 2,
+        "contact_x_loc": (contact["head_pos_0"] + contact["handle_pos_0"]) / 2,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compact the ball samples of tracking files")
+    parser.add_argument("--tracking-folder", default="../data/tracking_files")
+    parser.add_argument("--output-folder", default="../data/tracking_files_compact")
+    args = parser.parse_args()
+    removed = compact_tracking_files(args.tracking_folder, args.output_folder)
+    for file_name, count in removed.items():
+        print(f"{file_name}: removed {count} repeated ball samples")
+    print(f"removed {sum(removed.values())} repeated ball samples from {len(removed)} files")
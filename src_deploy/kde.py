@@ -0,0 +1,125 @@
+import numpy as np
+
+# fixed evaluation grid for contact locations (ft), wide enough for the kernel tails
+CONTACT_GRID = np.linspace(-6, 8, 2048)
+
+
+def kde_bandwidth(values, bw_adjust=0.3):
+    """
+    Get the Gaussian kernel bandwidth seaborn's kdeplot would use (Scott's rule
+    scaled by bw_adjust).
+
+    Args:
+        values (np.ndarray): The sample values.
+        bw_adjust (float, optional): Bandwidth scaling factor. Defaults to 0.3.
+
+    Returns:
+        float: The kernel bandwidth.
+    """
+    return bw_adjust * len(values) ** (-1 / 5) * np.std(values, ddof=1)
+
+
+def binned_kde(values, grid, bw_adjust=0.3, cut=3):
+    """
+    Estimate a density on a uniform grid by linearly binning the samples and convolving
+    the bin counts with a Gaussian kernel through an FFT.
+
+    Args:
+        values (np.ndarray): The sample values.
+        grid (np.ndarray): Uniformly spaced evaluation points.
+        bw_adjust (float, optional): Bandwidth scaling factor. Defaults to 0.3.
+        cut (float, optional): Number of bandwidths past the extreme samples the curve
+            extends, density outside that support is set to zero. Defaults to 3.
+
+    Returns:
+        np.ndarray: The density at each grid point, or None when the samples have no
+        variance (matching seaborn, which skips those).
+    """
+    values = np.asarray(values, dtype=float)
+    values = values[np.isfinite(values)]
+    if len(values) < 2 or np.std(values) == 0:
+        return None
+    bw = kde_bandwidth(values, bw_adjust)
+    size = len(grid)
+    dx = grid[1] - grid[0]
+
+    # linear binning spreads each sample across its two neighbouring grid points
+    pos = np.clip((values - grid[0]) / dx, 0, size - 1)
+    left = np.minimum(np.floor(pos).astype(int), size - 2)
+    frac = pos - left
+    counts = np.bincount(left, 1 - frac, minlength=size) + np.bincount(
+        left + 1, frac, minlength=size
+    )
+
+    offsets = np.arange(-size + 1, size) * dx
+    kernel = np.exp(-0.5 * (offsets / bw) ** 2) / (bw * np.sqrt(2 * np.pi))
+    fft_size = 1 << int(np.ceil(np.log2(3 * size - 2)))
+    density = np.fft.irfft(
+        np.fft.rfft(counts, fft_size) * np.fft.rfft(kernel, fft_size), fft_size
+    )[size - 1 : 2 * size - 1] / len(values)
+
+    outside = (grid < values.min() - cut * bw) | (grid > values.max() + cut * bw)
+    density[outside] = 0
+    return np.maximum(density, 0)
+
+
+class ContactKde:
+    """
+    Contact location density curves for every batter, evaluated once on a fixed grid
+    and stored as one compact float32 array.
+
+    Args:
+        timing_df (pd.DataFrame): DataFrame containing timing data.
+        grid (np.ndarray, optional): Evaluation grid. Defaults to CONTACT_GRID.
+        bw_adjust (float, optional): Bandwidth scaling factor. Defaults to 0.3.
+    """
+
+    def __init__(self, timing_df, grid=CONTACT_GRID, bw_adjust=0.3):
+        self.grid = grid
+        self.rows = dict()
+        curves = []
+        for batter, batter_df in timing_df.groupby("batter", sort=False):
+            density = binned_kde(batter_df["contact_y_loc"], grid, bw_adjust)
+            if density is None:
+                continue
+            self.rows[batter] = len(curves)
+            curves.append(density)
+        self.curves = np.array(curves, dtype=np.float32).reshape(-1, len(grid))
+
+    def curve(self, batter_id):
+        """
+        Get a batter's density curve, trimmed to the grid points with density.
+
+        Args:
+            batter_id (int): The ID of the batter.
+
+        Returns:
+            tuple: The grid points and density values, or None when the batter has
+            no curve.
+        """
+        if batter_id not in self.rows:
+            return None
+        density = self.curves[self.rows[batter_id]]
+        support = np.nonzero(density)[0]
+        trimmed = slice(support[0], support[-1] + 1)
+        return self.grid[trimmed], density[trimmed]
+
+
+_contact_kdes = dict()
+
+
+def get_contact_kde(timing_df, data_version):
+    """
+    Get the contact location curves for a data version, building them on first use.
+
+    Args:
+        timing_df (pd.DataFrame): DataFrame containing timing data.
+        data_version (str): Version of the data, see utils.data_version.
+
+    Returns:
+        ContactKde: The cached density curves.
+    """
+    if data_version not in _contact_kdes:
+        _contact_kdes.clear()
+        _contact_kdes[data_version] = ContactKde(timing_df)
+    return _contact_kdes[data_version]
@@ -0,0 +1,356 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import deque
+import numpy as np
+from ingest import pitch_key, read_pitch_file, swing_metrics
+from live_scorecard import LiveScorecard
+from scorecard import merge_metrics, DEFAULT_THRESHOLDS
+
+# longest socket message, a pitch with its ball and bat samples is a few hundred KB
+MESSAGE_LIMIT = 2**24
+
+
+def load_swing(path):
+    """
+    Read a tracking file received during a game and calculate its swing metrics.
+
+    Args:
+        path (str): Path to the tracking file, named '<batter>_<batter_count>.jsonl'.
+
+    Returns:
+        tuple: The batter ID and the swing's metrics, None when it isn't a swing.
+    """
+    batter, _ = pitch_key(path)
+    return batter, swing_metrics(read_pitch_file(path))
+
+
+def parse_message(line):
+    """
+    Calculate the swing metrics of a socket message. Each message is one JSON line
+    with the 'batter', its 'batter_count' and the tracking data under 'pitch'.
+
+    Args:
+        line (bytes): The message.
+
+    Returns:
+        tuple: The batter ID and the swing's metrics, None when it isn't a swing.
+    """
+    message = json.loads(line)
+    return int(message["batter"]), swing_metrics(message["pitch"])
+
+
+class LatencyStats:
+    """
+    End-to-end latency of the live mode, from a pitch arriving (the tracking file
+    being written or the socket message being read) to its batter's grades being
+    published, plus counts of what happened to each pitch.
+
+    Args:
+        window (int, optional): Number of recent latencies the percentiles are taken
+            over. Defaults to 1,000.
+    """
+
+    def __init__(self, window=1000):
+        self.latencies = deque(maxlen=window)
+        self.counts = {"pitches": 0, "swings": 0, "not_swings": 0, "failed": 0}
+        self.max_queue = 0
+        self.max_batch = 0
+
+    def record(self, arrival, published):
+        """
+        Record the latency of one pitch.
+
+        Args:
+            arrival (float): When the pitch arrived, as a time.time() timestamp.
+            published (float): When its grades were published.
+        """
+        self.latencies.append(published - arrival)
+
+    def summary(self):
+        """
+        Get the latency percentiles (in seconds) and the counters.
+
+        Returns:
+            dict: The latency summary.
+        """
+        latencies = np.array(self.latencies)
+        summary = {
+            **self.counts,
+            "max_queue": self.max_queue,
+            "max_batch": self.max_batch,
+        }
+        if len(latencies):
+            summary.update(
+                {
+                    "p50": float(np.percentile(latencies, 50)),
+                    "p95": float(np.percentile(latencies, 95)),
+                    "max": float(latencies.max()),
+                }
+            )
+        return summary
+
+
+def write_snapshot(path, grades, stats):
+    """
+    Write the live grades for the dashboard. The file is replaced in one step, so
+    the dashboard never reads a partly written snapshot.
+
+    Args:
+        path (str): Path of the snapshot file.
+        grades (dict): Current grades keyed by batter ID, see LiveScorecard.grades.
+        stats (LatencyStats): The live mode's latency stats.
+    """
+    snapshot = {
+        "updated": time.time(),
+        "grades": [{"batter": batter, **grades[batter]} for batter in sorted(grades)],
+        "latency": stats.summary(),
+    }
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(snapshot, f)
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path):
+    """
+    Read the live grades written by write_snapshot.
+
+    Args:
+        path (str): Path of the snapshot file.
+
+    Returns:
+        dict: The snapshot, None when the live mode hasn't written one yet.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+class LiveGame:
+    """
+    Score pitches while a game is played. Tracking files dropped in a folder, or
+    messages sent to a local socket, go through a bounded queue to a scorer that
+    calculates the swing metrics off the event loop, updates the live scorecard and
+    publishes the grades of the batters that changed. Parsing, scoring and writing
+    the snapshot all run in the default executor.
+
+    A burst fills the queue, and the sources then wait instead of reading more: the
+    folder watcher leaves the new files on disk for its next scan and the socket
+    stops reading, which pushes back on the sender. The scorer takes everything
+    waiting in the queue (up to batch_size pitches) at once and publishes one update
+    for the whole batch, so it catches up after a burst instead of falling further
+    behind.
+
+    Args:
+        live_scorecard (LiveScorecard): The scorecard to update.
+        queue_size (int, optional): Pitches waiting to be scored before the sources
+            are held back. Defaults to 64.
+        batch_size (int, optional): Most pitches scored per update. Defaults to 16.
+        snapshot_path (str, optional): File the grades are published to for the
+            dashboard. Defaults to None.
+        on_update (callable, optional): Called with the new grades of the updated
+            batters, keyed by batter ID, after each batch. Defaults to None.
+    """
+
+    def __init__(
+        self,
+        live_scorecard,
+        queue_size=64,
+        batch_size=16,
+        snapshot_path=None,
+        on_update=None,
+    ):
+        self.live_scorecard = live_scorecard
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.batch_size = batch_size
+        self.snapshot_path = snapshot_path
+        self.on_update = on_update
+        self.stats = LatencyStats()
+        self.grades = dict()
+        # tracking files in the watched folder at the last scan
+        self._seen = set()
+
+    async def _put(self, item):
+        await self.queue.put(item)
+        self.stats.max_queue = max(self.stats.max_queue, self.queue.qsize())
+
+    async def watch_folder(self, folder, poll_interval=0.1):
+        """
+        Queue every tracking file written to a folder. Files already in the folder
+        are queued on the first scan. Writers should create the file under another
+        name (e.g. ending in '.tmp') and rename it when it is complete. A file is new
+        when it wasn't there on the last scan, so only the files still in the folder
+        are remembered, and a file removed and written again is queued again.
+
+        Args:
+            folder (str): The folder to watch.
+            poll_interval (float, optional): Seconds between scans. Defaults to 0.1.
+        """
+        started = time.time()
+        while True:
+            with os.scandir(folder) as entries:
+                files = {
+                    entry.path: entry
+                    for entry in entries
+                    if entry.name.endswith(".jsonl")
+                }
+                new_files = [
+                    (files[path].stat().st_mtime, path)
+                    for path in files.keys() - self._seen
+                ]
+            self._seen = set(files)
+            for mtime, path in sorted(new_files):
+                # files from before the watcher started arrive when they are found
+                await self._put((max(mtime, started), load_swing, path))
+            await asyncio.sleep(poll_interval)
+
+    async def _read_messages(self, reader, writer):
+        try:
+            while line := await reader.readline():
+                if line.strip():
+                    await self._put((time.time(), parse_message, line))
+        finally:
+            writer.close()
+
+    async def serve_socket(self, host="127.0.0.1", port=8765):
+        """
+        Queue the pitches sent to a local TCP socket, one JSON message per line (see
+        parse_message).
+
+        Args:
+            host (str, optional): Address to listen on. Defaults to 127.0.0.1.
+            port (int, optional): Port to listen on. Defaults to 8765.
+        """
+        server = await asyncio.start_server(
+            self._read_messages, host, port, limit=MESSAGE_LIMIT
+        )
+        async with server:
+            await server.serve_forever()
+
+    def _score_batch(self, parsed):
+        updated = set()
+        for batter, swing in parsed:
+            self.live_scorecard.update(batter, swing)
+            updated.add(batter)
+        return {batter: self.live_scorecard.grades(batter) for batter in updated}
+
+    async def score_pitches(self):
+        """
+        Score queued pitches until cancelled.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            self.stats.max_batch = max(self.stats.max_batch, len(batch))
+
+            parsed = []
+            for _, parse, source in batch:
+                self.stats.counts["pitches"] += 1
+                try:
+                    batter, swing = await loop.run_in_executor(None, parse, source)
+                except Exception:
+                    self.stats.counts["failed"] += 1
+                    continue
+                if swing is None:
+                    self.stats.counts["not_swings"] += 1
+                    continue
+                self.stats.counts["swings"] += 1
+                parsed.append((batter, swing))
+
+            if parsed:
+                new_grades = await loop.run_in_executor(None, self._score_batch, parsed)
+                self.grades.update(new_grades)
+                if self.snapshot_path:
+                    await loop.run_in_executor(
+                        None,
+                        write_snapshot,
+                        self.snapshot_path,
+                        self.grades,
+                        self.stats,
+                    )
+                if self.on_update:
+                    self.on_update(new_grades)
+            published = time.time()
+            for arrival, _, _ in batch:
+                self.stats.record(arrival, published)
+            for _ in batch:
+                self.queue.task_done()
+
+    async def run(self, folder=None, port=None, duration=None):
+        """
+        Run the sources and the scorer.
+
+        Args:
+            folder (str, optional): Folder to watch for tracking files. Defaults to None.
+            port (int, optional): Local port to read pitch messages from. Defaults to
+                None.
+            duration (float, optional): Seconds to run for, until cancelled when None.
+
+        Returns:
+            dict: The latency summary.
+        """
+        loop = asyncio.get_running_loop()
+        # start from the grades of the batters the scorecard was seeded with
+        self.grades = await loop.run_in_executor(
+            None,
+            lambda: {
+                batter: self.live_scorecard.grades(batter)
+                for batter in self.live_scorecard.batters
+            },
+        )
+        if self.snapshot_path:
+            await loop.run_in_executor(
+                None, write_snapshot, self.snapshot_path, self.grades, self.stats
+            )
+        tasks = [asyncio.create_task(self.score_pitches())]
+        if folder:
+            tasks.append(asyncio.create_task(self.watch_folder(folder)))
+        if port:
+            tasks.append(asyncio.create_task(self.serve_socket(port=port)))
+        try:
+            await asyncio.wait(tasks, timeout=duration)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        return self.stats.summary()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score pitches live during a game")
+    parser.add_argument("--watch", default=None, help="folder receiving tracking files")
+    parser.add_argument("--port", type=int, default=None, help="local socket port")
+    parser.add_argument("--snapshot", default="../data/live_grades.json")
+    parser.add_argument(
+        "--seed-folder", default=None, help="metric tables of earlier games"
+    )
+    parser.add_argument("--queue-size", type=int, default=64)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=None)
+    args = parser.parse_args()
+    if not args.watch and not args.port:
+        parser.error("one of --watch or --port is required")
+
+    live_scorecard = LiveScorecard(*DEFAULT_THRESHOLDS.values())
+    if args.seed_folder:
+        live_scorecard.update_many(merge_metrics(args.seed_folder))
+    live_game = LiveGame(
+        live_scorecard,
+        queue_size=args.queue_size,
+        batch_size=args.batch_size,
+        snapshot_path=args.snapshot,
+        on_update=lambda grades: print(
+            *(f"{batter}: {grades[batter]}" for batter in grades), sep="\n"
+        ),
+    )
+    try:
+        summary = asyncio.run(live_game.run(args.watch, args.port, args.duration))
+    except KeyboardInterrupt:
+        summary = live_game.stats.summary()
+    print(json.dumps(summary, indent=2))
@@ -0,0 +1,237 @@
+import math
+from bisect import bisect_left, bisect_right, insort
+from threading import Lock
+import numpy as np
+import pandas as pd
+from contact_loc import score_contact_loc, summarize_contact_loc
+from track_angle import (
+    convert_score_ranges,
+    group_angles,
+    score_timing_angle,
+    summarize_tracking,
+)
+from hunt import summarize_hunting
+from similarity import summarize_similarity
+from scorecard import combine_scorecards
+from chunked_scorecard import merge_moments
+
+# merged swing metric columns a live update reads, see scorecard.merge_metrics
+SWING_COLUMNS = [
+    "pitch_x", "pitch_z", "two_strikes", "distance", "track_angle", "contact_y_loc"
+]
+# scorecard grade column of each metric
+METRIC_GRADES = {
+    "timing": "timing_grade",
+    "tracking": "track_angle_grade",
+    "hunting": "hunting_grade",
+    "similarity": "dist_grade",
+}
+
+
+class BatterState:
+    """
+    Running scoring state of one batter.
+
+    Args:
+        group_count (int): Number of tracking angle groups.
+    """
+
+    def __init__(self, group_count):
+        # contact location swing count and score sum
+        self.contact_count = 0
+        self.contact_score = 0
+        # tracking angle group counts and swing scores
+        self.group_counts = [0] * group_count
+        self.angle_scores = []
+        # similarity moments and the sorted distances for counting outliers
+        self.moments = (0, 0.0, 0.0)
+        self.distances = []
+        # hunting swing locations in a buffer grown by doubling, their farthest pair
+        # and the last geometric median
+        self.points = np.empty((0, 2))
+        self.point_count = 0
+        self.radial_dist = (None, 0)
+        self.median = None
+        # scorecard entries, rebuilt on read after an update
+        self.entries = None
+
+
+class LiveScorecard:
+    """
+    Scorecard updated one swing at a time. Each batter keeps running state, so a new
+    swing only updates that batter: contact location score sums, tracking angle group
+    counts and similarity moments are O(1). Inserting into the sorted distances finds
+    the position in O(log n) but shifts the later distances, O(n) in the batter's
+    swings. Hunting is also O(n): a new swing is compared with every earlier swing for
+    the farthest pair, in one numpy pass. Reading the grades of a batter whose swings
+    changed rescores their hunting, since every swing's distance to the geometric
+    median changes when the median moves. The median restarts from the previous one,
+    so it usually takes a couple of iterations.
+
+    Feeding the rows of merge_metrics in order gives the same grades as score_metrics.
+    The geometric median can differ within its tolerance, or where the median is not
+    unique, since it is found from a different starting point.
+
+    Args:
+        contact_location_values (list): Custom values for contact location scoring.
+        track_angle_values (list): Custom values for track angle scoring.
+        hunting_values (list): Custom values for swing map (hunting) scoring.
+        sim_values (list): Custom values for swing similarity scoring.
+    """
+
+    def __init__(
+        self, contact_location_values, track_angle_values, hunting_values, sim_values
+    ):
+        self.contact_location_values = contact_location_values
+        self.angle_ranges, _, _ = convert_score_ranges(track_angle_values)
+        self.hunting_values = hunting_values
+        self.sim_values = sim_values
+        self.batters = dict()
+        self.swing_count = 0
+        self._lock = Lock()
+
+    def update(self, batter, swing):
+        """
+        Add one swing to a batter's running state.
+
+        Args:
+            batter (int): The ID of the batter.
+            swing (dict): The swing's metrics keyed like SWING_COLUMNS, a missing metric
+                is treated like a missing value in the merged metrics.
+        """
+        values = {column: swing.get(column, np.nan) for column in SWING_COLUMNS}
+        with self._lock:
+            state = self.batters.get(batter)
+            if state is None:
+                state = BatterState(len(self.angle_ranges))
+                self.batters[batter] = state
+
+            contact_y_loc = values["contact_y_loc"]
+            if contact_y_loc != 0.0:
+                state.contact_count += 1
+                state.contact_score += score_contact_loc(
+                    self.contact_location_values, contact_y_loc
+                )
+
+            track_angle = values["track_angle"]
+            if pd.notnull(track_angle):
+                state.group_counts[group_angles(track_angle, self.angle_ranges)] += 1
+                state.angle_scores.append(
+                    score_timing_angle(self.angle_ranges, track_angle)
+                )
+
+            distance = values["distance"]
+            if distance > 0:
+                state.moments = merge_moments(state.moments, (1, distance, 0.0))
+                insort(state.distances, distance)
+
+            if values["two_strikes"] == False:
+                point = np.array([values["pitch_x"], values["pitch_z"]], dtype=float)
+                self._add_point(state, point)
+
+            state.entries = None
+            self.swing_count += 1
+
+    @staticmethod
+    def _add_point(state, point):
+        points = state.points[: state.point_count]
+        if len(points):
+            # the first farthest earlier swing, like comparing them one at a time
+            dists = np.hypot(*(points - point).T)
+            farthest = int(np.argmax(dists))
+            if dists[farthest] > state.radial_dist[1]:
+                state.radial_dist = ((points[farthest].copy(), point), dists[farthest])
+        if state.point_count == len(state.points):
+            grown = np.empty((max(2 * len(state.points), 8), 2))
+            grown[: state.point_count] = points
+            state.points = grown
+        state.points[state.point_count] = point
+        state.point_count += 1
+
+    def update_many(self, swing_df):
+        """
+        Add swings in order, e.g. to start from the swings of earlier games.
+
+        Args:
+            swing_df (pd.DataFrame): Swings with a 'batter' column and SWING_COLUMNS.
+        """
+        for swing in swing_df.to_dict("records"):
+            self.update(swing["batter"], swing)
+
+    def _entries(self, state):
+        """
+        Get a batter's scorecard entries for each metric, None where the batter has
+        nothing to score yet.
+        """
+        if state.entries is not None:
+            return state.entries
+        entries = dict()
+        if state.contact_count > 0:
+            entries["timing"] = summarize_contact_loc(
+                state.contact_count, state.contact_score
+            )
+        if state.angle_scores:
+            total = sum(state.group_counts)
+            angle_freqs = [
+                (g, count / total) for g, count in enumerate(state.group_counts)
+            ]
+            entries["tracking"] = summarize_tracking(
+                angle_freqs, list(state.angle_scores)
+            )
+        if state.point_count > 1:
+            batter_df = pd.DataFrame(
+                state.points[: state.point_count], columns=["pitch_x", "pitch_z"]
+            )
+            entries["hunting"] = summarize_hunting(
+                self.hunting_values, batter_df, state.radial_dist, state.median
+            )
+            state.median = entries["hunting"]["geometric_median"]
+        n, mean, m2 = state.moments
+        if n > 0:
+            std = math.sqrt(m2 / n)
+            # count the distances strictly inside mean +/- 2 std
+            good_count = bisect_left(state.distances, mean + 2 * std) - bisect_right(
+                state.distances, mean - 2 * std
+            )
+            entries["similarity"] = summarize_similarity(
+                self.sim_values, n, max(good_count, 0)
+            )
+        state.entries = entries
+        return entries
+
+    def grades(self, batter):
+        """
+        Get a batter's current grades.
+
+        Args:
+            batter (int): The ID of the batter.
+
+        Returns:
+            dict: The grade columns of the scorecard, None for metrics without enough
+            swings.
+        """
+        with self._lock:
+            entries = self._entries(self.batters[batter])
+        return {
+            column: entries[metric][column] if metric in entries else None
+            for metric, column in METRIC_GRADES.items()
+        }
+
+    def scorecard(self):
+        """
+        Get the current scorecard of every batter.
+
+        Returns:
+            pd.DataFrame: DataFrame containing the scorecard, with the same columns as
+            scorecard.generate_scorecard.
+        """
+        metric_lists = {metric: [] for metric in METRIC_GRADES}
+        with self._lock:
+            for batter in sorted(self.batters):
+                entries = self._entries(self.batters[batter])
+                for metric, metric_list in metric_lists.items():
+                    if metric in entries:
+                        metric_list.append({"batter": batter, **entries[metric]})
+        return combine_scorecards(
+            *[pd.DataFrame.from_dict(metric_list) for metric_list in metric_lists.values()]
+        )
@@ -0,0 +1,288 @@
+import argparse
+import gc
+import glob
+import json
+import os
+import tempfile
+import tracemalloc
+from contextlib import contextmanager
+import pandas as pd
+from contact_loc import contact_loc_scorecard
+from hunt import hunt_scorecard
+from ingest import read_pitch_file, swing_metrics
+from similarity import similarity_scorecard
+from track_angle import create_tracking_score_df
+from scorecard import combine_scorecards, merge_metrics, DEFAULT_THRESHOLDS
+from synthetic_data import generate_metric_tables, generate_tracking_files
+
+# allocation sites listed per stage
+TOP_SITES = 10
+# allocations are attributed to the innermost line of the pipeline's own modules
+SOURCE_FOLDER = os.path.dirname(os.path.abspath(__file__))
+
+
+def result_size(result):
+    """
+    Measure the memory held by a stage's result.
+
+    Args:
+        result: The stage's result.
+
+    Returns:
+        int: The deep memory usage in bytes of a DataFrame, None for other results.
+    """
+    if isinstance(result, pd.DataFrame):
+        return int(result.memory_usage(deep=True).sum())
+    return None
+
+
+class MemoryProfile:
+    """
+    Records the peak and retained Python allocations of pipeline stages with
+    tracemalloc. The peak is the most memory allocated at once during the stage, the
+    retained memory is what is still allocated when the stage ends, e.g. its result.
+    The allocation sites are the pipeline's source lines that retained the most
+    memory, directly or through the libraries they called. Stages should run one
+    after another, since tracemalloc keeps a single peak.
+
+    Args:
+        top (int, optional): Allocation sites listed per stage. Defaults to TOP_SITES.
+        frames (int, optional): Stack frames kept per allocation, enough to reach
+            the pipeline's line that made it. Defaults to 10.
+    """
+
+    def __init__(self, top=TOP_SITES, frames=10):
+        self.top = top
+        self.frames = frames
+        self.stages = []
+
+    @contextmanager
+    def tracing(self):
+        """
+        Trace allocations inside a with block, unless they are already traced.
+        """
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start(self.frames)
+        try:
+            yield self
+        finally:
+            if started:
+                tracemalloc.stop()
+
+    def _top_sites(self, stats):
+        # group by the innermost pipeline line, so pandas and numpy internals are
+        # listed under the line that called them
+        sites = dict()
+        for stat in stats:
+            # tracebacks run from the oldest frame to the allocation
+            allocated_in = stat.traceback[-1]
+            if stat.size_diff == 0 or allocated_in.filename == tracemalloc.__file__:
+                # unchanged, or the snapshot taken before the stage
+                continue
+            frame = next(
+                (
+                    frame
+                    for frame in reversed(stat.traceback)
+                    if frame.filename.startswith(SOURCE_FOLDER) and frame.filename != __file__
+                ),
+                allocated_in,
+            )
+            site = sites.setdefault(
+                f"{frame.filename}:{frame.lineno}",
+                {"size": 0, "count": 0, "allocated_in": allocated_in},
+            )
+            site["size"] += stat.size_diff
+            site["count"] += stat.count_diff
+        top = sorted(sites.items(), key=lambda item: -abs(item[1]["size"]))[: self.top]
+        return [
+            {
+                "site": name,
+                "size": site["size"],
+                "count": site["count"],
+                "allocated_in": f"{site['allocated_in'].filename}:{site['allocated_in'].lineno}",
+            }
+            for name, site in top
+        ]
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Profile the code inside a with block as one stage. Must run while tracing.
+
+        Args:
+            name (str): The stage name.
+        """
+        gc.collect()
+        before = tracemalloc.take_snapshot() if self.top else None
+        start, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        yield
+        current, peak = tracemalloc.get_traced_memory()
+        sites = []
+        if self.top:
+            after = tracemalloc.take_snapshot()
+            sites = self._top_sites(after.compare_to(before, "traceback"))
+        self.stages.append(
+            {
+                "stage": name,
+                "peak": peak - start,
+                "retained": current - start,
+                "sites": sites,
+            }
+        )
+
+    def run(self, name, function, *args, **kwargs):
+        """
+        Profile a function call as one stage.
+
+        Args:
+            name (str): The stage name.
+            function (callable): The function to call.
+            *args: Positional arguments of the call.
+            **kwargs: Keyword arguments of the call.
+
+        Returns:
+            The function's result, kept by the caller so later stages don't count
+            it as freed.
+        """
+        with self.stage(name):
+            result = function(*args, **kwargs)
+        self.stages[-1]["result_size"] = result_size(result)
+        return result
+
+    def summary(self):
+        """
+        Get the peak and retained memory of each stage.
+
+        Returns:
+            pd.DataFrame: One row per stage in the order they ran, sizes in MiB.
+        """
+        rows = [
+            {
+                "stage": stage["stage"],
+                "peak_mib": stage["peak"] / 2**20,
+                "retained_mib": stage["retained"] / 2**20,
+                "result_mib": (
+                    stage["result_size"] / 2**20
+                    if stage.get("result_size") is not None
+                    else None
+                ),
+            }
+            for stage in self.stages
+        ]
+        return pd.DataFrame(rows)
+
+
+def profile_pipeline(
+    data_folder, tracking_folder=None, thresholds=None, top=TOP_SITES, frames=10
+):
+    """
+    Profile the memory of the scorecard pipeline's stages, keeping every stage's
+    result until the end like generate_scorecard does. Listing allocation sites
+    compares snapshots of every live allocation, which takes seconds per stage on
+    large data, use top=0 to only measure the peak and retained memory.
+
+    Args:
+        data_folder (str): Path to the folder containing metric data files.
+        tracking_folder (str, optional): Folder of tracking JSONL files to profile
+            the ingestion of. Defaults to None, skipping ingestion.
+        thresholds (dict, optional): Grading thresholds keyed like
+            DEFAULT_THRESHOLDS. Defaults to DEFAULT_THRESHOLDS.
+        top (int, optional): Allocation sites listed per stage. Defaults to TOP_SITES.
+        frames (int, optional): Stack frames kept per allocation. Defaults to 10.
+
+    Returns:
+        MemoryProfile: The profile of each stage.
+    """
+    thresholds = thresholds or DEFAULT_THRESHOLDS
+    profile = MemoryProfile(top, frames)
+    with profile.tracing():
+        if tracking_folder:
+            # one pitch at a time like live_game, so only the swing metrics are kept
+            paths = sorted(glob.glob(f"{tracking_folder}/*.jsonl"))
+            swings = profile.run(
+                "ingest", lambda: [swing_metrics(read_pitch_file(path)) for path in paths]
+            )
+        merged_df = profile.run("merge_metrics", merge_metrics, data_folder)
+        timing_score_df = profile.run(
+            "contact_loc_scorecard",
+            contact_loc_scorecard,
+            thresholds["contact_location"],
+            merged_df,
+        )
+        tracking_score_df = profile.run(
+            "tracking_scorecard",
+            create_tracking_score_df,
+            thresholds["track_angle"],
+            merged_df,
+        )
+        hunting_score_df = profile.run(
+            "hunt_scorecard", hunt_scorecard, thresholds["hunting"], merged_df
+        )
+        similarity_score_df = profile.run(
+            "similarity_scorecard",
+            similarity_scorecard,
+            thresholds["similarity"],
+            merged_df,
+        )
+        profile.run(
+            "combine_scorecards",
+            combine_scorecards,
+            timing_score_df,
+            tracking_score_df,
+            hunting_score_df,
+            similarity_score_df,
+        )
+    return profile
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Profile the memory of the scorecard pipeline's stages"
+    )
+    parser.add_argument("--data-folder", default="../data/dataframes")
+    parser.add_argument("--tracking-folder", default=None)
+    parser.add_argument(
+        "--synthetic-batters",
+        type=int,
+        default=None,
+        help="profile synthetic data of this many batters instead of --data-folder",
+    )
+    parser.add_argument(
+        "--tracking-files",
+        type=int,
+        default=0,
+        help="synthetic tracking files to write and ingest",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--top", type=int, default=TOP_SITES)
+    parser.add_argument("--frames", type=int, default=10)
+    parser.add_argument("--output", default=None, help="JSON file of the profile")
+    args = parser.parse_args()
+
+    data_folder, tracking_folder = args.data_folder, args.tracking_folder
+    if args.synthetic_batters:
+        data_folder = tempfile.mkdtemp(prefix="memory_profile_")
+        swings_df = generate_metric_tables(
+            data_folder, args.synthetic_batters, seed=args.seed
+        )
+        if args.tracking_files:
+            tracking_folder = os.path.join(data_folder, "tracking_files")
+            generate_tracking_files(
+                tracking_folder, swings_df.head(args.tracking_files), seed=args.seed
+            )
+    profile = profile_pipeline(
+        data_folder, tracking_folder, top=args.top, frames=args.frames
+    )
+    print(profile.summary().to_string(index=False, float_format="%.2f"))
+    for stage in profile.stages:
+        print(f"\n{stage['stage']} top allocation sites:")
+        for site in stage["sites"]:
+            print(
+                f"  {site['size'] / 2**20:8.2f} MiB {site['count']:8d} blocks  "
+                f"{site['site']} (in {site['allocated_in']})"
+            )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(profile.stages, f, indent=2)
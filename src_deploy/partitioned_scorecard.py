@@ -0,0 +1,315 @@
+import argparse
+import glob
+import json
+import os
+import shutil
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from scorecard import generate_scorecard, DEFAULT_THRESHOLDS
+from chunked_scorecard import METRIC_TABLES
+
+# file in the work folder describing the partitions
+MANIFEST_FILE = "manifest.json"
+
+
+def partition_folder(work_folder, partition):
+    """
+    Get the folder holding a partition's metric tables and scorecard.
+
+    Args:
+        work_folder (str): Folder shared by the workers.
+        partition (int or str): The partition number, or '*' for a glob pattern
+            matching every partition folder.
+
+    Returns:
+        str: Path of the partition folder.
+    """
+    if partition == "*":
+        return os.path.join(work_folder, "part-*")
+    return os.path.join(work_folder, f"part-{partition:05d}")
+
+
+def batter_partitions(batters, partitions):
+    """
+    Hash batter IDs to partitions. The hash doesn't depend on the process or the
+    machine, so every worker assigns a batter to the same partition.
+
+    Args:
+        batters (pd.Series): Batter IDs without missing values.
+        partitions (int): Number of partitions.
+
+    Returns:
+        np.ndarray: The partition of each batter.
+    """
+    hashes = pd.util.hash_pandas_object(batters.astype("int64"), index=False)
+    return (hashes.to_numpy() % partitions).astype(int)
+
+
+def split_metrics(data_folder, work_folder, partitions, thresholds=None, chunksize=100_000):
+    """
+    Split the metric tables into batter partitions. Each partition folder gets its
+    own copy of every metric table with the rows of its batters, in their original
+    order, so it can be scored by generate_scorecard like the full data folder.
+    Rows without a batter are dropped, as merge_metrics would. The partition folders
+    of an earlier split are deleted first, and the manifest gets a new run ID that
+    each partition scorecard is saved with, so a reduce never mixes in the
+    scorecards of another run.
+
+    Args:
+        data_folder (str): Path to the folder containing metric data files.
+        work_folder (str): Folder shared by the workers.
+        partitions (int): Number of partitions.
+        thresholds (dict, optional): Grading thresholds keyed like DEFAULT_THRESHOLDS
+            for the workers to score with. Defaults to DEFAULT_THRESHOLDS.
+        chunksize (int, optional): Rows read per chunk. Defaults to 100,000.
+
+    Returns:
+        str: The run ID.
+    """
+    manifest_path = os.path.join(work_folder, MANIFEST_FILE)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+    for folder in glob.glob(partition_folder(work_folder, "*")):
+        shutil.rmtree(folder)
+    for partition in range(partitions):
+        os.makedirs(partition_folder(work_folder, partition), exist_ok=True)
+    for file_name, _ in METRIC_TABLES.values():
+        chunks = pd.read_csv(f"{data_folder}/{file_name}", chunksize=chunksize)
+        for i, chunk in enumerate(chunks):
+            if i == 0:
+                # every partition gets every table, even with no rows of its batters
+                for partition in range(partitions):
+                    chunk.iloc[:0].to_csv(
+                        f"{partition_folder(work_folder, partition)}/{file_name}",
+                        index=False,
+                    )
+            chunk = chunk.dropna(subset=["batter"])
+            for partition, rows in chunk.groupby(
+                batter_partitions(chunk["batter"], partitions)
+            ):
+                rows.to_csv(
+                    f"{partition_folder(work_folder, partition)}/{file_name}",
+                    mode="a",
+                    header=False,
+                    index=False,
+                )
+    run_id = uuid.uuid4().hex
+    with open(manifest_path, "w") as f:
+        json.dump(
+            {
+                "run_id": run_id,
+                "partitions": partitions,
+                "thresholds": thresholds or DEFAULT_THRESHOLDS,
+            },
+            f,
+            indent=2,
+        )
+    return run_id
+
+
+def load_manifest(work_folder):
+    """
+    Load the partition manifest written by split_metrics.
+
+    Args:
+        work_folder (str): Folder shared by the workers.
+
+    Returns:
+        dict: The run ID, the number of partitions and the grading thresholds.
+    """
+    with open(os.path.join(work_folder, MANIFEST_FILE)) as f:
+        return json.load(f)
+
+
+def score_partition(work_folder, partition, thresholds, run_id):
+    """
+    Score one partition and save its scorecard in the partition folder, with the run
+    ID of the split it was scored from. The file is renamed into place when it is
+    complete, so the reducer never reads a partial one.
+
+    Args:
+        work_folder (str): Folder shared by the workers.
+        partition (int): The partition number.
+        thresholds (dict): Grading thresholds keyed like DEFAULT_THRESHOLDS.
+        run_id (str): The run ID from the manifest, see split_metrics.
+
+    Returns:
+        str: Path of the partition scorecard.
+    """
+    folder = partition_folder(work_folder, partition)
+    swing_map_df = pd.read_csv(f"{folder}/{METRIC_TABLES['swing_map'][0]}")
+    if swing_map_df.empty:
+        scorecard_df = pd.DataFrame()
+    else:
+        scorecard_df = generate_scorecard(
+            folder,
+            thresholds["contact_location"],
+            thresholds["track_angle"],
+            thresholds["hunting"],
+            thresholds["similarity"],
+        )
+    path = f"{folder}/scorecard.pkl"
+    pd.to_pickle({"run_id": run_id, "scorecard": scorecard_df}, f"{path}.tmp")
+    os.replace(f"{path}.tmp", path)
+    return path
+
+
+def run_worker(work_folder, worker, workers):
+    """
+    Score this worker's share of the partitions, for running one worker per node
+    against a shared work folder. Worker i scores the partitions p with
+    p % workers == i.
+
+    Args:
+        work_folder (str): Folder shared by the workers.
+        worker (int): This worker's number, from 0 to workers - 1.
+        workers (int): Number of workers.
+
+    Returns:
+        list: Paths of the partition scorecards.
+    """
+    manifest = load_manifest(work_folder)
+    return [
+        score_partition(work_folder, partition, manifest["thresholds"], manifest["run_id"])
+        for partition in range(worker, manifest["partitions"], workers)
+    ]
+
+
+def reduce_scorecards(work_folder):
+    """
+    Concatenate the partition scorecards. Each batter is scored in exactly one
+    partition, so the rows only need to be put back in batter order. A partition
+    without any scored batters for a metric doesn't have that metric's columns, so
+    the partitions with the most columns go first to keep the column order.
+    Every partition must have been scored from the manifest's split.
+
+    Args:
+        work_folder (str): Folder shared by the workers.
+
+    Returns:
+        pd.DataFrame: DataFrame containing the scorecard.
+    """
+    manifest = load_manifest(work_folder)
+    scorecards = []
+    for partition in range(manifest["partitions"]):
+        path = f"{partition_folder(work_folder, partition)}/scorecard.pkl"
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Partition {partition} hasn't been scored: {path}")
+        saved = pd.read_pickle(path)
+        if saved["run_id"] != manifest["run_id"]:
+            raise ValueError(
+                f"Partition {partition} was scored by run {saved['run_id']}, "
+                f"not the current run {manifest['run_id']}: {path}"
+            )
+        scorecard_df = saved["scorecard"]
+        if not scorecard_df.empty:
+            scorecards.append(scorecard_df)
+    scorecards.sort(key=lambda df: -len(df.columns))
+    return (
+        pd.concat(scorecards, ignore_index=True)
+        .sort_values("batter", kind="stable")
+        .reset_index(drop=True)
+    )
+
+
+def partitioned_scorecard(
+    data_folder,
+    work_folder,
+    contact_location_values,
+    track_angle_values,
+    hunting_values,
+    sim_values,
+    partitions=None,
+    workers=None,
+):
+    """
+    Generate the same scorecard as generate_scorecard by scoring batter partitions on
+    a local process pool.
+
+    Args:
+        data_folder (str): Path to the folder containing metric data files.
+        work_folder (str): Folder the partitions are written to.
+        contact_location_values (list): Custom values for contact location scoring.
+        track_angle_values (list): Custom values for track angle scoring.
+        hunting_values (list): Custom values for swing map (hunting) scoring.
+        sim_values (list): Custom values for swing similarity scoring.
+        partitions (int, optional): Number of partitions. Defaults to four per worker.
+        workers (int, optional): Number of worker processes. Defaults to the CPU count.
+
+    Returns:
+        pd.DataFrame: DataFrame containing the scorecard.
+    """
+    workers = workers or os.cpu_count() or 1
+    partitions = partitions or 4 * workers
+    thresholds = {
+        "contact_location": contact_location_values,
+        "track_angle": track_angle_values,
+        "hunting": hunting_values,
+        "similarity": sim_values,
+    }
+    run_id = split_metrics(data_folder, work_folder, partitions, thresholds)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        list(
+            pool.map(
+                score_partition,
+                [work_folder] * partitions,
+                range(partitions),
+                [thresholds] * partitions,
+                [run_id] * partitions,
+            )
+        )
+    return reduce_scorecards(work_folder)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score batters in hash partitions")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    local = subparsers.add_parser("local", help="split, score and reduce on this machine")
+    local.add_argument("--data-folder", default="../data/dataframes")
+    local.add_argument("--work-folder", required=True)
+    local.add_argument("--partitions", type=int, default=None)
+    local.add_argument("--workers", type=int, default=None)
+    local.add_argument("--output", default=None)
+
+    split = subparsers.add_parser("split", help="write the partitions to a shared folder")
+    split.add_argument("--data-folder", default="../data/dataframes")
+    split.add_argument("--work-folder", required=True)
+    split.add_argument("--partitions", type=int, required=True)
+    split.add_argument("--thresholds", default=None, help="JSON file of thresholds")
+
+    work = subparsers.add_parser("work", help="score one worker's partitions")
+    work.add_argument("--work-folder", required=True)
+    work.add_argument("--worker", type=int, required=True)
+    work.add_argument("--workers", type=int, required=True)
+
+    reduce = subparsers.add_parser("reduce", help="combine the partition scorecards")
+    reduce.add_argument("--work-folder", required=True)
+    reduce.add_argument("--output", default=None)
+
+    args = parser.parse_args()
+    if args.command == "split":
+        thresholds = None
+        if args.thresholds:
+            with open(args.thresholds) as f:
+                thresholds = json.load(f)
+        split_metrics(args.data_folder, args.work_folder, args.partitions, thresholds)
+    elif args.command == "work":
+        paths = run_worker(args.work_folder, args.worker, args.workers)
+        print(f"scored {len(paths)} partitions")
+    else:
+        if args.command == "local":
+            scorecard_df = partitioned_scorecard(
+                args.data_folder,
+                args.work_folder,
+                *DEFAULT_THRESHOLDS.values(),
+                partitions=args.partitions,
+                workers=args.workers,
+            )
+        else:
+            scorecard_df = reduce_scorecards(args.work_folder)
+        if args.output:
+            scorecard_df.to_csv(args.output)
+        else:
+            print(scorecard_df)
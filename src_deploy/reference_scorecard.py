@@ -0,0 +1,470 @@
+# The merge and scoring functions as they were before any of them were optimized, kept
+# unchanged so equivalence.py can check the current scorecards against the original
+# grades. Don't optimize or refactor this module. The only change is the guard in
+# geometric_median, which never returned when every point was at the median.
+import math
+from itertools import combinations
+import numpy as np
+import pandas as pd
+
+
+def merge_metrics(data_folder):
+    """
+    Merge various metrics into one DataFrame.
+
+    Args:
+        data_folder (str): Path to the folder containing metric data files.
+
+    Returns:
+        pd.DataFrame: Merged DataFrame containing all metrics.
+    """
+    # import all data
+    swing_map_df = pd.read_csv(f"{data_folder}/swing_map_metrics_df.csv")
+    distance_metrics_df = pd.read_csv(f"{data_folder}/distance_metrics_df.csv")
+    tracking_metrics_df = pd.read_csv(f"{data_folder}/tracking_metrics_df.csv")
+    timing_metrics_df = pd.read_csv(f"{data_folder}/timing_metrics_df.csv")
+
+    # merge all metrics to one dataframe
+    all_metrics_df = (
+        swing_map_df.merge(
+            distance_metrics_df[["batter", "batter_count", "distance"]],
+            on=["batter", "batter_count"],
+            how="outer",
+        )
+        .merge(
+            tracking_metrics_df[
+                ["batter", "batter_count", "attack_angle", "track_angle"]
+            ],
+            on=["batter", "batter_count"],
+            how="outer",
+        )
+        .merge(
+            timing_metrics_df[["batter", "batter_count", "contact_y_loc"]],
+            on=["batter", "batter_count"],
+            how="outer",
+        )
+        .drop("Unnamed: 0", axis=1)
+        .dropna(subset=["batter"])
+    )
+
+    return all_metrics_df
+
+
+def get_grade(distance, thresholds):
+    """
+    Assign a grade based on the distance value and predefined thresholds.
+
+    Args:
+        distance (float): The distance value.
+        thresholds (dict): The grade thresholds.
+
+    Returns:
+        str: The assigned grade.
+    """
+    if distance >= thresholds["A"]:
+        return "A"
+    elif distance >= thresholds["B"]:
+        return "B"
+    elif distance >= thresholds["C"]:
+        return "C"
+    elif distance >= thresholds["D"]:
+        return "D"
+    else:
+        return "F"
+
+
+def score_contact_loc(quality_locations, contact_loc):
+    """
+    Scores the contact location based on predefined quality locations.
+
+    Args:
+        quality_locations (list): List of quality location thresholds.
+        contact_loc (float): The contact location to be scored.
+
+    Returns:
+        int: An integer score based on the contact location.
+    """
+    if contact_loc > quality_locations[0]:
+        score = 0
+    elif contact_loc > quality_locations[1]:
+        score = 4
+    elif contact_loc > quality_locations[2]:
+        score = 3
+    elif contact_loc > quality_locations[3]:
+        score = 2
+    elif contact_loc > quality_locations[4]:
+        score = 1
+    else:
+        score = 0
+    return score
+
+
+def contact_loc_scorecard(quality_locations, timing_df):
+    """
+    Generates a scorecard for timing data based on contact locations.
+
+    Args:
+        quality_locations (list): List of quality location thresholds.
+        timing_df (pandas.DataFrame): DataFrame containing timing data.
+
+    Returns:
+        pandas.DataFrame: A DataFrame containing the scorecard for each batter.
+    """
+    scorecard_list = []
+    for batter in timing_df['batter'].unique():
+        scorecard_dict = dict()
+        scorecard_dict['batter'] = batter
+
+        batter_df = timing_df[
+            (timing_df['batter'] == batter)
+            &
+            (timing_df['contact_y_loc'] != 0.0)
+        ].copy()
+
+        swing_count = len(batter_df)
+        if swing_count == 0:
+            continue
+        scorecard_dict['swing_count'] = swing_count
+        batter_df['score'] = batter_df['contact_y_loc'].apply(
+            lambda x: score_contact_loc(quality_locations, x)
+        )
+        contact_score_total = sum(batter_df['score'])
+        contact_score_avg = contact_score_total / swing_count
+        scorecard_dict['timing_avg'] = contact_score_avg
+        timing_thresholds = {'A': 4, 'B': 3, 'C': 2, 'D': 1}
+        scorecard_dict['timing_grade'] = get_grade(contact_score_avg, timing_thresholds)
+        scorecard_list.append(scorecard_dict)
+    return pd.DataFrame.from_dict(scorecard_list)
+
+
+def group_angles(x, angle_ranges):
+    """
+    Group angles into predefined ranges.
+
+    Args:
+        x (float): The angle value.
+        angle_ranges (list): List of tuples representing angle ranges.
+
+    Returns:
+        int: The group index of the angle.
+    """
+    group = 0
+    for i, angle in enumerate(angle_ranges):
+        if x > angle[0]:
+            group = i
+            continue
+    return group
+
+
+def get_group_frequencies(df, group):
+    """
+    Get the frequency of a specific angle group.
+
+    Args:
+        df (pd.DataFrame): DataFrame containing the angle data.
+        group (int): The group index.
+
+    Returns:
+        tuple: A tuple containing the group index and its frequency.
+    """
+    freq = len(df[df["angle_group"] == group]) / len(df)
+    return (group, freq)
+
+
+def score_timing_angle(score_ranges, angle):
+    """
+    Score the timing angle based on predefined ranges.
+
+    Args:
+        score_ranges (list): List of tuples representing score ranges.
+        angle (float): The angle value.
+
+    Returns:
+        int: The score for the angle.
+    """
+    # Drop negative ranges used for plotting and only use positive ranges and abs(track angles)
+    angle = abs(angle)
+    half_range = math.floor(len(score_ranges) / 2)
+    quality_ranges = score_ranges[half_range:]
+    if 0 <= angle < quality_ranges[0][1]:
+        score = 4
+    elif quality_ranges[1][0] <= angle < quality_ranges[1][1]:
+        score = 3
+    elif quality_ranges[2][0] <= angle < quality_ranges[2][1]:
+        score = 3
+    elif quality_ranges[3][0] <= angle < quality_ranges[3][1]:
+        score = 2
+    elif quality_ranges[4][0] <= angle < quality_ranges[4][1]:
+        score = 1
+    else:
+        score = 0
+    return score
+
+
+def tracking_scorecard(tracking_df, angle_ranges):
+    """
+    Generate a tracking scorecard for each batter.
+
+    Args:
+        tracking_df (pd.DataFrame): DataFrame containing tracking angle summary data.
+        angle_ranges (list): List of tuples representing angle ranges.
+
+    Returns:
+        list: A list of dictionaries containing scorecard information for each batter.
+    """
+    scorecard_list = []
+    for batter in tracking_df["batter"].unique():
+        scorecard_dict = dict()
+        scorecard_dict["batter"] = batter
+
+        # limit the tracking_df to rows of interest
+        batter_df = tracking_df[
+            (tracking_df["batter"] == batter) & (tracking_df["track_angle"].notnull())
+        ].copy()
+
+        if len(batter_df) == 0:
+            continue
+
+        # group each swing's attack angle into a group of angle ranges
+        batter_df["angle_group"] = batter_df.apply(
+            lambda x: group_angles(x["track_angle"], angle_ranges), axis=1
+        )
+        # convert range list to frequencies, then to score
+        angle_freqs = [
+            get_group_frequencies(batter_df, g) for g in range(len(angle_ranges))
+        ]
+        angle_scores = [
+            score_timing_angle(angle_ranges, angle)
+            for angle in batter_df["track_angle"]
+        ]
+        scorecard_dict["angle_freqs"] = angle_freqs
+        scorecard_dict["angle_scores"] = angle_scores
+        batter_score = sum(angle_scores) / len(angle_scores)
+        # translate score into grade
+        thresholds = {"A": 3.25, "B": 3, "C": 2.5, "D": 2}
+        scorecard_dict["track_angle_grade"] = get_grade(batter_score, thresholds)
+        scorecard_list.append(scorecard_dict)
+    return scorecard_list
+
+
+def convert_score_ranges(score_ranges):
+    """
+    Convert score ranges to angle ranges, centers, and widths.
+
+    Args:
+        score_ranges (list): List of score ranges.
+
+    Returns:
+        tuple: A tuple containing ranges, centers, and widths.
+    """
+    ranges = []
+    for i, score in enumerate(score_ranges):
+        if i == 0:
+            ranges.append((-score, score))
+        else:
+            ranges.append((ranges[i - 1][1], ranges[i - 1][1] + score))
+    neg_ranges = [(-end, -start) for start, end in ranges[1:]]
+
+    # assumes the outer edge is less than 90 degrees from pitch angle
+    lower_edge = [(-90, neg_ranges[-1][0])]
+    upper_edge = [(ranges[-1][1], 90)]
+    ranges.extend(neg_ranges)
+    ranges.extend(lower_edge)
+    ranges.extend(upper_edge)
+    ranges.sort(key=lambda tup: tup[0])
+    centers = [sum(edges) / len(edges) for edges in ranges]
+    widths = [end - start for start, end in ranges]
+    return ranges, centers, widths
+
+
+def create_tracking_score_df(score_widths, tracking_metrics_df):
+    """
+    Create a DataFrame containing tracking scores.
+
+    Args:
+        score_widths (list): List of score widths.
+        tracking_metrics_df (pd.DataFrame): DataFrame containing tracking metrics.
+
+    Returns:
+        pd.DataFrame: The DataFrame containing tracking scores.
+    """
+    score_ranges, _, _ = convert_score_ranges(score_widths)
+    tracking_score_list = tracking_scorecard(tracking_metrics_df, score_ranges)
+    return pd.DataFrame.from_dict(tracking_score_list)
+
+
+def geometric_median(df, epsilon=1e-5):
+    """
+    Computes the geometric median of a set of points using Weiszfeld's algorithm.
+
+    Args:
+        df (pandas.DataFrame): A DataFrame with columns 'pitch_x' and 'pitch_z' representing the points.
+        epsilon (float, optional): A small threshold to stop the iteration. Defaults to 1e-5.
+
+    Returns:
+        tuple: A tuple containing the geometric median (x_m, y_m) and a list of distancesto each point.
+    """
+    points = df[["pitch_x", "pitch_z"]].to_numpy()
+    median = np.mean(points, axis=0)  # Initial guess: centroid
+
+    while True:
+        distances = np.linalg.norm(points - median, axis=1)
+        nonzero_distances = distances != 0
+        if not nonzero_distances.any():
+            # every point is at the current guess
+            break
+        distances = np.where(nonzero_distances, distances, np.inf)
+        weighted_sum = np.sum(points / distances[:, np.newaxis], axis=0)
+        new_median = weighted_sum / np.sum(1 / distances)
+
+        if np.linalg.norm(new_median - median) < epsilon:
+            break
+
+        median = new_median
+
+    # Compute final distances to the geometric median
+    final_distances = np.linalg.norm(points - median, axis=1)
+
+    return median, final_distances
+
+
+def find_radial_dist(df):
+    """
+    Finds the maximum radial distance between pairs of pitch locations.
+
+    Args:
+        df (pandas.DataFrame): DataFrame containing pitch locations.
+
+    Returns:
+        tuple: A tuple containing the pair of points with the maximum distance
+        and the maximum distance itself.
+    """
+    pairs = combinations(df[["pitch_x", "pitch_z"]].values, 2)
+
+    # Initialize variables to store the maximum distance and corresponding points
+    max_distance = 0
+    max_pair = None
+
+    # Calculate distances and find the maximum
+    for p1, p2 in pairs:
+        dist = math.dist(p1, p2)
+        if dist > max_distance:
+            max_distance = dist
+            max_pair = (p1, p2)
+
+    return max_pair, max_distance
+
+
+def score_distances(quality_distances, hunt_distance):
+    """
+    Scores the hunt distance based on predefined quality distances.
+
+    Args:
+        quality_distances (list): List of quality distances to compare against.
+        hunt_distance (float): The hunt distance to be scored.
+
+    Returns:
+        int: An integer score based on the hunt distance.
+    """
+    if hunt_distance < quality_distances[0]:
+        score = 4
+    elif hunt_distance < quality_distances[1]:
+        score = 3
+    elif hunt_distance < quality_distances[2]:
+        score = 2
+    elif hunt_distance < quality_distances[3]:
+        score = 1
+    else:
+        score = 0
+    return score
+
+
+def hunt_scorecard(hunt_dist, swing_map_df):
+    """
+    Generates a scorecard for swing map data based on hunt distances.
+
+    Args:
+        hunt_dist (list): List of hunt distances for scoring.
+        swing_map_df (pandas.DataFrame): DataFrame containing swing map data.
+
+    Returns:
+        pandas.DataFrame: A DataFrame containing the scorecard for each batter.
+    """
+    scorecard_list = []
+    for batter_id in swing_map_df["batter"].unique():
+        scorecard_dict = {"batter": batter_id}
+        # filter the dataframe for the non-two strike swings of the selected batter
+        batter_df = swing_map_df[
+            (swing_map_df["batter"] == batter_id)
+            & (swing_map_df["two_strikes"] == False)
+        ].copy()
+        if len(batter_df) <= 1:
+            continue
+
+        # add radius and distances
+        max_pair, max_dist = find_radial_dist(batter_df)
+        median, distances = geometric_median(batter_df)
+        # score the batter
+        distance_scores = [score_distances(hunt_dist, dist) for dist in distances]
+        avg_score = sum(distance_scores) / len(distance_scores)
+        # add some summary stats
+        scorecard_dict["max_swing_dist"] = max_dist
+        scorecard_dict["max_swing_pair"] = max_pair
+        scorecard_dict["geometric_median"] = median
+        scorecard_dict["point_distances"] = distances
+        scorecard_dict["distance_scores"] = distance_scores
+        scorecard_dict["avg_score"] = avg_score
+        # convert score to grade
+        hunt_distance_avg = {"A": 4, "B": 3, "C": 2, "D": 1}
+        grade = get_grade(avg_score, hunt_distance_avg)
+        scorecard_dict["hunting_grade"] = grade
+        scorecard_list.append(scorecard_dict)
+    return pd.DataFrame.from_dict(scorecard_list)
+
+
+def similarity_scorecard(dist_grades, distance_df):
+    """
+    Generate a scorecard for batters based on their distance metrics.
+
+    Args:
+        dist_grades (list): List of distance thresholds for grading.
+        distance_df (pd.DataFrame): DataFrame containing distance metrics.
+
+    Returns:
+        pd.DataFrame: Scorecard DataFrame for each batter.
+    """
+    batters = distance_df.batter.unique()
+    scorecard_list = []
+    for batter in batters:
+        scorecard_dict = dict()
+        scorecard_dict["batter"] = batter
+
+        batter_df = distance_df[
+            (distance_df["batter"] == batter) & (distance_df["distance"] > 0)
+        ]
+        # distance values of -2, -1, and 0 indicate specific data situations, and should not
+        # be included in the variance calculations
+        if len(batter_df) == 0:
+            continue
+        # use mean +/- 2 std to find outlier swings
+        min_dist = np.mean(batter_df["distance"]) - 2 * np.std(batter_df["distance"])
+        max_dist = np.mean(batter_df["distance"]) + 2 * np.std(batter_df["distance"])
+        swing_count = len(batter_df)
+        good_count = len(
+            batter_df[
+                (batter_df["distance"] < max_dist) & (batter_df["distance"] > min_dist)
+            ]
+        )
+        scorecard_dict["dist_score"] = good_count / swing_count
+        # convert good swing percent (dist_score) to a grade
+        distance_thresholds = {
+            "A": dist_grades[0],
+            "B": dist_grades[1],
+            "C": dist_grades[2],
+            "D": dist_grades[3],
+        }
+        scorecard_dict["dist_grade"] = get_grade(
+            good_count / swing_count, distance_thresholds
+        )
+        scorecard_list.append(scorecard_dict)
+    return pd.DataFrame.from_dict(scorecard_list)
@@ -0,0 +1,128 @@
+from collections import OrderedDict
+from threading import Lock
+
+
+class RenderCache:
+    """
+    Least recently used cache of encoded plot images, bounded by the total number of
+    bytes stored.
+
+    Args:
+        max_bytes (int, optional): Maximum total size of the cached images.
+            Defaults to 64 MB.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    @staticmethod
+    def make_key(kind, batter_id, thresholds, data_version):
+        """
+        Build a hashable cache key for a rendered plot.
+
+        Args:
+            kind (str): The plot kind (e.g. 'tracking').
+            batter_id (int): The batter ID, None for the customization plots.
+            thresholds (list): The grading thresholds used to build the plot.
+            data_version (str): Version of the data the plot was built from.
+
+        Returns:
+            tuple: The cache key.
+        """
+        batter = None if batter_id is None else int(batter_id)
+        return (kind, batter, tuple(thresholds), data_version)
+
+    def get(self, key):
+        """
+        Get cached image bytes and mark them as recently used.
+
+        Args:
+            key (tuple): The cache key.
+
+        Returns:
+            bytes: The cached image bytes, or None when the key is not cached.
+        """
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key, image_bytes):
+        """
+        Store image bytes, evicting the least recently used images to stay in budget.
+        Images larger than the whole budget are not cached.
+
+        Args:
+            key (tuple): The cache key.
+            image_bytes (bytes): The encoded image.
+        """
+        size = len(image_bytes)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= len(self._entries.pop(key))
+            self._entries[key] = image_bytes
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= len(evicted)
+                self.evictions += 1
+
+    def get_or_render(self, key, render):
+        """
+        Get cached image bytes, rendering and caching them on a miss.
+
+        Args:
+            key (tuple): The cache key.
+            render (callable): Function with no arguments that returns the image bytes.
+
+        Returns:
+            bytes: The encoded image.
+        """
+        image_bytes = self.get(key)
+        if image_bytes is None:
+            image_bytes = render()
+            self.put(key, image_bytes)
+        return image_bytes
+
+    def clear(self):
+        """
+        Remove all cached images and reset the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self):
+        """
+        Get the cache counters.
+
+        Returns:
+            dict: Hits, misses, evictions, entry count and bytes used.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+# shared by every session in the server process
+render_cache = RenderCache()
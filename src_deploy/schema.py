@@ -0,0 +1,108 @@
+import argparse
+import numpy as np
+import pandas as pd
+from scorecard import merge_metrics
+
+# swing outcomes, see hunt.swing_outcome
+SWING_RESULTS = [
+    "Swing and Miss",
+    "Hit and Out",
+    "Hit and Safe",
+    "Hit Foul",
+    "Foul Tip",
+    "Other",
+]
+# compact dtypes of the merged swing metrics. Batter IDs are nine digits, which fit
+# in int32. The pitch location and angles are measured to well under float32's
+# precision, the contact location and distance stay float64 since their scores
+# compare them against threshold edges a float32 rounding could cross. The flag
+# is nullable, it's missing for swings without a swing map row.
+MERGED_SCHEMA = {
+    "batter": "int32",
+    "batter_count": "int32",
+    "pitch_x": "float32",
+    "pitch_z": "float32",
+    "swing_result": pd.CategoricalDtype(SWING_RESULTS),
+    "two_strikes": "boolean",
+    "distance": "float64",
+    "attack_angle": "float32",
+    "track_angle": "float32",
+    "contact_y_loc": "float64",
+}
+
+
+def compact_metrics(df, schema=None):
+    """
+    Convert swing metrics to compact dtypes.
+
+    Args:
+        df (pd.DataFrame): Swing metrics, e.g. from merge_metrics.
+        schema (dict, optional): The dtype of each column, columns missing from df are
+            skipped. Defaults to MERGED_SCHEMA.
+
+    Returns:
+        pd.DataFrame: The swing metrics with compact dtypes.
+
+    Raises:
+        ValueError: If an integer column has values outside its dtype's range, or a
+            categorical column has values outside its categories.
+    """
+    schema = schema or MERGED_SCHEMA
+    dtypes = {column: dtype for column, dtype in schema.items() if column in df}
+    for column, dtype in dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype):
+            unknown = set(df[column].dropna()) - set(dtype.categories)
+            if unknown:
+                raise ValueError(f"{column} has values outside its categories: {unknown}")
+        elif pd.api.types.is_integer_dtype(dtype) and len(df):
+            limits = np.iinfo(dtype)
+            if df[column].min() < limits.min or df[column].max() > limits.max:
+                raise ValueError(f"{column} has values outside the range of {dtype}")
+    return df.astype(dtypes)
+
+
+def load_compact_metrics(data_folder):
+    """
+    Merge the swing metrics with compact dtypes, reading each table with them so the
+    float64 and object columns are never all in memory.
+
+    Args:
+        data_folder (str): Path to the folder containing metric data files.
+
+    Returns:
+        pd.DataFrame: Merged DataFrame containing all metrics, see merge_metrics.
+    """
+    return compact_metrics(merge_metrics(data_folder, dtypes=MERGED_SCHEMA))
+
+
+def memory_report(df):
+    """
+    Compare the memory of swing metrics before and after compacting them.
+
+    Args:
+        df (pd.DataFrame): Swing metrics, e.g. from merge_metrics.
+
+    Returns:
+        pd.DataFrame: The deep memory usage in bytes of each column with the default
+        and the compact dtypes.
+    """
+    report = pd.DataFrame(
+        {
+            "dtype": df.dtypes.astype(str),
+            "bytes": df.memory_usage(deep=True, index=False),
+        }
+    )
+    compact_df = compact_metrics(df)
+    report["compact_dtype"] = compact_df.dtypes.astype(str)
+    report["compact_bytes"] = compact_df.memory_usage(deep=True, index=False)
+    report.loc["total"] = [
+        None, report["bytes"].sum(), None, report["compact_bytes"].sum()
+    ]
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report the memory of compact swing metrics")
+    parser.add_argument("--data-folder", default="../data/dataframes")
+    args = parser.parse_args()
+    print(memory_report(merge_metrics(args.data_folder)).to_string())
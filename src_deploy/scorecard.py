@@ -1,45 +1,228 @@
+from functools import reduce
+import numpy as np
 import pandas as pd
 from hunt import hunt_scorecard
 from track_angle import create_tracking_score_df
 from contact_loc import contact_loc_scorecard
 from similarity import similarity_scorecard
+from stage_timer import stage_timer
 
+# columns the metric tables are joined on
+KEY_COLUMNS = ["batter", "batter_count"]
+# grading thresholds matching the dashboard's initial slider positions
+DEFAULT_THRESHOLDS = {
+    "contact_location": [1.5, 0.75, 0.25, -0.5, -1.5],
+    "track_angle": [5, 5, 5, 5],
+    "hunting": [0.7, 0.9, 1.1, 1.3],
+    "similarity": [1.0, 0.9, 0.8, 0.7],
+}
 
-def merge_metrics(data_folder):
+
+def read_metric_tables(data_folder, dtypes=None):
+    """
+    Read the metric tables in the order merge_metrics joins them.
+
+    Args:
+        data_folder (str): Path to the folder containing metric data files.
+        dtypes (dict, optional): Dtypes to read columns with, e.g.
+            schema.MERGED_SCHEMA. Defaults to None, inferring them.
+
+    Returns:
+        list: The swing map table with all its columns, then the distance, tracking
+        and timing tables with the key columns and the columns they add.
+    """
+    read_options = {"dtype": dtypes} if dtypes else dict()
+    swing_map_df = pd.read_csv(f"{data_folder}/swing_map_metrics_df.csv", **read_options)
+    distance_metrics_df = pd.read_csv(
+        f"{data_folder}/distance_metrics_df.csv", **read_options
+    )
+    tracking_metrics_df = pd.read_csv(
+        f"{data_folder}/tracking_metrics_df.csv", **read_options
+    )
+    timing_metrics_df = pd.read_csv(f"{data_folder}/timing_metrics_df.csv", **read_options)
+    return [
+        swing_map_df,
+        distance_metrics_df[KEY_COLUMNS + ["distance"]],
+        tracking_metrics_df[KEY_COLUMNS + ["attack_angle", "track_angle"]],
+        timing_metrics_df[KEY_COLUMNS + ["contact_y_loc"]],
+    ]
+
+
+def outer_merge(tables):
+    """
+    Join metric tables with chained outer merges on the key columns.
+
+    Args:
+        tables (list): The metric tables, see read_metric_tables.
+
+    Returns:
+        pd.DataFrame: The joined tables.
+    """
+    return reduce(lambda df, table: df.merge(table, on=KEY_COLUMNS, how="outer"), tables)
+
+
+def sort_keys(tables):
+    """
+    Sort each table's rows by key and line up the tables' keys, with missing keys
+    last like the outer merges sort them.
+
+    Args:
+        tables (list): The metric tables, see read_metric_tables.
+
+    Returns:
+        tuple: For each table its row order sorted by key and how many rows it has of
+        every key of all the tables, in key order. Then a DataFrame of those keys.
+    """
+    # empty tables are left out so their inferred key dtypes don't change the result
+    key_dfs = [table[KEY_COLUMNS] for table in tables if len(table)] or [
+        tables[0][KEY_COLUMNS]
+    ]
+    batter_dtype = np.result_type(*[df["batter"].dtype for df in key_dfs])
+    count_dtype = np.result_type(*[df["batter_count"].dtype for df in key_dfs])
+    packable = (
+        np.issubdtype(batter_dtype, np.integer)
+        and np.issubdtype(count_dtype, np.integer)
+        and all(
+            df.empty
+            or (
+                df["batter"].min() >= 0
+                and df["batter"].max() < 2**31
+                and df["batter_count"].min() >= 0
+                and df["batter_count"].max() < 2**32
+            )
+            for df in key_dfs
+        )
+    )
+    if packable:
+        # both keys pack into one int64
+        table_keys = [
+            (table["batter"].to_numpy(np.int64) << 32)
+            | table["batter_count"].to_numpy(np.int64)
+            for table in tables
+        ]
+    else:
+        # keys that may be missing are ranked together, which takes more memory
+        keys = pd.concat(key_dfs, ignore_index=True)
+        packed = np.zeros(len(keys), dtype=np.int64)
+        for column in KEY_COLUMNS:
+            codes, uniques = pd.factorize(keys[column], sort=True)
+            codes = np.where(codes < 0, len(uniques), codes)
+            packed = packed * (len(uniques) + 1) + codes
+        table_keys = np.split(packed, np.cumsum([len(table) for table in tables])[:-1])
+
+    # row positions fit in int32 for any table under two billion rows
+    index_dtype = np.int32 if max(map(len, tables)) < 2**31 else np.int64
+    orders = []
+    for i, table_key in enumerate(table_keys):
+        order = np.argsort(table_key, kind="stable")
+        table_keys[i] = table_key[order]
+        orders.append(order.astype(index_dtype))
+        del order
+    all_keys = np.concatenate(table_keys)
+    all_keys.sort()
+    first = np.ones(len(all_keys), dtype=bool)
+    first[1:] = all_keys[1:] != all_keys[:-1]
+    unique_keys = all_keys[first]
+    del all_keys, first
+    # how many rows each table has of every key
+    counts = [
+        (
+            np.searchsorted(table_key, unique_keys, "right")
+            - np.searchsorted(table_key, unique_keys, "left")
+        ).astype(index_dtype)
+        for table_key in table_keys
+    ]
+    del table_keys
+
+    if packable:
+        key_values = pd.DataFrame(
+            {
+                "batter": (unique_keys >> 32).astype(batter_dtype),
+                "batter_count": (unique_keys & (2**32 - 1)).astype(count_dtype),
+            }
+        )
+    else:
+        # the first row of each key holds its values
+        order = np.argsort(packed, kind="stable")
+        first_rows = order[np.searchsorted(packed[order], unique_keys)]
+        key_values = keys.take(first_rows).reset_index(drop=True)
+    return list(zip(orders, counts)), key_values
+
+
+def aligned_merge(tables):
+    """
+    Join metric tables in one pass, giving the same rows, order and dtypes as
+    outer_merge. Each table's rows are sorted by key once, then every key's output
+    rows are laid out at once: a key repeated in several tables gets every
+    combination of its rows, nested in table order with the first table outermost,
+    and a table without the key fills its columns with missing values.
+
+    Args:
+        tables (list): The metric tables, see read_metric_tables.
+
+    Returns:
+        pd.DataFrame: The joined tables.
+    """
+    sorted_tables, key_values = sort_keys(tables)
+    key_count = len(key_values)
+    repeats = np.prod([np.maximum(counts, 1) for _, counts in sorted_tables], axis=0)
+    unique_keys = bool((repeats == 1).all())
+    row_keys = np.arange(key_count)
+    # position of each output row within its key's rows
+    offsets = None
+    if not unique_keys:
+        row_keys = np.repeat(row_keys, repeats)
+        offsets = np.arange(len(row_keys)) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+    del repeats
+
+    joined = []
+    for index in reversed(range(len(tables))):
+        order, counts = sorted_tables.pop()
+        if not len(order):
+            rows = np.full(len(row_keys), -1)
+        else:
+            # where each key's rows start in the sorted table
+            starts = np.cumsum(counts) - counts
+            if unique_keys:
+                position = starts
+            else:
+                row_count = np.maximum(counts, 1)[row_keys]
+                position = starts[row_keys] + offsets % row_count
+                offsets = offsets // row_count
+                counts = counts[row_keys]
+            rows = np.where(counts > 0, order[np.minimum(position, len(order) - 1)], -1)
+            del order, counts, starts, position
+        # rows missing from the table (-1) are filled in by the reindex
+        table = tables[index].reset_index(drop=True).reindex(rows).reset_index(drop=True)
+        del rows
+        # the keys are filled in from the keys of all the tables
+        joined.append(table if index == 0 else table.drop(columns=KEY_COLUMNS))
+    joined.reverse()
+    joined_df = pd.concat(joined, axis=1)
+    for column in KEY_COLUMNS:
+        joined_df[column] = key_values[column].array.take(row_keys)
+    return joined_df
+
+
+@stage_timer.timed()
+def merge_metrics(data_folder, dtypes=None, join=None):
     """
     Merge various metrics into one DataFrame.
 
     Args:
         data_folder (str): Path to the folder containing metric data files.
+        dtypes (dict, optional): Dtypes to read columns with, e.g.
+            schema.MERGED_SCHEMA. Defaults to None, inferring them.
+        join (callable, optional): Function joining the metric tables, e.g.
+            outer_merge. Defaults to aligned_merge.
 
     Returns:
         pd.DataFrame: Merged DataFrame containing all metrics.
     """
-    # import all data
-    swing_map_df = pd.read_csv(f"{data_folder}/swing_map_metrics_df.csv")
-    distance_metrics_df = pd.read_csv(f"{data_folder}/distance_metrics_df.csv")
-    tracking_metrics_df = pd.read_csv(f"{data_folder}/tracking_metrics_df.csv")
-    timing_metrics_df = pd.read_csv(f"{data_folder}/timing_metrics_df.csv")
-
+    join = join or aligned_merge
     # merge all metrics to one dataframe
     all_metrics_df = (
-        swing_map_df.merge(
-            distance_metrics_df[["batter", "batter_count", "distance"]],
-            on=["batter", "batter_count"],
-            how="outer",
-        )
-        .merge(
-            tracking_metrics_df[
-                ["batter", "batter_count", "attack_angle", "track_angle"]
-            ],
-            on=["batter", "batter_count"],
-            how="outer",
-        )
-        .merge(
-            timing_metrics_df[["batter", "batter_count", "contact_y_loc"]],
-            on=["batter", "batter_count"],
-            how="outer",
-        )
+        join(read_metric_tables(data_folder, dtypes))
         .drop("Unnamed: 0", axis=1)
         .dropna(subset=["batter"])
     )
@@ -47,23 +230,50 @@ def merge_metrics(data_folder):
     return all_metrics_df
 
 
-def generate_scorecard(
-    data_folder, contact_location_values, track_angle_values, hunting_values, sim_values
+def combine_scorecards(
+    timing_score_df, tracking_score_df, hunting_score_df, similarity_score_df
 ):
     """
-    Generate a scorecard by merging and scoring all swing metrics.
+    Combine the per-metric scorecards into one scorecard.
 
     Args:
-        data_folder (str): Path to the folder containing metric data files.
+        timing_score_df (pd.DataFrame): Contact location scorecard.
+        tracking_score_df (pd.DataFrame): Tracking angle scorecard.
+        hunting_score_df (pd.DataFrame): Hunting scorecard.
+        similarity_score_df (pd.DataFrame): Swing similarity scorecard.
+
+    Returns:
+        pd.DataFrame: DataFrame containing the scorecard.
+    """
+    # a metric without any scored batters has no columns, e.g. in a small partition
+    score_dfs = [
+        df
+        for df in [timing_score_df, tracking_score_df, hunting_score_df, similarity_score_df]
+        if "batter" in df.columns
+    ]
+    if not score_dfs:
+        return pd.DataFrame()
+    return reduce(
+        lambda scorecard, df: scorecard.merge(df, on="batter", how="outer"), score_dfs
+    )
+
+
+def score_metrics(
+    all_swing_metrics_df, contact_location_values, track_angle_values, hunting_values, sim_values
+):
+    """
+    Score already merged swing metrics and combine the metric scores into a scorecard.
+
+    Args:
+        all_swing_metrics_df (pd.DataFrame): Merged swing metrics, see merge_metrics.
         contact_location_values (list): Custom values for contact location scoring.
         track_angle_values (list): Custom values for track angle scoring.
         hunting_values (list): Custom values for swing map (hunting) scoring.
+        sim_values (list): Custom values for swing similarity scoring.
 
     Returns:
         pd.DataFrame: DataFrame containing the scorecard.
     """
-    # get all metrics for each swing
-    all_swing_metrics_df = merge_metrics(data_folder)
     # get summary metrics for each batter
     timing_score_df = contact_loc_scorecard(contact_location_values, all_swing_metrics_df)
     tracking_score_df = create_tracking_score_df(
@@ -72,12 +282,36 @@ def generate_scorecard(
     hunting_score_df = hunt_scorecard(hunting_values, all_swing_metrics_df)
     similarity_score_df = similarity_scorecard(sim_values, all_swing_metrics_df)
     # merge all metrics into a scorecard
-    scorecard_df = timing_score_df.merge(
-        tracking_score_df, on="batter", how="outer"
-    ).merge(hunting_score_df, on="batter", how="outer"
-    ).merge(similarity_score_df, on="batter", how="outer")
+    return combine_scorecards(
+        timing_score_df, tracking_score_df, hunting_score_df, similarity_score_df
+    )
+
+
+@stage_timer.timed()
+def generate_scorecard(
+    data_folder, contact_location_values, track_angle_values, hunting_values, sim_values
+):
+    """
+    Generate a scorecard by merging and scoring all swing metrics.
+
+    Args:
+        data_folder (str): Path to the folder containing metric data files.
+        contact_location_values (list): Custom values for contact location scoring.
+        track_angle_values (list): Custom values for track angle scoring.
+        hunting_values (list): Custom values for swing map (hunting) scoring.
 
-    return scorecard_df
+    Returns:
+        pd.DataFrame: DataFrame containing the scorecard.
+    """
+    # get all metrics for each swing
+    all_swing_metrics_df = merge_metrics(data_folder)
+    return score_metrics(
+        all_swing_metrics_df,
+        contact_location_values,
+        track_angle_values,
+        hunting_values,
+        sim_values,
+    )
 
 
 if __name__ == "__main__":
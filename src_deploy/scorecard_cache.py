@@ -0,0 +1,123 @@
+import hashlib
+import json
+from threading import Lock
+from cachetools import TTLCache
+
+
+def threshold_key(data_version, thresholds, min_swing_count=None):
+    """
+    Build a canonical hash of a scoring configuration, so equivalent configurations
+    (ints vs floats, tuples vs lists, key order) share one cache entry.
+
+    Args:
+        data_version (str): Version of the data being scored, see utils.data_version.
+        thresholds (dict): Grading thresholds keyed like scorecard.DEFAULT_THRESHOLDS.
+        min_swing_count (int, optional): Minimum swing count filter. Defaults to None.
+
+    Returns:
+        str: The configuration hash.
+    """
+    config = {
+        "data_version": data_version,
+        "thresholds": {
+            name: [float(value) for value in values]
+            for name, values in thresholds.items()
+        },
+        "min_swing_count": None if min_swing_count is None else int(min_swing_count),
+    }
+    canonical = json.dumps(config, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class ScorecardCache:
+    """
+    Process-wide scorecard cache shared by every dashboard session, bounded in size and
+    expiring entries after a time to live.
+
+    Args:
+        maxsize (int, optional): Maximum number of cached scorecards. Defaults to 64.
+        ttl (float, optional): Seconds a scorecard stays cached. Defaults to one hour.
+    """
+
+    def __init__(self, maxsize=64, ttl=3600):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._cache)
+
+    def get(self, key):
+        """
+        Get a cached scorecard.
+
+        Args:
+            key (str): The configuration hash, see threshold_key.
+
+        Returns:
+            The cached scorecard, or None when it is missing or expired.
+        """
+        with self._lock:
+            value = self._cache.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return value
+
+    def put(self, key, scorecard):
+        """
+        Cache a scorecard.
+
+        Args:
+            key (str): The configuration hash, see threshold_key.
+            scorecard: The scorecard to cache.
+        """
+        with self._lock:
+            self._cache[key] = scorecard
+
+    def get_or_compute(self, key, compute):
+        """
+        Get a cached scorecard, computing and caching it on a miss.
+
+        Args:
+            key (str): The configuration hash, see threshold_key.
+            compute (callable): Function with no arguments that builds the scorecard.
+
+        Returns:
+            The scorecard.
+        """
+        scorecard = self.get(key)
+        if scorecard is None:
+            scorecard = compute()
+            self.put(key, scorecard)
+        return scorecard
+
+    def clear(self):
+        """
+        Remove every cached scorecard.
+        """
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self):
+        """
+        Get the cache counters.
+
+        Returns:
+            dict: Hits, misses, entry count and limits.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._cache),
+                "maxsize": self._cache.maxsize,
+                "ttl": self._cache.ttl,
+            }
+
+
+# shared by every session in the server process
+shared_scorecard_cache = ScorecardCache()
@@ -0,0 +1,52 @@
+from io import StringIO
+import pandas as pd
+import requests
+
+
+class ScoringClient:
+    """
+    Thin client for the scoring service, see scoring_service.py.
+
+    Args:
+        url (str): Base URL of the scoring service (e.g. 'http://127.0.0.1:8502').
+        timeout (float, optional): Request timeout in seconds. Defaults to 60.
+    """
+
+    def __init__(self, url, timeout=60):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def _post(self, path, payload):
+        response = self.session.post(f"{self.url}{path}", json=payload, timeout=self.timeout)
+        if response.status_code != 200:
+            raise RuntimeError(f"Scoring service error: {response.text}")
+        return response
+
+    def scorecard(self, thresholds):
+        """
+        Get the scorecard for a set of grading thresholds.
+
+        Args:
+            thresholds (dict): Grading thresholds keyed like DEFAULT_THRESHOLDS.
+
+        Returns:
+            pd.DataFrame: DataFrame containing the scorecard.
+        """
+        response = self._post("/scorecard", {"thresholds": thresholds})
+        return pd.read_json(StringIO(response.text), orient="records")
+
+    def plot(self, kind, batter_id, thresholds):
+        """
+        Get a batter plot.
+
+        Args:
+            kind (str): The plot kind ('tracking', 'hunting' or 'contact_location').
+            batter_id (int): The ID of the batter.
+            thresholds (dict): Grading thresholds keyed like DEFAULT_THRESHOLDS.
+
+        Returns:
+            bytes: The PNG image.
+        """
+        payload = {"batter": int(batter_id), "thresholds": thresholds}
+        return self._post(f"/plot/{kind}", payload).content
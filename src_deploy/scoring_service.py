@@ -0,0 +1,268 @@
+import argparse
+import json
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock
+import pandas as pd
+from scorecard import score_metrics, DEFAULT_THRESHOLDS
+from schema import load_compact_metrics
+from render_cache import RenderCache
+from scorecard_cache import ScorecardCache, threshold_key
+from utils import data_version
+from batter_index import BatterIndex
+from batter_plots import PLOT_KINDS, render_plot_png
+
+THRESHOLD_NAMES = ["contact_location", "track_angle", "hunting", "similarity"]
+
+# per-worker state, loaded once by the pool initializer
+_worker = dict()
+
+
+def load_worker_data(data_folder):
+    """
+    Load the metric tables once per pool worker.
+
+    Args:
+        data_folder (str): Path to the folder containing metric data files.
+    """
+    import matplotlib
+
+    matplotlib.use("Agg")
+    _worker["all_swing_metrics_df"] = load_compact_metrics(data_folder)
+    _worker["tracking_df"] = pd.read_csv(f"{data_folder}/tracking_metrics_df.csv")
+    _worker["data_version"] = data_version(_worker["all_swing_metrics_df"])
+    # per-batter slices for the plots
+    _worker["swing_metrics_index"] = BatterIndex(_worker["all_swing_metrics_df"])
+    _worker["swing_map_index"] = BatterIndex(
+        pd.read_csv(f"{data_folder}/swing_map_metrics_df.csv")
+    )
+    _worker["timing_index"] = BatterIndex(
+        pd.read_csv(f"{data_folder}/timing_metrics_df.csv")
+    )
+
+
+def threshold_values(thresholds):
+    """
+    Fill in missing grading thresholds with the defaults.
+
+    Args:
+        thresholds (dict): Grading thresholds keyed like DEFAULT_THRESHOLDS.
+
+    Returns:
+        list: The thresholds in the order score_metrics takes them.
+    """
+    return [list(thresholds.get(name, DEFAULT_THRESHOLDS[name])) for name in THRESHOLD_NAMES]
+
+
+def compute_scorecard(thresholds):
+    """
+    Score every batter inside a pool worker.
+
+    Args:
+        thresholds (dict): Grading thresholds keyed like DEFAULT_THRESHOLDS.
+
+    Returns:
+        str: The scorecard as JSON records.
+    """
+    scorecard_df = score_metrics(_worker["all_swing_metrics_df"], *threshold_values(thresholds))
+    return scorecard_df.to_json(orient="records", double_precision=15)
+
+
+def compute_plot(kind, batter_id, thresholds):
+    """
+    Build a batter plot inside a pool worker and encode it as a PNG.
+
+    Args:
+        kind (str): The plot kind, one of PLOT_KINDS.
+        batter_id (int): The ID of the batter.
+        thresholds (dict): Grading thresholds keyed like DEFAULT_THRESHOLDS.
+
+    Returns:
+        bytes: The PNG image.
+    """
+    values = dict(zip(THRESHOLD_NAMES, threshold_values(thresholds)))
+    return render_plot_png(kind, batter_id, values, _worker)
+
+
+class ScoringService:
+    """
+    Scores batters and renders their plots on a shared worker pool. Results are cached
+    for every client, and identical requests that arrive while one is already being
+    computed wait on the same result instead of computing it again.
+
+    Args:
+        data_folder (str): Path to the folder containing metric data files.
+        workers (int, optional): Number of worker processes. Defaults to the CPU count.
+    """
+
+    def __init__(self, data_folder, workers=None):
+        self.data_folder = data_folder
+        self.data_version = data_version(load_compact_metrics(data_folder))
+        self.pool = ProcessPoolExecutor(
+            max_workers=workers, initializer=load_worker_data, initargs=(data_folder,)
+        )
+        self.scorecards = ScorecardCache()
+        self.plots = RenderCache()
+        self._pending = dict()
+        self._lock = Lock()
+
+    def _shared(self, key, submit):
+        """
+        Get the future computing a result, starting it only if no identical request is
+        already running.
+        """
+        with self._lock:
+            future = self._pending.get(key)
+            if future is None:
+                future = submit()
+                self._pending[key] = future
+                future.add_done_callback(lambda _: self._pending.pop(key, None))
+        return future
+
+    def scorecard(self, thresholds):
+        """
+        Get the scorecard for a set of grading thresholds.
+
+        Args:
+            thresholds (dict): Grading thresholds keyed like DEFAULT_THRESHOLDS.
+
+        Returns:
+            str: The scorecard as JSON records.
+        """
+        values = dict(zip(THRESHOLD_NAMES, threshold_values(thresholds)))
+        key = threshold_key(self.data_version, values)
+        return self.scorecards.get_or_compute(
+            key,
+            lambda: self._shared(
+                key, lambda: self.pool.submit(compute_scorecard, values)
+            ).result(),
+        )
+
+    def plot(self, kind, batter_id, thresholds):
+        """
+        Get a batter plot as a PNG.
+
+        Args:
+            kind (str): The plot kind, one of PLOT_KINDS.
+            batter_id (int): The ID of the batter.
+            thresholds (dict): Grading thresholds keyed like DEFAULT_THRESHOLDS.
+
+        Returns:
+            bytes: The PNG image.
+        """
+        if kind not in PLOT_KINDS:
+            raise ValueError(f"Unknown plot kind: {kind}")
+        values = threshold_values(thresholds)
+        key = self.plots.make_key(
+            kind, batter_id, [tuple(v) for v in values], self.data_version
+        )
+        return self.plots.get_or_render(
+            key,
+            lambda: self._shared(
+                key, lambda: self.pool.submit(compute_plot, kind, int(batter_id), thresholds)
+            ).result(),
+        )
+
+    def stats(self):
+        """
+        Get cache statistics.
+
+        Returns:
+            dict: Cached scorecard count and plot cache counters.
+        """
+        return {
+            "data_version": self.data_version,
+            "scorecards": self.scorecards.stats(),
+            "plots": self.plots.stats(),
+        }
+
+    def close(self):
+        """
+        Shut down the worker pool.
+        """
+        self.pool.shutdown()
+
+
+def make_handler(service):
+    """
+    Build the HTTP request handler class for a scoring service.
+
+    Args:
+        service (ScoringService): The service answering requests.
+
+    Returns:
+        type: The request handler class.
+    """
+
+    class ScoringHandler(BaseHTTPRequestHandler):
+        def _send(self, status, body, content_type="application/json"):
+            if isinstance(body, str):
+                body = body.encode()
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send(200, json.dumps({"status": "ok"}))
+            elif self.path == "/stats":
+                self._send(200, json.dumps(service.stats()))
+            else:
+                self._send(404, json.dumps({"error": f"Unknown path: {self.path}"}))
+
+        def do_POST(self):
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                thresholds = request.get("thresholds", dict())
+                if self.path == "/scorecard":
+                    self._send(200, service.scorecard(thresholds))
+                elif self.path.startswith("/plot/"):
+                    kind = self.path[len("/plot/"):]
+                    image = service.plot(kind, request["batter"], thresholds)
+                    self._send(200, image, "image/png")
+                else:
+                    self._send(404, json.dumps({"error": f"Unknown path: {self.path}"}))
+            except (KeyError, ValueError) as e:
+                self._send(400, json.dumps({"error": str(e)}))
+            except Exception as e:
+                self._send(500, json.dumps({"error": str(e)}))
+
+        def log_message(self, format, *args):
+            pass
+
+    return ScoringHandler
+
+
+def serve(data_folder, host="127.0.0.1", port=8502, workers=None):
+    """
+    Run the scoring service until interrupted.
+
+    Args:
+        data_folder (str): Path to the folder containing metric data files.
+        host (str, optional): Interface to listen on. Defaults to 127.0.0.1.
+        port (int, optional): Port to listen on. Defaults to 8502.
+        workers (int, optional): Number of worker processes. Defaults to the CPU count.
+    """
+    service = ScoringService(data_folder, workers)
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    print(f"Scoring service on http://{host}:{port} (data version {service.data_version})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless batter scoring service")
+    parser.add_argument("--data-folder", default="../data/dataframes")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    serve(args.data_folder, args.host, args.port, args.workers)
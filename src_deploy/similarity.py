@@ -1,7 +1,8 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 from utils import get_grade, color_letter
+from batter_index import BatterIndex
+from stage_timer import stage_timer
 
 
 def filter_path(path_df):
@@ -90,6 +91,32 @@ def convert_column_name(column_name):
 
 
 
+def summarize_similarity(dist_grades, swing_count, good_count):
+    """
+    Convert a batter's count of non-outlier swings into their scorecard entries.
+
+    Args:
+        dist_grades (list): List of distance thresholds for grading.
+        swing_count (int): The number of swings with a distance.
+        good_count (int): The number of swings within 2 std of the mean distance.
+
+    Returns:
+        dict: The good swing percent and grade.
+    """
+    # convert good swing percent (dist_score) to a grade
+    distance_thresholds = {
+        "A": dist_grades[0],
+        "B": dist_grades[1],
+        "C": dist_grades[2],
+        "D": dist_grades[3],
+    }
+    return {
+        "dist_score": good_count / swing_count,
+        "dist_grade": get_grade(good_count / swing_count, distance_thresholds),
+    }
+
+
+@stage_timer.timed()
 def similarity_scorecard(dist_grades, distance_df):
     """
     Generate a scorecard for batters based on their distance metrics.
@@ -102,14 +129,14 @@ def similarity_scorecard(dist_grades, distance_df):
         pd.DataFrame: Scorecard DataFrame for each batter.
     """
     batters = distance_df.batter.unique()
+    index = BatterIndex(distance_df)
     scorecard_list = []
     for batter in batters:
         scorecard_dict = dict()
         scorecard_dict["batter"] = batter
         
-        batter_df = distance_df[
-            (distance_df["batter"] == batter) & (distance_df["distance"] > 0)
-        ]
+        batter_df = index.get(batter)
+        batter_df = batter_df[batter_df["distance"] > 0]
         # distance values of -2, -1, and 0 indicate specific data situations, and should not
         # be included in the variance calculations
         if len(batter_df) == 0:
@@ -123,16 +150,8 @@ def similarity_scorecard(dist_grades, distance_df):
                 (batter_df["distance"] < max_dist) & (batter_df["distance"] > min_dist)
             ]
         )
-        scorecard_dict["dist_score"] = good_count / swing_count
-        # convert good swing percent (dist_score) to a grade
-        distance_thresholds = {
-            "A": dist_grades[0],
-            "B": dist_grades[1],
-            "C": dist_grades[2],
-            "D": dist_grades[3],
-        }
-        scorecard_dict["dist_grade"] = get_grade(
-            good_count / swing_count, distance_thresholds
+        scorecard_dict.update(
+            summarize_similarity(dist_grades, swing_count, good_count)
         )
         scorecard_list.append(scorecard_dict)
     return pd.DataFrame.from_dict(scorecard_list)
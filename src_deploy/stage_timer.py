@@ -0,0 +1,176 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from threading import Lock
+
+
+class StageTimer:
+    """
+    Records the wall time and call count of named pipeline stages (data load, merging,
+    scoring, plotting, image export). Totals are kept for every call, and the most
+    recent calls are kept as events with their start time and thread, so nested and
+    concurrent stages can be viewed as a Chrome trace.
+
+    Args:
+        max_events (int, optional): Number of recent calls kept as events.
+            Defaults to 10,000.
+    """
+
+    def __init__(self, max_events=10_000):
+        self.enabled = True
+        self._events = deque(maxlen=max_events)
+        self._totals = dict()
+        self._lock = Lock()
+
+    def record(self, name, start, duration, args=None):
+        """
+        Record one call of a stage.
+
+        Args:
+            name (str): The stage name.
+            start (float): When the call started, from time.perf_counter().
+            duration (float): Wall time of the call in seconds.
+            args (dict, optional): Details shown with the call in a trace.
+        """
+        with self._lock:
+            calls, total, longest = self._totals.get(name, (0, 0.0, 0.0))
+            self._totals[name] = (calls + 1, total + duration, max(longest, duration))
+            self._events.append(
+                (name, start, duration, threading.get_ident(), args or dict())
+            )
+
+    @contextmanager
+    def stage(self, name, **args):
+        """
+        Time the code inside a with block as one call of a stage.
+
+        Args:
+            name (str): The stage name.
+            **args: Details shown with the call in a trace (e.g. the batter ID).
+        """
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter() - start, args)
+
+    def timed(self, name=None):
+        """
+        Decorator timing every call of a function as a stage.
+
+        Args:
+            name (str, optional): The stage name. Defaults to the function name.
+
+        Returns:
+            callable: The decorator.
+        """
+
+        def decorator(function):
+            stage_name = name or function.__name__
+
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.record(stage_name, start, time.perf_counter() - start)
+
+            return wrapper
+
+        return decorator
+
+    def reset(self):
+        """
+        Clear the recorded calls.
+        """
+        with self._lock:
+            self._events.clear()
+            self._totals.clear()
+
+    def summary(self):
+        """
+        Get the totals of each stage, slowest first.
+
+        Returns:
+            list: A dict per stage with its name, calls, total, mean and longest wall
+            time in seconds.
+        """
+        with self._lock:
+            totals = list(self._totals.items())
+        stages = [
+            {
+                "stage": name,
+                "calls": calls,
+                "total": total,
+                "mean": total / calls,
+                "max": longest,
+            }
+            for name, (calls, total, longest) in totals
+        ]
+        return sorted(stages, key=lambda stage: -stage["total"])
+
+    def events(self):
+        """
+        Get the recent calls.
+
+        Returns:
+            list: A dict per call with the stage name, start (seconds on the
+            perf_counter clock), duration, thread ID and details.
+        """
+        with self._lock:
+            events = list(self._events)
+        return [
+            {"stage": name, "start": start, "duration": duration, "thread": tid, "args": args}
+            for name, start, duration, tid, args in events
+        ]
+
+    def to_json(self):
+        """
+        Export the stage totals and recent calls.
+
+        Returns:
+            str: JSON with 'stages' (see summary) and 'events' (see events).
+        """
+        return json.dumps(
+            {"stages": self.summary(), "events": self.events()}, default=str, indent=2
+        )
+
+    def to_chrome_trace(self):
+        """
+        Export the recent calls in the Chrome trace event format, which chrome://tracing
+        and Perfetto open.
+
+        Returns:
+            str: The trace as JSON.
+        """
+        pid = os.getpid()
+        trace_events = [
+            {
+                "name": event["stage"],
+                "cat": "stage",
+                "ph": "X",
+                "ts": event["start"] * 1e6,
+                "dur": event["duration"] * 1e6,
+                "pid": pid,
+                "tid": event["thread"],
+                "args": event["args"],
+            }
+            for event in self.events()
+        ]
+        return json.dumps(
+            {"traceEvents": trace_events, "displayTimeUnit": "ms"}, default=str
+        )
+
+
+# shared by every session in the server process
+stage_timer = StageTimer()
@@ -1,16 +1,30 @@
+import os
 import streamlit as st
 import pandas as pd
 import plotly.io as pio
 from PIL import Image
 from io import BytesIO
-from track_angle import (
-    plot_tracking_angles,
-    create_tracking_score_df,
-    generate_track_angle_plot,
+from track_angle import create_tracking_score_df
+from track_angle_viz import plot_tracking_angles, generate_track_angle_plot
+from hunt_viz import plot_hunting, hunting_preview_background, draw_hunting_radii
+from contact_loc_viz import (
+    viz_contact_loc,
+    contact_preview_background,
+    draw_quality_locations,
 )
-from hunt import plot_hunting
-from contact_loc import viz_contact_loc
 from scorecard import generate_scorecard
+from schema import load_compact_metrics
+from render_cache import render_cache
+from utils import data_version
+from figures import FigureSlots, LayeredFigure
+from kde import get_contact_kde
+from batter_index import BatterIndex, get_batter_index
+from batter_plots import PLOT_THRESHOLDS, render_plot_png, render_batch
+from scoring_client import ScoringClient
+from scorecard_cache import shared_scorecard_cache, threshold_key
+from live_game import read_snapshot
+from summary_store import load_summary_store
+from stage_timer import stage_timer
 
 # Load data
 github = "https://raw.githubusercontent.com/woodmc10/wisd_2024_public/main"
@@ -18,10 +32,27 @@ github = "https://raw.githubusercontent.com/woodmc10/wisd_2024_public/main"
 data_folder = f"{github}/data/dataframes"
 image_folder = f"{github}/images/grades"
 
-swing_map_df = pd.read_csv(f"{data_folder}/swing_map_metrics_df.csv")
-tracking_metrics_df = pd.read_csv(f"{data_folder}/tracking_metrics_df.csv")
-timing_metrics_df = pd.read_csv(f"{data_folder}/timing_metrics_df.csv")
-similarity_metrics_df = pd.read_csv(f"{data_folder}/distance_metrics_df.csv")
+with stage_timer.stage("load_data"):
+    swing_map_df = pd.read_csv(f"{data_folder}/swing_map_metrics_df.csv")
+    tracking_metrics_df = pd.read_csv(f"{data_folder}/tracking_metrics_df.csv")
+    timing_metrics_df = pd.read_csv(f"{data_folder}/timing_metrics_df.csv")
+    similarity_metrics_df = pd.read_csv(f"{data_folder}/distance_metrics_df.csv")
+DATA_VERSION = data_version(
+    swing_map_df, tracking_metrics_df, timing_metrics_df, similarity_metrics_df
+)
+# per-batter slices, built once per data version and shared by every session
+swing_map_index = get_batter_index("swing_map", DATA_VERSION, lambda: swing_map_df)
+timing_index = get_batter_index("timing", DATA_VERSION, lambda: timing_metrics_df)
+
+# Optional headless scoring service shared by every dashboard user
+scoring_service_url = os.environ.get("SCORING_SERVICE_URL")
+scoring_client = ScoringClient(scoring_service_url) if scoring_service_url else None
+
+# Optional grades published by live_game.py during a game
+live_grades_path = os.environ.get("LIVE_GRADES_PATH")
+
+# Optional scorecard materialized by summary_store.py
+summary_store_path = os.environ.get("SUMMARY_STORE_PATH")
 
 # Define metric options
 metric_options = [
@@ -71,6 +102,56 @@ def get_slider_values():
         ],
     }
 
+def figure_slots():
+    """
+    Gets the persistent matplotlib figures of the current session, so reruns redraw
+    the same figures instead of adding new ones to the pyplot registry.
+
+    Returns:
+        FigureSlots: The session's figure slots.
+    """
+    if "figure_slots" not in st.session_state:
+        st.session_state["figure_slots"] = FigureSlots()
+    return st.session_state["figure_slots"]
+
+
+def preview_figure(name, draw_background):
+    """
+    Gets a customization plot of the current session whose static background is
+    rendered once, so slider moves only redraw the grading overlay.
+
+    Args:
+        name (str): The preview name.
+        draw_background (callable): Function that draws the static background.
+
+    Returns:
+        LayeredFigure: The session's preview figure.
+    """
+    key = f"{name}_preview"
+    if key not in st.session_state:
+        st.session_state[key] = LayeredFigure(draw_background, dpi=150)
+    return st.session_state[key]
+
+
+def get_thresholds():
+    """
+    Converts the current slider values into the grading thresholds used for scoring.
+
+    Returns:
+        dict: Grading thresholds keyed like scorecard.DEFAULT_THRESHOLDS.
+    """
+    values = get_slider_values()
+    contact_locs = [locs[1] for locs in values["contact_locations"]]
+    top = [values["contact_locations"][-1][0]]
+    contact_locs.extend(top)
+    return {
+        "contact_location": contact_locs,
+        "track_angle": values["track_angles"],
+        "hunting": [loc[1] for loc in values["hunting_dists"]],
+        "similarity": [loc[1] for loc in values["swing_similarities"]],
+    }
+
+
 def update_sliders(slider_idx, metric, direction="increasing"):
     """
     Update the values of sliders above and below the currently adjusted slider to maintain linked ranges.
@@ -123,23 +204,33 @@ def display_scorecard():
     # collect widget values
     values = get_slider_values()
     min_swing_count = st.session_state["swing_count_default"]
-    
-    contact_locs = [locs[1] for locs in values["contact_locations"]]
-    top = [values["contact_locations"][-1][0]]
-    contact_locs.extend(top)
-    # build scorecard with custom criteria
-    df = generate_scorecard(
-        data_folder,
-        contact_locs,
-        values["track_angles"],
-        [loc[1] for loc in values["hunting_dists"]],
-        [loc[1] for loc in values['swing_similarities']],
-    )
-    # prep dataframe to show custom sort order and readable columns
-    df_min_swings = df[df["swing_count"] >= min_swing_count]
-    scorecard = df_min_swings[
-        ["batter", "swing_count", "timing_grade", "track_angle_grade", "hunting_grade", "dist_grade"]
-    ]
+    thresholds = get_thresholds()
+
+    def build_scorecard():
+        # build scorecard with custom criteria
+        df = None
+        if scoring_client is not None:
+            df = scoring_client.scorecard(thresholds)
+        elif summary_store_path:
+            # the stored scorecard is only used while it matches the data and grading
+            df = load_summary_store(summary_store_path, DATA_VERSION, thresholds)
+        if df is None:
+            df = generate_scorecard(
+                data_folder,
+                thresholds["contact_location"],
+                thresholds["track_angle"],
+                thresholds["hunting"],
+                thresholds["similarity"],
+            )
+        # prep dataframe to show custom sort order and readable columns
+        df_min_swings = df[df["swing_count"] >= min_swing_count]
+        return df_min_swings[
+            ["batter", "swing_count", "timing_grade", "track_angle_grade", "hunting_grade", "dist_grade"]
+        ]
+
+    # sessions with the same configuration share one scorecard
+    key = threshold_key(DATA_VERSION, thresholds, min_swing_count)
+    scorecard = shared_scorecard_cache.get_or_compute(key, build_scorecard)
     column_name_map = {
         "batter": "Batter ID",
         "swing_count": "Swing Count",
@@ -171,19 +262,29 @@ def display_scorecard():
     return scorecard
 
 
-def extract_image(fig):
+def cached_image(kind, batter_id, thresholds, build_fig):
     """
-    Converts a Plotly figure to a PIL Image.
+    Gets a Plotly figure as a PIL Image, only building and exporting the figure when
+    the plot is not already in the render cache.
 
     Args:
-        fig (plotly.graph_objs._figure.Figure): The Plotly figure to convert.
+        kind (str): The plot kind used in the cache key.
+        batter_id (int): The ID of the batter, None for customization plots.
+        thresholds (list): The grading thresholds used to build the plot.
+        build_fig (callable): Function with no arguments that builds the figure.
 
     Returns:
-        PIL.Image.Image: The converted image.
+        PIL.Image.Image: The rendered image.
     """
-    img_bytes = pio.to_image(fig, format="png", scale=2)
-    img = Image.open(BytesIO(img_bytes))
-    return img
+    key = render_cache.make_key(kind, batter_id, thresholds, DATA_VERSION)
+
+    def render():
+        fig = build_fig()
+        with stage_timer.stage("extract_image"):
+            return pio.to_image(fig, format="png", scale=2)
+
+    img_bytes = render_cache.get_or_render(key, render)
+    return Image.open(BytesIO(img_bytes))
 
 
 def filter_middle_percent(image, percentage=50):
@@ -216,15 +317,23 @@ def tracking_plot(batter_id):
     """
     st.subheader("Tracking Angle Plot")
     try:
-        tracking_df = create_tracking_score_df(
-            get_slider_values()["track_angles"], tracking_metrics_df
-        )
-        track_fig = generate_track_angle_plot(
-            batter_id, tracking_df, get_slider_values()["track_angles"]
-        )
+        track_angles = get_slider_values()["track_angles"]
+
+        def build_fig():
+            tracking_index = get_batter_index(
+                "tracking_score",
+                f"{DATA_VERSION}-{track_angles}",
+                lambda: create_tracking_score_df(track_angles, tracking_metrics_df),
+            )
+            return generate_track_angle_plot(
+                batter_id, tracking_index.df, track_angles, batter_index=tracking_index
+            )
 
         # Extract and display image
-        image = extract_image(track_fig)
+        if scoring_client is not None:
+            image = scoring_client.plot("tracking", batter_id, get_thresholds())
+        else:
+            image = cached_image("tracking", batter_id, track_angles, build_fig)
         st.image(image, use_column_width=True)
 
     except Exception as e:
@@ -239,12 +348,19 @@ def hunting_plot(batter_id):
     """
     st.subheader("Hunting Pitches Plot")
     try:
-        hunt_grade = scorecard.query(f"batter == {batter_id}")[
+        if scoring_client is not None:
+            image = scoring_client.plot("hunting", batter_id, get_thresholds())
+            st.image(image, use_column_width=True)
+            return
+        hunt_grade = st.session_state["scorecard_index"].get(batter_id)[
             "hunting_grade"
         ].item()
-        batter_map = swing_map_df.query(f"batter == {batter_id}")
-        hunt_fig = plot_hunting(batter_map, hunt_grade)
-        st.pyplot(hunt_fig)
+        batter_map = swing_map_index.get(batter_id)
+        hunt_fig = plot_hunting(
+            batter_map, hunt_grade, fig=figure_slots().get("hunting")
+        )
+        with stage_timer.stage("pyplot_render"):
+            st.pyplot(hunt_fig)
     except Exception as e:
         st.error(f"Error in plot_hunting: {e}")
 
@@ -258,10 +374,14 @@ def contact_loc_plot(batter_id):
     """
     st.subheader("Contact Location Plot")
     try:
-        loc_grade = scorecard.query(f"batter == {batter_id}")[
+        if scoring_client is not None:
+            image = scoring_client.plot("contact_location", batter_id, get_thresholds())
+            st.image(image, use_column_width=True)
+            return
+        loc_grade = st.session_state["scorecard_index"].get(batter_id)[
             "timing_grade"
         ].item()
-        batter_timing = timing_metrics_df.query(f"batter == {batter_id}")
+        batter_timing = timing_index.get(batter_id)
 
         plot_locs = [locs[1] for locs in get_slider_values()["contact_locations"]]
         top = [get_slider_values()["contact_locations"][-1][0]]
@@ -271,8 +391,11 @@ def contact_loc_plot(batter_id):
             batter_timing,
             loc_grade,
             plot_locs,
+            fig=figure_slots().get("contact_location"),
+            kde_curve=get_contact_kde(timing_metrics_df, DATA_VERSION).curve(batter_id),
         )
-        st.pyplot(loc_fig)
+        with stage_timer.stage("pyplot_render"):
+            st.pyplot(loc_fig)
     except Exception as e:
         st.error(f"Error in viz_contact_loc: {e}")
 
@@ -290,20 +413,28 @@ def swing_sim_plot(batter_id):
     except Exception as e:
         st.error(f"Error in similarity plot: {e}")
 
-def update_plots(batter_id):
+def metric_priorities():
     """
-    Displays the plots based on the selected batter ID and metric priority order.
+    Gets the metrics in the selected priority order, with unselected metrics at the end.
 
-    Args:
-        batter_id (int): The ID of the selected batter.
+    Returns:
+        list: The metric names.
     """
-    # Get priority order and add any unselected metrics to end
     values = get_slider_values()
     priorities = pd.Series(values["metric_order"]).drop_duplicates().tolist()
     unset_priorities = [order for order in metric_options if order not in priorities]
     priorities.extend(unset_priorities)
+    return priorities
+
 
-    for metric in priorities: 
+def update_plots(batter_id):
+    """
+    Displays the plots based on the selected batter ID and metric priority order.
+
+    Args:
+        batter_id (int): The ID of the selected batter.
+    """
+    for metric in metric_priorities(): 
         st.markdown("<br>", unsafe_allow_html=True)
         if metric == "Contact Location":
             contact_loc_plot(batter_id)
@@ -315,7 +446,158 @@ def update_plots(batter_id):
             swing_sim_plot(batter_id)
         else:
             st.write("An unexpected plotting option was provided")
-            
+
+
+# plot kind drawn for each metric in the comparison view
+comparison_kinds = {
+    "Contact Location": "contact_location",
+    "Tracking Angle": "tracking",
+    "Hunting Pitches": "hunting",
+}
+# comparison plots share the page width, so they are rendered at a lower resolution
+comparison_dpi = 100
+
+
+def comparison_tables():
+    """
+    Gets the per-batter slices the comparison plots are drawn from, built once per
+    data version and shared by every session, and the grades of the session's
+    scorecard.
+
+    Returns:
+        dict: The plot tables, see batter_plots.render_plot_png.
+    """
+    return {
+        "data_version": DATA_VERSION,
+        "swing_metrics_index": get_batter_index(
+            "swing_metrics", DATA_VERSION, lambda: load_compact_metrics(data_folder)
+        ),
+        "swing_map_index": swing_map_index,
+        "timing_index": timing_index,
+        "tracking_df": tracking_metrics_df,
+        "contact_kde": get_contact_kde(timing_metrics_df, DATA_VERSION),
+        "scorecard_index": st.session_state["scorecard_index"],
+    }
+
+
+def compare_plots(batter_ids):
+    """
+    Displays the plots of several batters side by side in metric priority order. All
+    the plots are rendered in one concurrent batch before any are shown.
+
+    Args:
+        batter_ids (list): The IDs of the selected batters.
+    """
+    thresholds = get_thresholds()
+    priorities = metric_priorities()
+    kinds = [comparison_kinds[m] for m in priorities if m in comparison_kinds]
+
+    if scoring_client is not None:
+
+        def render(kind, batter_id):
+            return scoring_client.plot(kind, batter_id, thresholds)
+
+    else:
+        tables = comparison_tables()
+
+        def render(kind, batter_id):
+            key = render_cache.make_key(
+                f"{kind}_compare",
+                batter_id,
+                thresholds[PLOT_THRESHOLDS[kind]],
+                DATA_VERSION,
+            )
+            return render_cache.get_or_render(
+                key,
+                lambda: render_plot_png(
+                    kind, batter_id, thresholds, tables, dpi=comparison_dpi
+                ),
+            )
+
+    images = render_batch(batter_ids, kinds, render)
+    for metric in priorities:
+        st.markdown("<br>", unsafe_allow_html=True)
+        st.subheader(f"{metric} Comparison")
+        columns = st.columns(len(batter_ids))
+        for i, (column, batter_id) in enumerate(zip(columns, batter_ids)):
+            if metric == "Swing Similarity":
+                image = f"{image_folder}/{batter_id}_similarity.png"
+            else:
+                image = images[comparison_kinds[metric]][i]
+            if isinstance(image, Exception):
+                column.error(f"Error in {metric} plot: {image}")
+            else:
+                column.image(image, caption=f"Batter {batter_id}")
+
+
+@st.fragment(run_every=2)
+def live_grades():
+    """
+    Displays the grades published by the live game mode, rereading them every two
+    seconds without rerunning the rest of the page.
+    """
+    snapshot = read_snapshot(live_grades_path)
+    if snapshot is None:
+        st.write("No live grades yet. Start live_game.py to score pitches as they land.")
+        return
+    latency = snapshot["latency"]
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Swings Scored", latency["swings"])
+    col2.metric("Latency p50", f"{latency.get('p50', 0):.2f} s")
+    col3.metric("Latency p95", f"{latency.get('p95', 0):.2f} s")
+    grades = pd.DataFrame(snapshot["grades"]).rename(
+        columns={
+            "batter": "Batter ID",
+            "timing_grade": "Contact Location",
+            "track_angle_grade": "Tracking Angle",
+            "hunting_grade": "Hunting Pitches",
+            "dist_grade": "Swing Similarity",
+        }
+    )
+    if not grades.empty:
+        grades["Batter ID"] = grades["Batter ID"].astype(str)
+    st.write(grades)
+
+
+def stage_timings():
+    """
+    Displays the wall time and call count of each pipeline stage since the server
+    started, with downloads of the timings as JSON or a Chrome trace. Hidden unless
+    the page is opened with '?timings' in its URL.
+    """
+    with st.sidebar.expander("Stage Timings", expanded=True):
+        summary = pd.DataFrame(stage_timer.summary())
+        if summary.empty:
+            st.write("No stages timed yet.")
+        else:
+            st.dataframe(
+                summary.rename(
+                    columns={
+                        "stage": "Stage",
+                        "calls": "Calls",
+                        "total": "Total (s)",
+                        "mean": "Mean (s)",
+                        "max": "Max (s)",
+                    }
+                ),
+                hide_index=True,
+            )
+        st.download_button(
+            "Download JSON",
+            stage_timer.to_json(),
+            file_name="stage_timings.json",
+            mime="application/json",
+        )
+        st.download_button(
+            "Download Chrome Trace",
+            stage_timer.to_chrome_trace(),
+            file_name="stage_trace.json",
+            mime="application/json",
+        )
+        if st.button("Reset Timings"):
+            stage_timer.reset()
+
+
 # -------------------------------------------------------
 # Initialize session state for sliders and dropdowns if not already set
 contact_locs_defaults = [(0.75, 1.5), (0.25, 0.75), (-0.5, 0.25), (-1.5, -0.5)]
@@ -333,9 +615,12 @@ if "initialized" not in st.session_state:
 st.title("Baseball Swing Scouting Dashboard")
 
 # Tabs for UI
+tab_options = ["Customize Grading", "Scorecard", "Batter Plots", "Compare Batters"]
+if live_grades_path:
+    tab_options.append("Live Game")
 tab_selection = st.sidebar.radio(
     "Select Tab",
-    ["Customize Grading", "Scorecard", "Batter Plots"],
+    tab_options,
     on_change=save_widget_states,
 )
 
@@ -365,8 +650,9 @@ if tab_selection == "Customize Grading":
         top = [contact_location[-1][0]]
         plot_locs.extend(top)
         try:
-            fig_location = viz_contact_loc(None, None, plot_locs)
-            st.pyplot(fig_location)
+            preview = preview_figure("contact_location", contact_preview_background)
+            image = preview.render(draw_quality_locations, plot_locs)
+            st.image(image, use_column_width=True)
         except Exception as e:
             st.write(plot_locs)
             st.error(f"Error in viz_contact_loc: {e}")
@@ -395,8 +681,9 @@ if tab_selection == "Customize Grading":
     with col2:
         try:
             tops = [locs[1] for locs in hunting]
-            fig_swing = plot_hunting(None, None, tops)
-            st.pyplot(fig_swing)
+            preview = preview_figure("hunting", hunting_preview_background)
+            image = preview.render(draw_hunting_radii, tops)
+            st.image(image, use_column_width=True)
         except Exception as e:
             st.error(f"Error in plot_hunting: {e}")
 
@@ -419,10 +706,11 @@ if tab_selection == "Customize Grading":
 
     with col2:
         try:
-            fig_tracking = plot_tracking_angles(track_angle)
-
             # Extract, filter and display image
-            image = extract_image(fig_tracking)
+            image = cached_image(
+                "tracking_widget", None, track_angle,
+                lambda: plot_tracking_angles(track_angle),
+            )
             filtered_image = filter_middle_percent(image, percentage=50)
             st.image(filtered_image, use_column_width=True)
 
@@ -472,6 +760,7 @@ elif tab_selection == "Scorecard":
     st.header("Scorecard")
     scorecard = display_scorecard()
     st.session_state["scorecard"] = scorecard
+    st.session_state["scorecard_index"] = BatterIndex(scorecard)
 
 # ------------------------------------------------
 elif tab_selection == "Batter Plots":
@@ -494,3 +783,35 @@ elif tab_selection == "Batter Plots":
     else:
         st.write("Scorecard has not been created.")
         st.write("Please go to the Scorecard tab first to create the scorecard")
+
+# ------------------------------------------------
+elif tab_selection == "Compare Batters":
+    st.header("Compare Batters")
+
+    scorecard = st.session_state.get("scorecard", pd.DataFrame())
+
+    if not scorecard.empty:
+        st.sidebar.header("Select Batters")
+
+        batter_list = st.session_state.get("batter_list", scorecard["batter"].tolist())
+        batter_ids = st.sidebar.multiselect(
+            "Select Batters", batter_list, max_selections=4, key="compare_selector"
+        )
+
+        if batter_ids:
+            compare_plots(batter_ids)
+        else:
+            st.write("Please select two or more batters to compare.")
+    else:
+        st.write("Scorecard has not been created.")
+        st.write("Please go to the Scorecard tab first to create the scorecard")
+
+# ------------------------------------------------
+elif tab_selection == "Live Game":
+    st.header("Live Game")
+    live_grades()
+
+# ------------------------------------------------
+# shown last so the timings include this rerun's stages
+if "timings" in st.query_params:
+    stage_timings()
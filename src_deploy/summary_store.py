@@ -0,0 +1,291 @@
+import argparse
+import json
+import os
+import time
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from scorecard import merge_metrics, score_metrics, DEFAULT_THRESHOLDS
+from scorecard_cache import threshold_key
+from utils import data_version
+
+# metric tables in the order the dashboard hashes them into its data version
+SOURCE_FILES = [
+    "swing_map_metrics_df.csv",
+    "tracking_metrics_df.csv",
+    "timing_metrics_df.csv",
+    "distance_metrics_df.csv",
+]
+# scorecard columns in the order generate_scorecard returns them
+SCORECARD_COLUMNS = [
+    "batter",
+    "swing_count",
+    "timing_avg",
+    "timing_grade",
+    "angle_freqs",
+    "angle_scores",
+    "track_angle_grade",
+    "max_swing_dist",
+    "max_swing_pair",
+    "geometric_median",
+    "point_distances",
+    "distance_scores",
+    "avg_score",
+    "hunting_grade",
+    "dist_score",
+    "dist_grade",
+]
+# Parquet type of each list column. The angle group frequencies are stored without
+# their group numbers, which are their positions, and the farthest swing pair as
+# its two [pitch_x, pitch_z] points.
+LIST_TYPES = {
+    "angle_freqs": pa.list_(pa.float64()),
+    "angle_scores": pa.list_(pa.int64()),
+    "max_swing_pair": pa.list_(pa.list_(pa.float64())),
+    "geometric_median": pa.list_(pa.float64()),
+    "point_distances": pa.list_(pa.float64()),
+    "distance_scores": pa.list_(pa.int64()),
+}
+# hash of each batter's merged swings, compared on refresh to find changed batters
+VERSION_COLUMN = "swings_version"
+# key of the store's stamp in the Parquet file metadata
+METADATA_KEY = b"summary_store"
+FORMAT_VERSION = 1
+
+
+def source_version(data_folder):
+    """
+    Get the data version of a folder's metric tables, the same version the
+    dashboard computes from them.
+
+    Args:
+        data_folder (str): Path to the folder containing metric data files.
+
+    Returns:
+        str: The data version, see utils.data_version.
+    """
+    return data_version(
+        *[pd.read_csv(f"{data_folder}/{file_name}") for file_name in SOURCE_FILES]
+    )
+
+
+def batter_versions(merged_df):
+    """
+    Hash each batter's merged swings. A batter's hash changes when any of their
+    swings is added, removed, edited or reordered.
+
+    Args:
+        merged_df (pd.DataFrame): Merged swing metrics, see merge_metrics.
+
+    Returns:
+        pd.Series: The uint64 hash of each batter's swings, indexed by batter.
+    """
+    row_hashes = pd.util.hash_pandas_object(merged_df, index=False).to_numpy()
+    positions = merged_df.groupby("batter").cumcount().to_numpy(np.uint64)
+    # the sum ignores order, so each row's position in its batter's swings is
+    # hashed in with it
+    row_hashes = pd.util.hash_array(row_hashes ^ positions)
+    return pd.Series(row_hashes, index=merged_df["batter"].to_numpy()).groupby(level=0).sum()
+
+
+def _to_list(column, value):
+    if not isinstance(value, (list, tuple, np.ndarray)):
+        return None
+    if column == "angle_freqs":
+        return [float(freq) for _, freq in value]
+    if column == "max_swing_pair":
+        return [np.asarray(point, dtype=float).tolist() for point in value]
+    return np.asarray(value).tolist()
+
+
+def _from_list(column, value):
+    if value is None:
+        return np.nan
+    if column == "angle_freqs":
+        return [(group, float(freq)) for group, freq in enumerate(value)]
+    if column == "max_swing_pair":
+        return tuple(np.asarray(point, dtype=float) for point in value)
+    if column in ("angle_scores", "distance_scores"):
+        return value.tolist()
+    return np.asarray(value, dtype=float)
+
+
+def write_summary_store(path, summary_df, stamp):
+    """
+    Write per-batter summaries to a Parquet file with list columns. The file is
+    replaced in one step, so readers never see a partly written store.
+
+    Args:
+        path (str): Path of the Parquet file.
+        summary_df (pd.DataFrame): Scorecard rows with a VERSION_COLUMN.
+        stamp (dict): The store's data version and thresholds, kept in the file
+            metadata, see refresh_summary_store.
+    """
+    summary_df = summary_df.copy()
+    for column in LIST_TYPES:
+        summary_df[column] = [_to_list(column, value) for value in summary_df[column]]
+    schema = pa.Schema.from_pandas(summary_df, preserve_index=False)
+    for column, list_type in LIST_TYPES.items():
+        schema = schema.set(schema.get_field_index(column), pa.field(column, list_type))
+    schema = schema.with_metadata(
+        {**schema.metadata, METADATA_KEY: json.dumps(stamp).encode()}
+    )
+    table = pa.Table.from_pandas(summary_df, schema=schema, preserve_index=False)
+    tmp_path = f"{path}.tmp"
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def read_stamp(path):
+    """
+    Read a store's stamp from its file metadata, without reading the scorecard.
+
+    Args:
+        path (str): Path of the Parquet file.
+
+    Returns:
+        dict: The stamp, see refresh_summary_store. None when there is no store of
+        this format.
+    """
+    if not os.path.exists(path):
+        return None
+    metadata = pq.read_schema(path).metadata or dict()
+    stamp = json.loads(metadata.get(METADATA_KEY, b"{}"))
+    return stamp if stamp.get("format") == FORMAT_VERSION else None
+
+
+def read_summary_store(path):
+    """
+    Read the store written by write_summary_store.
+
+    Args:
+        path (str): Path of the Parquet file.
+
+    Returns:
+        tuple: The scorecard rows with their VERSION_COLUMN, the list columns
+        converted back to the values generate_scorecard returns, and the store's
+        stamp. None and None when there is no store of this format.
+    """
+    stamp = read_stamp(path)
+    if stamp is None:
+        return None, None
+    summary_df = pd.read_parquet(path)
+    for column in LIST_TYPES:
+        summary_df[column] = [_from_list(column, value) for value in summary_df[column]]
+    return summary_df, stamp
+
+
+def load_summary_store(path, version, thresholds):
+    """
+    Load the stored scorecard if it is current, e.g. for the dashboard to skip
+    scoring.
+
+    Args:
+        path (str): Path of the Parquet file.
+        version (str): The data version the scorecard should be built from, see
+            source_version.
+        thresholds (dict): Grading thresholds keyed like DEFAULT_THRESHOLDS.
+
+    Returns:
+        pd.DataFrame: The scorecard, like generate_scorecard's. None when there is no
+        store or it was built from other data or thresholds.
+    """
+    stamp = read_stamp(path)
+    if stamp is None or stamp["key"] != threshold_key(version, thresholds):
+        return None
+    summary_df, _ = read_summary_store(path)
+    return summary_df.drop(columns=VERSION_COLUMN)
+
+
+def refresh_summary_store(data_folder, path, thresholds=None):
+    """
+    Bring the store up to date with a folder's metric tables. The file metadata
+    stamps the store with the data version and thresholds it was built from, so
+    nothing is read or scored while the tables are unchanged. Otherwise only
+    batters whose swings changed since the last refresh are scored again, and
+    batters without swings are dropped. The whole store is rebuilt when it is
+    missing or was graded with other thresholds. Batters with swings but no
+    scorecard row are scored on every refresh, since the store has no row to keep
+    their hash in.
+
+    Args:
+        data_folder (str): Path to the folder containing metric data files.
+        path (str): Path of the Parquet file.
+        thresholds (dict, optional): Grading thresholds keyed like
+            DEFAULT_THRESHOLDS. Defaults to DEFAULT_THRESHOLDS.
+
+    Returns:
+        dict: The store's 'data_version', and the 'scored', 'kept' and 'dropped'
+        batter counts.
+    """
+    thresholds = thresholds or DEFAULT_THRESHOLDS
+    version = source_version(data_folder)
+    stamp = read_stamp(path)
+    if stamp is None or stamp["thresholds"] != threshold_key(None, thresholds):
+        stored_df = pd.DataFrame(columns=SCORECARD_COLUMNS + [VERSION_COLUMN])
+    elif stamp["data_version"] == version:
+        return {"data_version": version, "scored": 0, "kept": stamp["batters"], "dropped": 0}
+    else:
+        stored_df, _ = read_summary_store(path)
+
+    merged_df = merge_metrics(data_folder)
+    versions = batter_versions(merged_df)
+    current = stored_df[VERSION_COLUMN].to_numpy(np.uint64) == versions.reindex(
+        stored_df["batter"], fill_value=0
+    ).to_numpy()
+    kept_df = stored_df[current]
+    changed = versions.index.difference(kept_df["batter"])
+    summary_df = kept_df
+    if len(changed):
+        scored_df = score_metrics(
+            merged_df[merged_df["batter"].isin(changed)],
+            *[thresholds[key] for key in DEFAULT_THRESHOLDS],
+        )
+        scored_df[VERSION_COLUMN] = versions.reindex(scored_df["batter"]).to_numpy()
+        if len(kept_df):
+            scored_df = pd.concat([kept_df, scored_df])
+        summary_df = (
+            scored_df.reindex(columns=SCORECARD_COLUMNS + [VERSION_COLUMN])
+            .sort_values("batter")
+            .reset_index(drop=True)
+        )
+    write_summary_store(
+        path,
+        summary_df,
+        {
+            "format": FORMAT_VERSION,
+            "data_version": version,
+            "thresholds": threshold_key(None, thresholds),
+            "key": threshold_key(version, thresholds),
+            "batters": len(summary_df),
+            "updated": time.time(),
+        },
+    )
+    return {
+        "data_version": version,
+        "scored": len(changed),
+        "kept": len(kept_df),
+        "dropped": int((~stored_df["batter"].isin(versions.index)).sum()),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Materialize the per-batter scorecard to a Parquet store"
+    )
+    parser.add_argument("--data-folder", default="../data/dataframes")
+    parser.add_argument("--path", default="../data/dataframes/scorecard.parquet")
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=None,
+        help="keep refreshing the store every this many seconds",
+    )
+    args = parser.parse_args()
+
+    while True:
+        print(json.dumps(refresh_summary_store(args.data_folder, args.path)))
+        if args.interval is None:
+            break
+        time.sleep(args.interval)
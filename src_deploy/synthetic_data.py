@@ -0,0 +1,216 @@
+import argparse
+import glob
+import json
+import os
+import numpy as np
+import pandas as pd
+from chunked_scorecard import KEY_COLUMNS, METRIC_TABLES
+from ingest import swing_metrics
+
+# noise added to the copied swings, in the units of each column
+JITTER = {
+    "pitch_x": 0.1,
+    "pitch_z": 0.1,
+    "attack_angle": 1.0,
+    "track_angle": 1.0,
+    "contact_y_loc": 0.1,
+    "contact_x_loc": 0.1,
+}
+# relative noise of the swing similarity distances
+DISTANCE_JITTER = 0.05
+
+
+def read_reference_tables(reference_folder):
+    """
+    Read the metric tables the synthetic swings are copied from.
+
+    Args:
+        reference_folder (str): Path to the folder containing metric data files.
+
+    Returns:
+        dict: The tables keyed like METRIC_TABLES, without their index column.
+    """
+    return {
+        table: pd.read_csv(f"{reference_folder}/{file_name}", index_col=0)
+        for table, (file_name, _) in METRIC_TABLES.items()
+    }
+
+
+def synthetic_swings(reference_tables, batters, swings_per_batter, rng):
+    """
+    Draw the swings of synthetic batters. Each synthetic batter copies the swings
+    of one real batter, drawn with replacement, so its metrics vary the way a real
+    batter's do.
+
+    Args:
+        reference_tables (dict): The reference metric tables.
+        batters (int): Number of batters.
+        swings_per_batter (float): Mean number of swings per batter.
+        rng (np.random.Generator): Random number generator.
+
+    Returns:
+        pd.DataFrame: One row per synthetic swing with its batter and batter_count
+        and the 'source_batter' and 'source_count' of the copied swing.
+    """
+    source_keys = (
+        pd.concat([df[KEY_COLUMNS] for df in reference_tables.values()])
+        .drop_duplicates()
+        .dropna()
+    )
+    source_swings = {
+        batter: df["batter_count"].to_numpy()
+        for batter, df in source_keys.groupby("batter")
+    }
+    source_batters = list(source_swings)
+    batter_ids = rng.choice(900_000_000, size=batters, replace=False) + 100_000_000
+    swing_counts = np.maximum(rng.poisson(swings_per_batter, size=batters), 1)
+    swings = []
+    for batter_id, swing_count in zip(batter_ids, swing_counts):
+        source_batter = source_batters[rng.integers(len(source_batters))]
+        swings.append(
+            pd.DataFrame(
+                {
+                    "batter": batter_id,
+                    "batter_count": np.arange(swing_count),
+                    "source_batter": source_batter,
+                    "source_count": rng.choice(source_swings[source_batter], swing_count),
+                }
+            )
+        )
+    return pd.concat(swings, ignore_index=True)
+
+
+def copy_table(reference_df, swings_df, rng):
+    """
+    Copy the rows of a reference table for the synthetic swings, with noise. Swings
+    missing from the table or repeated in it stay missing or repeated, zero contact
+    locations and distances (no measurement) stay zero and missing angles stay missing.
+
+    Args:
+        reference_df (pd.DataFrame): The reference metric table.
+        swings_df (pd.DataFrame): The synthetic swings, see synthetic_swings.
+        rng (np.random.Generator): Random number generator.
+
+    Returns:
+        pd.DataFrame: The synthetic table.
+    """
+    df = swings_df.merge(
+        reference_df.rename(
+            columns={"batter": "source_batter", "batter_count": "source_count"}
+        ),
+        on=["source_batter", "source_count"],
+        how="inner",
+    ).drop(columns=["source_batter", "source_count"])
+    for column, scale in JITTER.items():
+        if column in df:
+            noise = rng.normal(0, scale, len(df))
+            df[column] = df[column].where(df[column] == 0.0, df[column] + noise)
+    if "distance" in df:
+        df["distance"] = df["distance"] * rng.lognormal(0, DISTANCE_JITTER, len(df))
+    return df[reference_df.columns]
+
+
+def generate_metric_tables(
+    output_folder,
+    batters,
+    swings_per_batter=None,
+    reference_folder="../data/dataframes",
+    seed=0,
+):
+    """
+    Write synthetic metric tables in the format of the reference tables.
+
+    Args:
+        output_folder (str): Folder the tables are written to.
+        batters (int): Number of batters.
+        swings_per_batter (float, optional): Mean number of swings per batter.
+            Defaults to the reference tables' mean.
+        reference_folder (str, optional): Path to the folder containing the metric
+            data files the swings are copied from. Defaults to '../data/dataframes'.
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+        pd.DataFrame: The synthetic swings, see synthetic_swings.
+    """
+    rng = np.random.default_rng(seed)
+    reference_tables = read_reference_tables(reference_folder)
+    if swings_per_batter is None:
+        swing_map_df = reference_tables["swing_map"]
+        swings_per_batter = len(swing_map_df) / swing_map_df["batter"].nunique()
+    swings_df = synthetic_swings(reference_tables, batters, swings_per_batter, rng)
+    os.makedirs(output_folder, exist_ok=True)
+    for table, (file_name, _) in METRIC_TABLES.items():
+        df = copy_table(reference_tables[table], swings_df, rng)
+        df.to_csv(f"{output_folder}/{file_name}")
+    return swings_df
+
+
+def generate_tracking_files(
+    output_folder, swings_df, tracking_folder="../data/tracking_files", seed=0
+):
+    """
+    Write a synthetic tracking file for each swing, named
+    '<batter>_<batter_count>.jsonl' like the files read in live_game. Each one copies
+    a real swing's tracking file with its ball and bat positions shifted together,
+    so the contact frame still lines up, and a random strike count.
+
+    Args:
+        output_folder (str): Folder the files are written to.
+        swings_df (pd.DataFrame): The swings to write files for, with 'batter' and
+            'batter_count' columns.
+        tracking_folder (str, optional): Folder containing the real tracking files.
+            Defaults to '../data/tracking_files'.
+        seed (int, optional): Random seed. Defaults to 0.
+    """
+    rng = np.random.default_rng(seed)
+    pitches = []
+    for path in sorted(glob.glob(f"{tracking_folder}/*.jsonl")):
+        with open(path) as f:
+            line = f.readline()
+        if swing_metrics(json.loads(line)) is not None:
+            pitches.append(line)
+    os.makedirs(output_folder, exist_ok=True)
+    for batter, batter_count in swings_df[KEY_COLUMNS].itertuples(index=False):
+        pitch = json.loads(pitches[rng.integers(len(pitches))])
+        shift = [rng.normal(0, 0.3), 0.0, rng.normal(0, 0.3)]
+        for sample in pitch["samples_ball"]:
+            if sample.get("pos"):
+                sample["pos"] = [p + s for p, s in zip(sample["pos"], shift)]
+        for sample in pitch["samples_bat"]:
+            for part in ["head", "handle"]:
+                if part in sample:
+                    sample[part]["pos"] = [
+                        p + s for p, s in zip(sample[part]["pos"], shift)
+                    ]
+        pitch["summary_score"]["count"]["strikes"]["plateAppearance"] = int(
+            rng.integers(3)
+        )
+        with open(f"{output_folder}/{batter}_{batter_count}.jsonl", "w") as f:
+            f.write(json.dumps(pitch) + "\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic swing data")
+    parser.add_argument("--output-folder", required=True)
+    parser.add_argument("--batters", type=int, default=31)
+    parser.add_argument("--swings-per-batter", type=float, default=None)
+    parser.add_argument("--reference-folder", default="../data/dataframes")
+    parser.add_argument(
+        "--tracking-files", type=int, default=0, help="tracking files to write"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    swings_df = generate_metric_tables(
+        args.output_folder,
+        args.batters,
+        args.swings_per_batter,
+        args.reference_folder,
+        args.seed,
+    )
+    if args.tracking_files:
+        generate_tracking_files(
+            f"{args.output_folder}/tracking_files",
+            swings_df.head(args.tracking_files),
+            seed=args.seed,
+        )
+    print(f"wrote {len(swings_df)} swings of {args.batters} batters")
@@ -1,11 +1,9 @@
 import math
 import pandas as pd
-from utils import get_grade, color_letter
-
-import plotly.graph_objects as go
-from PIL import Image
-import requests
-from io import BytesIO
+from utils import get_grade, lazy_reexport
+from ball_trajectory import BallTrajectory
+from batter_index import BatterIndex
+from stage_timer import stage_timer
 
 
 def find_sweet_spot(head_pos, handle_pos):
@@ -59,40 +57,39 @@ def get_ball_contact_idx(ball_df, contact_time):
     Returns:
         int: The index of the contact point.
     """
-    ball_df["contact_time_diff"] = abs(ball_df["time"] - contact_time)
-    return ball_df["contact_time_diff"].idxmin()
+    trajectory = BallTrajectory.from_ball_df(ball_df, deduplicate=False)
+    return trajectory.index[trajectory.nearest_index(contact_time)]
 
 
-def calc_pitch_angle(ball_df, contact_time):
+def calc_pitch_angle(ball_df, contact_time, interpolate=False):
     """
     Calculate the pitch angle. Using the frame closest to contact and the frame immediately before.
 
     Args:
-        ball_df (pd.DataFrame): DataFrame containing the ball's trajectory data.
+        ball_df (pd.DataFrame): DataFrame containing the ball's trajectory data, without
+            repeated frames (see ingest.compact_ball_samples).
         contact_time (float): The time of contact.
+        interpolate (bool, optional): Use the ball velocity interpolated to the exact
+            contact time instead of the two closest frames. Defaults to False.
 
     Returns:
         float: The pitch angle in degrees.
     """
-    ball_df_dedup = ball_df.drop_duplicates().reset_index()
-    cols = ["time", "pos_0", "pos_1", "pos_2"]
-    contact_idx = get_ball_contact_idx(ball_df_dedup, contact_time)
-    contact_row = ball_df_dedup.loc[contact_idx, :]
-    pre_contact_row = ball_df_dedup.loc[contact_idx - 1, cols]
-    ball_angle_df = contact_row - pre_contact_row
-    y = ball_angle_df["pos_1"]
-    z = ball_angle_df["pos_2"]
-    return math.degrees(math.atan(z / y))
+    trajectory = BallTrajectory.from_ball_df(ball_df, deduplicate=False)
+    return trajectory.pitch_angle(contact_time, interpolate=interpolate)
 
 
-def find_track_angle(ball_df, bat_df, hit_frame):
+def find_track_angle(ball_df, bat_df, hit_frame, interpolate=False):
     """
     Calculate the track angle, which is the difference between the attack angle and the pitch angle.
 
     Args:
-        ball_df (pd.DataFrame): DataFrame containing the ball's trajectory data.
+        ball_df (pd.DataFrame): DataFrame containing the ball's trajectory data, without
+            repeated frames (see ingest.compact_ball_samples).
         bat_df (pd.DataFrame): DataFrame containing the bat's trajectory data.
         hit_frame (pd.DataFrame): DataFrame containing the hit frame data.
+        interpolate (bool, optional): Interpolate the pitch angle at the exact contact
+            time. Defaults to False.
 
     Returns:
         tuple: A tuple containing the attack angle and the track angle.
@@ -110,7 +107,7 @@ def find_track_angle(ball_df, bat_df, hit_frame):
         )
     attack_angle = calc_attack_angle(bat_df, "sweet_spot", hit_df)
     contact_time = hit_frame["time"].values[0]
-    pitch_angle = calc_pitch_angle(ball_df, contact_time)
+    pitch_angle = calc_pitch_angle(ball_df, contact_time, interpolate=interpolate)
     return attack_angle, (attack_angle - pitch_angle)
 
 
@@ -214,6 +211,28 @@ def score_timing_angle(score_ranges, angle):
     return score
 
 
+def summarize_tracking(angle_freqs, angle_scores):
+    """
+    Convert a batter's tracking angle groups and scores into their scorecard entries.
+
+    Args:
+        angle_freqs (list): The (group, frequency) pair of each angle group.
+        angle_scores (list): The score of each swing.
+
+    Returns:
+        dict: The group frequencies, swing scores and grade.
+    """
+    batter_score = sum(angle_scores) / len(angle_scores)
+    # translate score into grade
+    thresholds = {"A": 3.25, "B": 3, "C": 2.5, "D": 2}
+    return {
+        "angle_freqs": angle_freqs,
+        "angle_scores": angle_scores,
+        "track_angle_grade": get_grade(batter_score, thresholds),
+    }
+
+
+@stage_timer.timed()
 def tracking_scorecard(tracking_df, angle_ranges):
     """
     Generate a tracking scorecard for each batter.
@@ -226,14 +245,14 @@ def tracking_scorecard(tracking_df, angle_ranges):
         list: A list of dictionaries containing scorecard information for each batter.
     """
     scorecard_list = []
+    index = BatterIndex(tracking_df)
     for batter in tracking_df["batter"].unique():
         scorecard_dict = dict()
         scorecard_dict["batter"] = batter
 
         # limit the tracking_df to rows of interest
-        batter_df = tracking_df[
-            (tracking_df["batter"] == batter) & (tracking_df["track_angle"].notnull())
-        ].copy()
+        batter_df = index.get(batter)
+        batter_df = batter_df[batter_df["track_angle"].notnull()].copy()
 
         if len(batter_df) == 0:
             continue
@@ -250,12 +269,7 @@ def tracking_scorecard(tracking_df, angle_ranges):
             score_timing_angle(angle_ranges, angle)
             for angle in batter_df["track_angle"]
         ]
-        scorecard_dict["angle_freqs"] = angle_freqs
-        scorecard_dict["angle_scores"] = angle_scores
-        batter_score = sum(angle_scores) / len(angle_scores)
-        # translate score into grade
-        thresholds = {"A": 3.25, "B": 3, "C": 2.5, "D": 2}
-        scorecard_dict["track_angle_grade"] = get_grade(batter_score, thresholds)
+        scorecard_dict.update(summarize_tracking(angle_freqs, angle_scores))
         scorecard_list.append(scorecard_dict)
     return scorecard_list
 
@@ -290,229 +304,6 @@ def convert_score_ranges(score_ranges):
     return ranges, centers, widths
 
 
-def polar_to_cartesian(r, theta_deg):
-    """
-    Convert polar coordinates to Cartesian coordinates.
-
-    Args:
-        r (float): The radius.
-        theta_deg (float): The angle in degrees.
-
-    Returns:
-        tuple: A tuple containing the x and y Cartesian coordinates.
-    """
-    # polar coordinates start at approximately (1.5, 1.95)
-    theta_rad = math.radians(theta_deg + 2)
-    x = -r * math.cos(theta_rad) + 1.5
-    y = r * math.sin(theta_rad) + 1.95
-    return x, y
-
-
-def plot_tracking_angles(
-    score_ranges, alphas=None, grade=None, color=None, batter_id=None
-):
-    """
-    Plot the tracking angles on a polar plot.
-
-    Args:
-        score_ranges (list): List of score ranges.
-        alphas (list, optional): List of alpha values for transparency based on frequencies.
-        grade (str, optional): The grade to display (A/B/C/D/F).
-        color (str, optional): The color of the grade text.
-        batter_id (int, optional): The batter ID.
-
-    Returns:
-        go.Figure: The plotly figure object.
-    """
-    pitch_angle = 10
-    _, centers, widths = convert_score_ranges(score_ranges)
-    theta_list = [-theta - pitch_angle for theta in centers]
-
-    # set colors for wedge edges, with the Grade A edges being magenta to stand out
-    marker_colors = ["darkslateblue"] * len(widths)
-    marker_colors[4:6] = ["magenta"] * 2
-
-    if batter_id is not None:
-        # set values based on the batter's track angles
-        colors = [f"rgba(0,136,255,{a})" for a in alphas]
-        sorted_colors = list(set(colors.copy()))
-        sorted_colors.sort(reverse=True)
-        names = [""] * len(sorted_colors)
-        names[0] = "High"
-        names[-1] = "Low"
-        legend_title = "Swing Frequency"
-    else:
-        # set values to generate customization plot
-        base_colors = [
-            "#FF0000",
-            "#FFA500",
-            "#0000FF",
-            "#008000",
-            "#0000FF",
-            "#FFA500",
-            "#FF0000",
-        ]
-        alpha_value = 0.3
-        colors = [
-            f"rgba({int(color[1:3], 16)},{int(color[3:5], 16)},{int(color[5:7], 16)},{alpha_value})"
-            for color in base_colors
-        ]
-        colors.append("white")
-        colors.insert(0, "white")
-        sorted_colors = colors[4:8]
-        names = ["Grade A", "Grade B", "Grade C", "Grade D"]
-        legend_title = "Scoring Ranges"
-
-    data = [
-        go.Barpolar(
-            r=[5] * len(widths),
-            theta=theta_list,
-            width=widths,
-            marker_color=colors,
-            marker_line_color=marker_colors,
-            marker_line_width=2,
-            legend="legend",
-        )
-    ]
-
-    # Generate a custom legend
-    legends = [
-        go.Barpolar(
-            r=[None],
-            theta=[None],
-            marker_color=sorted_colors[i],
-            marker_line_color="darkslateblue",
-            marker_line_width=2,
-            name=names[i],
-            legend="legend2",
-        )
-        for i in range(len(sorted_colors))
-    ]
-    data.extend(legends)
-    fig = go.Figure(
-        data,
-        layout={
-            "legend": {"visible": False},
-            "legend2": {
-                "font": {"size": 20},
-                "title": legend_title,
-                "xref": "paper",
-                "x": 0.75,
-                "itemsizing": "constant",
-            },
-        },
-    )
-
-    # Add title
-    fig.add_annotation(
-        text="Tracking Angle",
-        font={"size": 30},
-        xref="paper",
-        yref="paper",
-        x=0.5,
-        y=1.25,
-        showarrow=False,
-    )
-
-    if batter_id is not None:
-        # Add batter grade
-        fig.add_annotation(
-            text=grade,
-            font={"size": 100, "color": color},
-            xref="paper",
-            yref="paper",
-            x=0.25,
-            y=0,
-            showarrow=False,
-        )
-
-        # Add batter id subtitle
-        fig.add_annotation(
-            text=f"Batter: {batter_id}",
-            font={"size": 30},
-            xref="paper",
-            yref="paper",
-            x=0.5,
-            y=1.15,
-            showarrow=False,
-        )
-
-        # Add images of baseball to represent pitch angle
-        for i in range(8):
-            # Set the polar coordinates for the image
-            r_image = (i) * 0.3
-            theta_image = pitch_angle + 4
-
-            # Convert polar to Cartesian for image placement
-            x_image, y_image = polar_to_cartesian(r_image, theta_image)
-            url = "https://raw.githubusercontent.com/woodmc10/wisd_2024_public/main/images/pieces/baseball_1.png"
-            # Fetch the image from the URL
-            response = requests.get(url)
-            img = Image.open(BytesIO(response.content))
-
-            # add image to plot
-            fig.add_layout_image(
-                dict(
-                    source=img,
-                    xref="x",
-                    yref="y",
-                    xanchor="center",
-                    yanchor="middle",
-                    x=x_image,
-                    y=y_image,
-                    sizex=0.18,
-                    sizey=0.18,
-                    sizing="contain",
-                    opacity=1,
-                    layer="above",
-                )
-            )
-
-    # Remove cartesian axes and convert to polar coordinates
-    fig.update_layout(
-        xaxis=dict(visible=False, showgrid=False, zeroline=False),
-        yaxis=dict(visible=False, showgrid=False, zeroline=False),
-        template=None,
-        polar=dict(
-            radialaxis=dict(range=[0, 5], showticklabels=False, ticks=""),
-            angularaxis=dict(showticklabels=False, ticks=""),
-            sector=[-pitch_angle - 45, -pitch_angle + 45],
-        ),
-    )
-
-    # Set figure size differently for batter plot and customizing plot
-    if batter_id is not None:
-        fig.update_layout(autosize=True, width=1200, height=600)
-    else:
-        fig.update_layout(width=700, height=500)
-
-    fig.update_layout(showlegend=True)
-
-    return fig
-
-
-def generate_track_angle_plot(batter_id, tracking_score_df, score_widths):
-    """
-    Generate a plot for the tracking angle of a specific batter.
-
-    Args:
-        batter_id (int): The ID of the batter.
-        tracking_score_df (pd.DataFrame): DataFrame containing tracking score data.
-        score_widths (list): List of score widths.
-
-    Returns:
-        go.Figure: The plotly figure object.
-    """
-    batter_df = tracking_score_df[tracking_score_df["batter"] == batter_id]
-    # convert frequencies to percents for wedge fill transparency
-    percents = [group_freq[1] for group_freq in batter_df["angle_freqs"].values[0]]
-    alphas = [per / max(percents) for per in percents]
-    # get the grade and grade color
-    grade = batter_df["track_angle_grade"].values[0]
-    color = color_letter(grade)
-    return plot_tracking_angles(score_widths, alphas, grade, color, batter_id)
-
-
 def create_tracking_score_df(score_widths, tracking_metrics_df):
     """
     Create a DataFrame containing tracking scores.
@@ -529,19 +320,12 @@ def create_tracking_score_df(score_widths, tracking_metrics_df):
     return pd.DataFrame.from_dict(tracking_score_list)
 
 
-if __name__ == "__main__":
-    # Needs to be updated, copied from timing
-    tracking_metrics_df = pd.read_csv("../data/dataframes/tracking_metrics_df.csv")
-
-    score_widths = [2.5, 5, 10, 15]
-    tracking_score_df = create_tracking_score_df(score_widths, tracking_metrics_df)
-
-    batter_list = [545569723, 590082479]
-    # when ready, create a list of all batters in scorecard_df and loop through
-    # need to add code to save the resulting plots
-    for batter_id in batter_list:
-        fig = generate_track_angle_plot(batter_id, tracking_score_df, score_widths)
-        fig.show()
-        # fig.write_image(f'../images/grades/{batter_id}_tracking.png')
-    fig = plot_tracking_angles(score_widths)
-    fig.show()
+__getattr__ = lazy_reexport(
+    __name__,
+    "track_angle_viz",
+    (
+        "polar_to_cartesian",
+        "plot_tracking_angles",
+        "generate_track_angle_plot",
+    ),
+)
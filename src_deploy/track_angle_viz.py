@@ -0,0 +1,254 @@
+import math
+import pandas as pd
+import plotly.graph_objects as go
+from track_angle import convert_score_ranges, create_tracking_score_df
+from utils import color_letter
+from assets import get_image_uri
+from stage_timer import stage_timer
+
+
+def polar_to_cartesian(r, theta_deg):
+    """
+    Convert polar coordinates to Cartesian coordinates.
+
+    Args:
+        r (float): The radius.
+        theta_deg (float): The angle in degrees.
+
+    Returns:
+        tuple: A tuple containing the x and y Cartesian coordinates.
+    """
+    # polar coordinates start at approximately (1.5, 1.95)
+    theta_rad = math.radians(theta_deg + 2)
+    x = -r * math.cos(theta_rad) + 1.5
+    y = r * math.sin(theta_rad) + 1.95
+    return x, y
+
+
+@stage_timer.timed()
+def plot_tracking_angles(
+    score_ranges, alphas=None, grade=None, color=None, batter_id=None
+):
+    """
+    Plot the tracking angles on a polar plot.
+
+    Args:
+        score_ranges (list): List of score ranges.
+        alphas (list, optional): List of alpha values for transparency based on frequencies.
+        grade (str, optional): The grade to display (A/B/C/D/F).
+        color (str, optional): The color of the grade text.
+        batter_id (int, optional): The batter ID.
+
+    Returns:
+        go.Figure: The plotly figure object.
+    """
+    pitch_angle = 10
+    _, centers, widths = convert_score_ranges(score_ranges)
+    theta_list = [-theta - pitch_angle for theta in centers]
+
+    # set colors for wedge edges, with the Grade A edges being magenta to stand out
+    marker_colors = ["darkslateblue"] * len(widths)
+    marker_colors[4:6] = ["magenta"] * 2
+
+    if batter_id is not None:
+        # set values based on the batter's track angles
+        colors = [f"rgba(0,136,255,{a})" for a in alphas]
+        sorted_colors = list(set(colors.copy()))
+        sorted_colors.sort(reverse=True)
+        names = [""] * len(sorted_colors)
+        names[0] = "High"
+        names[-1] = "Low"
+        legend_title = "Swing Frequency"
+    else:
+        # set values to generate customization plot
+        base_colors = [
+            "#FF0000",
+            "#FFA500",
+            "#0000FF",
+            "#008000",
+            "#0000FF",
+            "#FFA500",
+            "#FF0000",
+        ]
+        alpha_value = 0.3
+        colors = [
+            f"rgba({int(color[1:3], 16)},{int(color[3:5], 16)},{int(color[5:7], 16)},{alpha_value})"
+            for color in base_colors
+        ]
+        colors.append("white")
+        colors.insert(0, "white")
+        sorted_colors = colors[4:8]
+        names = ["Grade A", "Grade B", "Grade C", "Grade D"]
+        legend_title = "Scoring Ranges"
+
+    data = [
+        go.Barpolar(
+            r=[5] * len(widths),
+            theta=theta_list,
+            width=widths,
+            marker_color=colors,
+            marker_line_color=marker_colors,
+            marker_line_width=2,
+            legend="legend",
+        )
+    ]
+
+    # Generate a custom legend
+    legends = [
+        go.Barpolar(
+            r=[None],
+            theta=[None],
+            marker_color=sorted_colors[i],
+            marker_line_color="darkslateblue",
+            marker_line_width=2,
+            name=names[i],
+            legend="legend2",
+        )
+        for i in range(len(sorted_colors))
+    ]
+    data.extend(legends)
+    fig = go.Figure(
+        data,
+        layout={
+            "legend": {"visible": False},
+            "legend2": {
+                "font": {"size": 20},
+                "title": legend_title,
+                "xref": "paper",
+                "x": 0.75,
+                "itemsizing": "constant",
+            },
+        },
+    )
+
+    # Add title
+    fig.add_annotation(
+        text="Tracking Angle",
+        font={"size": 30},
+        xref="paper",
+        yref="paper",
+        x=0.5,
+        y=1.25,
+        showarrow=False,
+    )
+
+    if batter_id is not None:
+        # Add batter grade
+        fig.add_annotation(
+            text=grade,
+            font={"size": 100, "color": color},
+            xref="paper",
+            yref="paper",
+            x=0.25,
+            y=0,
+            showarrow=False,
+        )
+
+        # Add batter id subtitle
+        fig.add_annotation(
+            text=f"Batter: {batter_id}",
+            font={"size": 30},
+            xref="paper",
+            yref="paper",
+            x=0.5,
+            y=1.15,
+            showarrow=False,
+        )
+
+        # Add images of baseball to represent pitch angle
+        baseball_img = get_image_uri("pieces/baseball_1.png")
+        for i in range(8):
+            # Set the polar coordinates for the image
+            r_image = (i) * 0.3
+            theta_image = pitch_angle + 4
+
+            # Convert polar to Cartesian for image placement
+            x_image, y_image = polar_to_cartesian(r_image, theta_image)
+
+            # add image to plot
+            fig.add_layout_image(
+                dict(
+                    source=baseball_img,
+                    xref="x",
+                    yref="y",
+                    xanchor="center",
+                    yanchor="middle",
+                    x=x_image,
+                    y=y_image,
+                    sizex=0.18,
+                    sizey=0.18,
+                    sizing="contain",
+                    opacity=1,
+                    layer="above",
+                )
+            )
+
+    # Remove cartesian axes and convert to polar coordinates
+    fig.update_layout(
+        xaxis=dict(visible=False, showgrid=False, zeroline=False),
+        yaxis=dict(visible=False, showgrid=False, zeroline=False),
+        template=None,
+        polar=dict(
+            radialaxis=dict(range=[0, 5], showticklabels=False, ticks=""),
+            angularaxis=dict(showticklabels=False, ticks=""),
+            sector=[-pitch_angle - 45, -pitch_angle + 45],
+        ),
+    )
+
+    # Set figure size differently for batter plot and customizing plot
+    if batter_id is not None:
+        fig.update_layout(autosize=True, width=1200, height=600)
+    else:
+        fig.update_layout(width=700, height=500)
+
+    fig.update_layout(showlegend=True)
+
+    return fig
+
+
+@stage_timer.timed()
+def generate_track_angle_plot(
+    batter_id, tracking_score_df, score_widths, batter_index=None
+):
+    """
+    Generate a plot for the tracking angle of a specific batter.
+
+    Args:
+        batter_id (int): The ID of the batter.
+        tracking_score_df (pd.DataFrame): DataFrame containing tracking score data.
+        score_widths (list): List of score widths.
+        batter_index (BatterIndex, optional): Index of tracking_score_df, used to look up
+            the batter's row instead of filtering the frame. Defaults to None.
+
+    Returns:
+        go.Figure: The plotly figure object.
+    """
+    if batter_index is not None:
+        batter_df = batter_index.get(batter_id)
+    else:
+        batter_df = tracking_score_df[tracking_score_df["batter"] == batter_id]
+    # convert frequencies to percents for wedge fill transparency
+    percents = [group_freq[1] for group_freq in batter_df["angle_freqs"].values[0]]
+    alphas = [per / max(percents) for per in percents]
+    # get the grade and grade color
+    grade = batter_df["track_angle_grade"].values[0]
+    color = color_letter(grade)
+    return plot_tracking_angles(score_widths, alphas, grade, color, batter_id)
+
+
+if __name__ == "__main__":
+    # Needs to be updated, copied from timing
+    tracking_metrics_df = pd.read_csv("../data/dataframes/tracking_metrics_df.csv")
+
+    score_widths = [2.5, 5, 10, 15]
+    tracking_score_df = create_tracking_score_df(score_widths, tracking_metrics_df)
+
+    batter_list = [545569723, 590082479]
+    # when ready, create a list of all batters in scorecard_df and loop through
+    # need to add code to save the resulting plots
+    for batter_id in batter_list:
+        fig = generate_track_angle_plot(batter_id, tracking_score_df, score_widths)
+        fig.show()
+        # fig.write_image(f'../images/grades/{batter_id}_tracking.png')
+    fig = plot_tracking_angles(score_widths)
+    fig.show()
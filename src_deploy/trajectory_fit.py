@@ -0,0 +1,242 @@
+import argparse
+import glob
+import math
+import os
+import numpy as np
+import pandas as pd
+from ball_trajectory import ACC_COLUMNS, POS_COLUMNS, VEL_COLUMNS
+from ingest import (
+    CONTACT_EVENTS,
+    ball_samples_df,
+    bat_samples_df,
+    compact_pitch,
+    read_pitch_file,
+)
+
+# coefficient columns of a stored fit, the constant, linear and quadratic term of each axis
+COEF_COLUMNS = [f"c{ax}_{power}" for ax in range(3) for power in range(3)]
+FIT_COLUMNS = ["t_start", "t_end", "samples", "rmse"] + COEF_COLUMNS
+
+
+def pitch_segment(ball_df, end_time=None):
+    """
+    Select the samples of the pitch's flight. The tracking data is made of constant
+    acceleration segments (the pitch, then the batted or bounced ball), so the
+    flight is the leading run of samples with the first sample's acceleration.
+
+    Args:
+        ball_df (pd.DataFrame): DataFrame containing the ball's trajectory data,
+            without repeated frames.
+        end_time (float, optional): Drop the samples after this time, e.g. the time of
+            contact. Defaults to None.
+
+    Returns:
+        pd.DataFrame: The samples of the flight.
+    """
+    if end_time is not None:
+        ball_df = ball_df[ball_df["time"] <= end_time]
+    if ball_df.empty or not set(ACC_COLUMNS).issubset(ball_df.columns):
+        return ball_df
+    acc = ball_df[ACC_COLUMNS].to_numpy(dtype=float)
+    same = np.isclose(acc, acc[0]).all(axis=1)
+    end = len(ball_df) if same.all() else int(np.argmin(same))
+    return ball_df.iloc[:end]
+
+
+def fit_flight(ball_df, end_time=None):
+    """
+    Fit a constant acceleration (per-axis quadratic) model to a pitch's flight by
+    least squares.
+
+    Args:
+        ball_df (pd.DataFrame): DataFrame containing the ball's trajectory data,
+            without repeated frames.
+        end_time (float, optional): Time the flight ends, e.g. the time of contact.
+            Defaults to None, fitting the whole first segment.
+
+    Returns:
+        dict: The fit keyed like FIT_COLUMNS, the time span, the number of samples,
+        the root mean square residual (ft) and the coefficients of
+        pos = c_0 + c_1 * dt + c_2 * dt**2 with dt the time since t_start. None when
+        fewer than three samples are left to fit.
+    """
+    segment = pitch_segment(ball_df, end_time)
+    if len(segment) < 3:
+        return None
+    time = segment["time"].to_numpy(dtype=float)
+    pos = segment[POS_COLUMNS].to_numpy(dtype=float)
+    dt = time - time[0]
+    # polyfit returns the highest power first, one column per axis
+    coef = np.polyfit(dt, pos, 2)[::-1].T
+    residuals = pos - (coef[:, 0] + np.outer(dt, coef[:, 1]) + np.outer(dt**2, coef[:, 2]))
+    fit = {
+        "t_start": time[0],
+        "t_end": time[-1],
+        "samples": len(segment),
+        "rmse": math.sqrt(float(np.mean(residuals**2))),
+    }
+    fit.update(zip(COEF_COLUMNS, coef.ravel()))
+    return fit
+
+
+def fit_pitch(pitch):
+    """
+    Fit a pitch's flight up to contact, or the whole first segment when the batter
+    didn't swing.
+
+    Args:
+        pitch (dict): The pitch's tracking data.
+
+    Returns:
+        dict: The fit, see fit_flight.
+    """
+    pitch, _ = compact_pitch(pitch)
+    bat_df = bat_samples_df(pitch)
+    end_time = None
+    if not bat_df.empty:
+        hit_frame = bat_df[bat_df["event"].isin(CONTACT_EVENTS)]
+        if not hit_frame.empty:
+            end_time = hit_frame["time"].values[0]
+    return fit_flight(ball_samples_df(pitch), end_time)
+
+
+class TrajectoryFits:
+    """
+    The flight fits of many pitches, evaluated for all of them at once. Each fit is
+    twelve numbers instead of the ten values of every ball sample. Times outside a
+    fit's span extrapolate the flight, which is how the position at a contact just
+    after the last pitch sample is found.
+
+    Args:
+        fits_df (pd.DataFrame): One row per pitch with the FIT_COLUMNS, e.g. from
+            to_frame or a stored file.
+    """
+
+    def __init__(self, fits_df):
+        self.fits_df = fits_df
+        self.t_start = fits_df["t_start"].to_numpy(dtype=float)
+        self.coef = fits_df[COEF_COLUMNS].to_numpy(dtype=float).reshape(-1, 3, 3)
+
+    @classmethod
+    def from_fits(cls, fits, keys):
+        """
+        Collect fits into one table.
+
+        Args:
+            fits (list): Fits from fit_flight or fit_pitch, None ones are skipped.
+            keys (list): The pitch key of each fit, e.g. the tracking file name.
+
+        Returns:
+            TrajectoryFits: The fits indexed by pitch key.
+        """
+        rows = [(key, fit) for key, fit in zip(keys, fits) if fit is not None]
+        fits_df = pd.DataFrame(
+            [fit for _, fit in rows],
+            index=pd.Index([key for key, _ in rows], name="pitch"),
+            columns=FIT_COLUMNS,
+        )
+        return cls(fits_df)
+
+    def __len__(self):
+        return len(self.fits_df)
+
+    def to_frame(self):
+        """
+        Get the fits for storage.
+
+        Returns:
+            pd.DataFrame: One row per pitch with the FIT_COLUMNS.
+        """
+        return self.fits_df
+
+    def _dt(self, t):
+        return np.broadcast_to(np.asarray(t, dtype=float), self.t_start.shape) - self.t_start
+
+    def position_at(self, t):
+        """
+        Get the ball position of every pitch.
+
+        Args:
+            t (float or np.ndarray): The time, one for all pitches or one per pitch.
+
+        Returns:
+            np.ndarray: The (x, y, z) positions in feet with shape (n, 3).
+        """
+        dt = self._dt(t)[:, None]
+        return self.coef[:, :, 0] + self.coef[:, :, 1] * dt + self.coef[:, :, 2] * dt**2
+
+    def velocity_at(self, t):
+        """
+        Get the ball velocity of every pitch.
+
+        Args:
+            t (float or np.ndarray): The time, one for all pitches or one per pitch.
+
+        Returns:
+            np.ndarray: The (x, y, z) velocities in ft/s with shape (n, 3).
+        """
+        dt = self._dt(t)[:, None]
+        return self.coef[:, :, 1] + 2 * self.coef[:, :, 2] * dt
+
+    def pitch_angle(self, t):
+        """
+        Calculate the pitch angle of every pitch from its velocity, like
+        BallTrajectory.pitch_angle with interpolation.
+
+        Args:
+            t (float or np.ndarray): The time, one for all pitches or one per pitch.
+
+        Returns:
+            np.ndarray: The pitch angles in degrees.
+        """
+        velocity = self.velocity_at(t)
+        return np.degrees(np.arctan(velocity[:, 2] / velocity[:, 1]))
+
+
+def fit_tracking_files(tracking_folder):
+    """
+    Fit the flight of every tracking file in a folder.
+
+    Args:
+        tracking_folder (str): Folder containing the tracking JSONL files.
+
+    Returns:
+        tuple: The TrajectoryFits keyed by file name and the number of ball sample
+        values, 'fitted' counting only the flight samples of the fitted pitches, the
+        values the fits replace, and 'all' counting every sample of every file.
+    """
+    paths = sorted(glob.glob(f"{tracking_folder}/*.jsonl"))
+    # time, position, velocity and acceleration of each fitted sample
+    fitted_sample_values = 1 + len(POS_COLUMNS + VEL_COLUMNS + ACC_COLUMNS)
+    fits, sample_values = [], {"fitted": 0, "all": 0}
+    for path in paths:
+        pitch = read_pitch_file(path)
+        fit = fit_pitch(pitch)
+        fits.append(fit)
+        if fit is not None:
+            sample_values["fitted"] += fit["samples"] * fitted_sample_values
+        sample_values["all"] += sum(
+            1 + sum(len(sample.get(name) or []) for name in ["pos", "vel", "acc"])
+            for sample in pitch["samples_ball"]
+        )
+    keys = [os.path.basename(path) for path in paths]
+    return TrajectoryFits.from_fits(fits, keys), sample_values
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fit the ball flight of tracking files")
+    parser.add_argument("--tracking-folder", default="../data/tracking_files")
+    parser.add_argument("--output", default=None, help="Parquet file of the fits")
+    args = parser.parse_args()
+    trajectory_fits, sample_values = fit_tracking_files(args.tracking_folder)
+    fits_df = trajectory_fits.to_frame()
+    if args.output:
+        fits_df.to_parquet(args.output)
+    fit_values = fits_df.size
+    print(
+        f"fit {len(fits_df)} pitches, their {sample_values['fitted']} flight sample "
+        f"values stored as {fit_values} "
+        f"({sample_values['fitted'] / max(fit_values, 1):.1f}x smaller), "
+        f"{sample_values['all']} ball sample values in all files, "
+        f"max residual {fits_df['rmse'].max():.4f} ft"
+    )
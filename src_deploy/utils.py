@@ -1,6 +1,7 @@
+import hashlib
+import importlib
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 
 
 def get_grade(distance, thresholds):
@@ -41,3 +42,44 @@ def color_letter(grade):
     color_dict = {"A": "green", "B": "blue", "C": "orange", "D": "red", "F": "red"}
     return color_dict[grade]
 
+
+def data_version(*dfs):
+    """
+    Get a short content hash identifying a set of DataFrames, used to invalidate
+    anything cached from them when the data changes.
+
+    Args:
+        *dfs (pd.DataFrame): The DataFrames to hash.
+
+    Returns:
+        str: The data version.
+    """
+    digest = hashlib.sha1()
+    for df in dfs:
+        digest.update(",".join(map(str, df.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()[:12]
+
+
+def lazy_reexport(module_name, source_name, names):
+    """
+    Build a module __getattr__ that re-exports names from another module, importing
+    it on first use. The plotting functions moved out of the scoring modules, so
+    scoring never imports the plotting libraries, and the old names still import
+    from the scoring modules.
+
+    Args:
+        module_name (str): Name of the module re-exporting the names.
+        source_name (str): Name of the module defining them.
+        names (tuple): The re-exported names.
+
+    Returns:
+        callable: The module __getattr__.
+    """
+
+    def __getattr__(name):
+        if name in names:
+            return getattr(importlib.import_module(source_name), name)
+        raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+
+    return __getattr__